@@ -0,0 +1,71 @@
+"""MQTT 메시지 형식 비교 (JSON / CBOR / MessagePack)
+
+대표 메시지를 형식별로 인코딩/디코딩할 때 걸리는 시간(메시지당)과 크기를 비교합니다.
+- 상태: publish_status("collecting", {...}) 메시지 (ISO 시각 문자열 포함)
+- 측정값: 토양 센서 측정값 1개 (Reading.to_dict)
+- 상태 보고: TelemetryReporter 메시지 (게이지/카운터/p95)
+
+설치되지 않은 형식(cbor2, msgpack)은 건너뜁니다.
+
+    py bench_codec.py [반복 수]
+"""
+import sys
+import time
+from datetime import datetime
+
+from payload_codec import CODECS
+from readings import SoilReading
+
+MESSAGES = {
+    "상태": {
+        "status": "collecting",
+        "timestamp": datetime(2025, 10, 9, 6, 30, 0, 123456).isoformat() + "Z",
+        "farm_id": "16e23f55-25aa-4cad-a9a8-91ddd32613b8",
+        "details": {
+            "command": "A", "request_id": "0c6b2f1e-6a0e-4c1f-9d8e-3f2a7b9c1d4e",
+            "serial": {"soil": {"connected": True, "port": "COM3", "reconnect_count": 2},
+                       "env": {"connected": False, "port": None, "reconnect_count": 0}},
+        },
+    },
+    "측정값": SoilReading(1, 21.5, 43.2, 1.21, 6.8, 120.0, 35.0, 18.0, 42.0, 1760000000.123).to_dict(),
+    "상태 보고": {
+        "seq": 42, "ts": 1760000000, "dt": 60,
+        "g": {"disk_mb": 51200, "last.A": 1759999800, "rss_mb": 84, "cpu_pct": 3},
+        "c": {"collect.A.ok": 1, "upload.bytes": 48213, "serial.roundtrip.errors": 2},
+        "p95": {"serial.roundtrip": 41, "upload.request.A": 380},
+    },
+}
+
+
+def measure(func, arg, count: int) -> float:
+    """호출당 평균 시간 (us)"""
+    for _ in range(min(count, 1000)):
+        func(arg)
+    start = time.perf_counter()
+    for _ in range(count):
+        func(arg)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    missing = [name for name in ("cbor", "msgpack") if name not in CODECS]
+    if missing:
+        print(f"(설치되지 않아 건너뜀: {', '.join(missing)})")
+
+    for label, message in MESSAGES.items():
+        print(f"=== {label} 메시지 ({count:,}회) ===")
+        json_size = None
+        for name, codec in CODECS.items():
+            payload = codec.encode(message)
+            assert codec.decode(payload) == message
+            size = len(payload)
+            json_size = json_size or size
+            encode_us = measure(codec.encode, message, count)
+            decode_us = measure(codec.decode, payload, count)
+            print(f"{name:<8} {size:5d} bytes ({size / json_size * 100:3.0f}%)  "
+                  f"인코딩 {encode_us:6.2f}us  디코딩 {decode_us:6.2f}us")
+
+
+if __name__ == "__main__":
+    main()
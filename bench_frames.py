@@ -0,0 +1,139 @@
+"""프로세스 간 카메라 프레임 전달 방식 비교 (파일 / pickle 큐 / 공유 메모리 링)
+
+생산 프로세스 하나가 1080p 프레임을 만들어 소비 프로세스 2개(인코더, 선명도 평가 역할)에 넘길 때
+프레임/초와 프레임당 지연(생산 → 두 소비자가 모두 읽음)을 비교합니다.
+- 파일: 임시 폴더에 .npy로 저장하고 경로만 큐로 전달 (기존 캡처 → JPEG → 다시 읽기와 같은 구조)
+- 큐: ndarray를 multiprocessing.Queue로 전달 (소비자마다 pickle 복사)
+- 링: frame_ring.FrameRing 슬롯에 한 번 쓰고 FrameRef만 큐로 전달 (복사 없음)
+
+소비자는 프레임 전체를 한 번 읽습니다 (평균 밝기). 실제 선명도 계산 시간은 방식과 무관하므로 제외합니다.
+
+    py bench_frames.py [프레임 수] [높이] [너비]
+"""
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from frame_ring import FrameRing
+
+CONSUMERS = 2
+SLOTS = 4  # 링 슬롯 수 = 큐 길이 (생산자가 소비자보다 앞서갈 수 있는 프레임 수)
+
+
+def consume(method: str, inbox, done, spec):
+    ring = FrameRing.attach(spec) if spec else None
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        ts, payload = item
+        if method == "파일":
+            frame = np.load(payload)
+        elif method == "큐":
+            frame = payload
+        else:
+            frame = ring.view(payload)
+        frame.mean()
+        if ring:
+            del frame
+            ring.release(payload)
+        done.put((ts, time.perf_counter()))
+    if ring:
+        ring.close()
+
+
+def produce(method: str, frames: list, inboxes: list, ring: FrameRing, folder: Path, acks):
+    """프레임을 넘기고 소비자 응답(ack)을 받아 SLOTS개 이상 앞서가지 않게 조절"""
+    pending = 0
+    for i, frame in enumerate(frames):
+        while pending >= SLOTS:
+            acks.get()
+            pending -= 1
+        ts = time.perf_counter()
+        if method == "파일":
+            payload = folder / f"{i % (SLOTS * 2)}.npy"
+            np.save(payload, frame)
+        elif method == "큐":
+            payload = frame
+        else:
+            reserved = None
+            while reserved is None:
+                reserved = ring.reserve(frame.shape)
+            ref, buf = reserved
+            np.copyto(buf, frame)  # 실제로는 cap.read(buf)가 슬롯에 바로 씀
+            ring.publish(ref, readers=CONSUMERS)
+            payload = ref
+        for inbox in inboxes:
+            inbox.put((ts, payload))
+        pending += 1
+    while pending:
+        acks.get()
+        pending -= 1
+
+
+def run(method: str, count: int, shape: tuple) -> tuple:
+    ctx = mp.get_context("spawn")
+    ring = FrameRing(slots=SLOTS * 2, max_shape=shape) if method == "링" else None
+    spec = ring.spec() if ring else None
+    done = ctx.Queue()
+    inboxes = [ctx.Queue() for _ in range(CONSUMERS)]
+    consumers = [ctx.Process(target=consume, args=(method, inbox, done, spec)) for inbox in inboxes]
+    for p in consumers:
+        p.start()
+
+    # 프레임 몇 장을 돌려 사용 (생성 시간 제외)
+    frames = [np.random.randint(0, 256, shape, dtype=np.uint8) for _ in range(4)]
+    frames = [frames[i % 4] for i in range(count)]
+
+    latencies = []
+    acks = _Acks(done, latencies)
+    with tempfile.TemporaryDirectory() as folder:
+        produce(method, frames[:SLOTS], inboxes, ring, Path(folder), acks)  # 예열 (프로세스 시작/import)
+        latencies.clear()
+        start = time.perf_counter()
+        produce(method, frames, inboxes, ring, Path(folder), acks)
+        elapsed = time.perf_counter() - start
+        for inbox in inboxes:
+            inbox.put(None)
+        for p in consumers:
+            p.join()
+    if ring:
+        ring.close()
+    return count / elapsed, sum(latencies) / len(latencies) * 1000, max(latencies) * 1000
+
+
+class _Acks:
+    """소비자 CONSUMERS명이 모두 읽은 프레임 = ack 1개 (프레임별 지연 기록)"""
+
+    def __init__(self, done, latencies: list):
+        self.done = done
+        self.latencies = latencies
+        self.seen = {}
+
+    def get(self):
+        while True:
+            ts, finished = self.done.get()
+            self.seen[ts] = self.seen.get(ts, 0) + 1
+            if self.seen[ts] == CONSUMERS:
+                del self.seen[ts]
+                self.latencies.append(finished - ts)
+                return
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    shape = (int(sys.argv[2]), int(sys.argv[3]), 3) if len(sys.argv) > 3 else (1080, 1920, 3)
+    size_mb = np.prod(shape) / 1e6
+    print(f"=== {shape[1]}x{shape[0]} 프레임 ({size_mb:.1f}MB) {count}장 → 소비자 {CONSUMERS}명 ===")
+    for method in ("파일", "큐", "링"):
+        fps, avg_ms, max_ms = run(method, count, shape)
+        print(f"{method:<4} {fps:7.1f} 프레임/초  지연 평균 {avg_ms:6.2f}ms  최대 {max_ms:6.2f}ms  "
+              f"({fps * size_mb * CONSUMERS:,.0f}MB/s 전달)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""로그 호출 비용 비교
+
+수집 스레드에서 log()를 호출할 때 걸리는 시간(호출당)을 비교합니다.
+- 기존: 매 호출마다 파일을 열어 추가, 500KB를 넘으면 전체를 읽어 최근 3000줄로 다시 쓰기
+- 큐: log_setup의 QueueHandler (큐에 넣고 반환, 기록 스레드가 파일 교체)
+
+파일이 이미 커진 정상 운영 상태를 재현하기 위해 측정 전에 로그를 충분히 채웁니다.
+
+    py bench_logging.py [호출 수]
+"""
+import logging
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from log_setup import setup_logging, shutdown_logging
+
+MESSAGE = "✅ 토양 데이터 업로드 완료[1]: records=1, temp=21.5, humidity=43.2, ec=1.21, ph=6.8"
+
+
+def legacy_log(log_file: Path, msg: str):
+    """기존 main_mqtt.log()의 파일 기록 부분 (콘솔 출력 제외)"""
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_line = f"[{ts}] {msg}"
+    try:
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(log_line + "\n")
+        if log_file.exists() and log_file.stat().st_size > 500000:
+            lines = log_file.read_text(encoding="utf-8").splitlines()
+            if len(lines) > 5000:
+                log_file.write_text("\n".join(lines[-3000:]) + "\n", encoding="utf-8")
+    except Exception:
+        pass
+
+
+def measure(label: str, call, count: int):
+    # 정상 운영 상태까지 채우기
+    for _ in range(count):
+        call()
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    mean = sum(samples) / count
+    p99 = samples[int(count * 0.99)]
+    print(f"{label:<24} 평균 {mean * 1e6:8.1f}us  p99 {p99 * 1e6:9.1f}us  최대 {samples[-1] * 1e3:7.2f}ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"=== log() 호출 {count:,}회 (정상 운영 상태) ===")
+        legacy_file = Path(tmp) / "legacy_log.txt"
+        measure("기존 (파일 다시 쓰기)", lambda: legacy_log(legacy_file, MESSAGE), count)
+
+        setup_logging(Path(tmp) / "sensor_log.txt", console=False)
+        logger = logging.getLogger("bench")
+        measure("큐 + 파일 교체", lambda: logger.info(MESSAGE), count)
+        shutdown_logging()
+        backups = sorted(p.name for p in Path(tmp).iterdir() if p.name.startswith("sensor_log"))
+        print(f"교체된 파일: {', '.join(backups)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""센서 응답 파싱 성능 비교
+
+기존 main_*.py 의 parse_soil_csv (리스트 컴프리헨션 + dict) 와
+sensor_parser 의 한 줄 파싱 / 일괄 파싱(parse_lines) 속도를 비교합니다.
+
+    py bench_parser.py [줄 수]
+"""
+import random
+import sys
+import time
+
+from sensor_parser import SOIL_SCHEMA, parse_lines, parse_soil_csv
+
+
+def legacy_parse_soil_csv(line: str) -> dict:
+    """기존 main_mqtt.py 구현 (비교용)"""
+    parts = [p.strip() for p in line.split(",")]
+    if len(parts) != 9:
+        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
+
+    address, temperature, humidity, ec, ph, salt, n, p, k = map(float, parts)
+    return {
+        "address": int(address),
+        "temperature": temperature / 10,
+        "humidity": humidity / 10,
+        "ec": ec,
+        "ph": ph,
+        "salt": salt,
+        "n": n,
+        "p": p,
+        "k": k,
+    }
+
+
+def make_lines(count: int):
+    rng = random.Random(0)
+    return [
+        f"13,{rng.randint(100, 300)},{rng.randint(100, 900)},{rng.randint(0, 2000)},"
+        f"{rng.randint(40, 90)},{rng.randint(0, 500)},{rng.randint(0, 300)},"
+        f"{rng.randint(0, 300)},{rng.randint(0, 300)}"
+        for _ in range(count)
+    ]
+
+
+def bench(label: str, fn, repeat: int = 5):
+    best = min(_timed(fn) for _ in range(repeat))
+    print(f"{label:<28} {best * 1000:8.2f} ms")
+    return best
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    lines = make_lines(count)
+    print(f"=== 토양 센서 응답 {count}줄 파싱 ===")
+
+    base = bench("legacy parse_soil_csv", lambda: [legacy_parse_soil_csv(l) for l in lines])
+    single = bench("sensor_parser.parse_soil_csv", lambda: [parse_soil_csv(l) for l in lines])
+    bulk = bench("sensor_parser.parse_lines", lambda: parse_lines(SOIL_SCHEMA, lines))
+
+    print()
+    print(f"한 줄 파싱: {base / single:.2f}x, 일괄 파싱: {base / bulk:.2f}x (기존 대비, 검증 포함)")
+
+
+if __name__ == "__main__":
+    main()
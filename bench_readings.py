@@ -0,0 +1,70 @@
+"""측정값 버퍼 메모리 비교
+
+측정값 N개(기본 1,000,000개)를 버퍼링할 때 레코드당 바이트 수를 비교합니다.
+- dict: 기존 방식 ({"address": ..., "temperature": ..., "raw": line})
+- SoilReading: __slots__ 레코드
+- ReadingBuffer: 필드별 NumPy 컬럼
+
+    py bench_readings.py [개수]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from readings import ReadingBuffer, SoilReading
+from sensor_parser import parse_soil_csv
+
+
+def make_line(i: int) -> str:
+    return f"{i % 256},{200 + i % 100},{300 + i % 500},{i % 2000},{60 + i % 30},{i % 500},{i % 300},{i % 301},{i % 302}"
+
+
+def measure(label: str, build, count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build(count)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {current / count:8.1f} bytes/reading  ({current / 1e6:8.1f} MB, {elapsed:.1f}s)")
+    del container
+    gc.collect()
+
+
+def build_dicts(count: int):
+    readings = []
+    ts = time.time()
+    for i in range(count):
+        line = make_line(i)
+        data = parse_soil_csv(line)
+        data["raw"] = line
+        data["ts"] = ts + i
+        readings.append(data)
+    return readings
+
+
+def build_records(count: int):
+    ts = time.time()
+    return [SoilReading.from_dict(parse_soil_csv(make_line(i)), ts + i) for i in range(count)]
+
+
+def build_buffer(count: int):
+    buffer = ReadingBuffer(SoilReading, capacity=count)
+    ts = time.time()
+    for i in range(count):
+        buffer.append(SoilReading.from_dict(parse_soil_csv(make_line(i)), ts + i))
+    return buffer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"=== 토양 측정값 {count:,}개 버퍼링 ===")
+    measure("dict (+raw)", build_dicts, count)
+    measure("SoilReading (__slots__)", build_records, count)
+    measure("ReadingBuffer (columns)", build_buffer, count)
+
+
+if __name__ == "__main__":
+    main()
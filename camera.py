@@ -1,37 +1,147 @@
 from pathlib import Path
 import shutil
+import threading
 import time
 import cv2
+import numpy as np
+
+from metrics import metrics
 
 IMAGE_DIR = Path("data/images")
 IMAGE_DIR.mkdir(parents=True, exist_ok=True)
 
+# 동시에 촬영하는 수 - 여러 농가(게이트웨이 모드)가 카메라를 공유하므로 한 번에 하나씩
+# (같은 카메라 중복 열기 방지, USB 대역폭 보호)
+MAX_CONCURRENT_CAPTURES = 1
+_capture_slots = threading.BoundedSemaphore(MAX_CONCURRENT_CAPTURES)
+
+
+def capture_image(filename: str, cam_index: int = 1, warmup_frames: int = 5, wait: float = None) -> str:
+    """wait: 다른 촬영이 끝나기를 기다릴 최대 시간 (초, None이면 끝까지) - 넘으면 RuntimeError"""
+    if not _capture_slots.acquire(timeout=wait):
+        raise RuntimeError(f"Camera busy (another capture still running after {wait:g}s)")
+    try:
+        return _capture(filename, cam_index, warmup_frames)
+    finally:
+        _capture_slots.release()
+
 
-def capture_image(filename: str, cam_index: int = 1, warmup_frames: int = 5) -> str:
-    cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW)
-    if not cap.isOpened():
-        raise RuntimeError(
-            f"Camera open failed (index={cam_index}). Close apps using camera and try again."
-        )
+def _capture(filename: str, cam_index: int, warmup_frames: int) -> str:
+    with metrics.span("camera.open"):
+        cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW)
+        if not cap.isOpened():
+            raise RuntimeError(
+                f"Camera open failed (index={cam_index}). Close apps using camera and try again."
+            )
 
     # warmup
-    for _ in range(warmup_frames):
-        cap.read()
-        time.sleep(0.02)
+    with metrics.span("camera.warmup"):
+        for _ in range(warmup_frames):
+            cap.read()
+            time.sleep(0.02)
 
-    ret, frame = cap.read()
-    cap.release()
-    if not ret or frame is None:
-        raise RuntimeError("Camera capture failed")
+    with metrics.span("camera.grab"):
+        ret, frame = cap.read()
+        cap.release()
+        if not ret or frame is None:
+            raise RuntimeError("Camera capture failed")
 
     path = IMAGE_DIR / filename
-    ok = cv2.imwrite(str(path), frame)
-    if not ok:
-        raise RuntimeError(f"Failed to write image: {path}")
+    with metrics.span("camera.encode"):  # JPEG 인코딩 + 파일 기록
+        ok = cv2.imwrite(str(path), frame)
+        if not ok:
+            raise RuntimeError(f"Failed to write image: {path}")
 
     return str(path)
 
 
+def grab_frames(ring, cam_index: int = 1, count: int = 3, warmup_frames: int = 5, readers: int = 1) -> list:
+    """카메라 프레임 count장을 공유 메모리 링(frame_ring.FrameRing)에 바로 캡처 (인코딩 없음)
+
+    프레임마다 슬롯 하나 - cap.read()가 슬롯 메모리에 직접 쓰므로 추가 복사가 없습니다.
+
+    Returns:
+        [FrameRef] (빈 슬롯이 없어 버린 프레임은 제외), 프레임이 슬롯보다 크면 빈 목록
+    """
+    with _capture_slots:
+        with metrics.span("camera.open"):
+            cap = cv2.VideoCapture(cam_index, cv2.CAP_DSHOW)
+            if not cap.isOpened():
+                raise RuntimeError(
+                    f"Camera open failed (index={cam_index}). Close apps using camera and try again."
+                )
+        try:
+            with metrics.span("camera.warmup"):
+                frame = None
+                for _ in range(warmup_frames):
+                    ret, frame = cap.read()
+                    time.sleep(0.02)
+                if frame is None:
+                    ret, frame = cap.read()
+                if frame is None:
+                    raise RuntimeError("Camera capture failed")
+            if frame.nbytes > ring.slot_bytes:
+                # 슬롯보다 큰 해상도 - 빈 목록을 돌려주면 호출한 쪽이 capture_image로 촬영
+                metrics.count("camera.frame_too_large")
+                return []
+
+            refs = []
+            with metrics.span("camera.grab"):
+                for _ in range(count):
+                    reserved = ring.reserve(frame.shape)
+                    if reserved is None:
+                        metrics.count("camera.frames_dropped")
+                        continue
+                    ref, buf = reserved
+                    ret, out = cap.read(buf)
+                    if not ret or out is None:
+                        ring.publish(ref, readers=0)
+                        continue
+                    if out is not buf:  # 해상도가 바뀌는 등 슬롯에 바로 쓰지 못한 경우
+                        if out.shape != buf.shape:
+                            ring.publish(ref, readers=0)
+                            continue
+                        np.copyto(buf, out)
+                    ring.publish(ref, readers)
+                    refs.append(ref)
+        finally:
+            cap.release()
+    if not refs:
+        raise RuntimeError("Camera capture failed")
+    return refs
+
+
+def sharpness(frame: np.ndarray) -> float:
+    """선명도 (회색조 라플라시안 분산 - 흔들리거나 초점이 나간 프레임일수록 작음)"""
+    gray = frame.mean(axis=2, dtype=np.float32) if frame.ndim == 3 else frame.astype(np.float32)
+    lap = (gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]) - 4 * gray[1:-1, 1:-1]
+    return float(lap.var())
+
+
+def encode_best(ring, refs: list, filename: str) -> tuple:
+    """링의 프레임 중 가장 선명한 한 장만 JPEG으로 저장 (모든 프레임의 참조 해제)
+
+    Returns:
+        (이미지 경로, 선명도)
+    """
+    best, best_score = None, -1.0
+    try:
+        with metrics.span("camera.score"):
+            for ref in refs:
+                score = sharpness(ring.view(ref))
+                if score > best_score:
+                    best, best_score = ref, score
+        path = IMAGE_DIR / filename
+        with metrics.span("camera.encode"):
+            ok = cv2.imwrite(str(path), ring.view(best))
+            if not ok:
+                raise RuntimeError(f"Failed to write image: {path}")
+    finally:
+        for ref in refs:
+            ring.release(ref)
+    return str(path), best_score
+
+
 def get_test_image(filename: str, source: str = "strawberry.jpg") -> str:
     """테스트용: 기존 이미지 파일을 복사하여 사용"""
     source_path = Path(source)
@@ -0,0 +1,82 @@
+"""USB 시리얼 장치 핫플러그 감시
+
+list_ports를 주기적으로 폴링하여 포트 분리/연결을 감지하고,
+끊긴 SerialClient만 골라서 다시 연결합니다 (프로세스 재시작 불필요).
+부팅 시 포트가 없던 센서도 끊긴 상태의 SerialClient(connect=False)로 등록해 두면 연결될 때 열립니다.
+"""
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+import serial.tools.list_ports
+
+from serial_client import SerialClient
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceWatcher:
+    """SerialClient 포트 감시 및 자동 재연결"""
+
+    def __init__(self, interval: float = 2.0, on_event: Optional[Callable[[str, str, SerialClient], None]] = None):
+        """
+        Args:
+            interval: 포트 목록 폴링 간격 (초)
+            on_event: (event: "removed" | "reconnected", name: str, client) 콜백
+        """
+        self.interval = interval
+        self.on_event = on_event
+        self.clients: Dict[str, SerialClient] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, name: str, client: SerialClient):
+        """감시 대상 등록 (name: "soil", "env" 등)"""
+        self.clients[name] = client
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="device-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def stats(self) -> dict:
+        return {name: client.stats() for name, client in self.clients.items()}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"❌ 포트 감시 오류: {e}")
+
+    def poll(self):
+        """포트 목록을 한 번 확인하고 분리/재연결 처리"""
+        present = {p.device for p in serial.tools.list_ports.comports()}
+
+        for name, client in self.clients.items():
+            if client.port not in present:
+                # 분리 감지: 다음 I/O까지 기다리지 않고 바로 끊김 처리
+                if client.down_since is None:
+                    client.mark_down()
+                    logger.warning(f"🔌 {name} 센서 분리 감지: {client.port}")
+                    self._notify("removed", name, client)
+                continue
+
+            # 포트는 있지만 끊긴 상태 (재연결, ESP32 리셋 후 I/O 실패 등)
+            if not client.connected and client.reconnect():
+                logger.info(f"🔌 {name} 센서 재연결: {client.port} (누적 {client.reconnect_count}회)")
+                self._notify("reconnected", name, client)
+
+    def _notify(self, event: str, name: str, client: SerialClient):
+        if self.on_event:
+            try:
+                self.on_event(event, name, client)
+            except Exception as e:
+                logger.error(f"❌ 포트 이벤트 콜백 오류: {e}")
@@ -0,0 +1,167 @@
+"""실시간 스트리밍 (MQTT stream_start/stream_stop 명령)
+
+현장에서 환경 센서 값을 거의 실시간으로 보기 위해 정해진 시간 동안 짧은 간격으로 측정해
+MQTT farm/{id}/stream 으로 발행합니다. 스케줄 수집과 별개로 동작하며 서로 방해하지 않습니다.
+
+    {"action": "stream_start", "interval": 1.0, "duration": 300}
+    {"action": "stream_stop"}
+
+- 간격/시간 상한: min_interval보다 짧게, max_duration보다 길게 요청하면 상한으로 조정
+- 시간이 지나면 자동 종료 (stream_start를 다시 보내면 간격/종료 시각 갱신)
+- 스케줄 수집 중이거나 다른 스레드가 시리얼 포트를 쓰고 있으면 기다리지 않고 이번 측정을 건너뜀
+- 스트리밍 값은 로컬 저장소/집계/서버 업로드에 넣지 않음 (스케줄 수집 값만 기록)
+
+발행 메시지 (fields는 시작할 때 한 번 알림):
+
+    {"seq": 12, "ts": 1760000000.25, "r": [[1, 21.5, 43.2, 612.0, 8.0]]}
+"""
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+from metrics import metrics
+from readings import Reading
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 0.5      # 최소 측정 간격 (초) - 센서/브로커 보호
+MAX_DURATION = 600.0    # 한 번에 스트리밍할 수 있는 최대 시간 (초)
+DEFAULT_INTERVAL = 1.0
+DEFAULT_DURATION = 60.0
+
+
+class LiveStream:
+    """짧은 간격 측정 → 발행 스레드 (시간 제한)"""
+
+    def __init__(
+        self,
+        read_once: Callable[[], List[Reading]],
+        publish: Callable[[dict], bool],
+        lock,
+        fields: Sequence[str],
+        busy: Callable[[], bool] = lambda: False,
+        min_interval: float = MIN_INTERVAL,
+        max_duration: float = MAX_DURATION,
+    ):
+        """
+        Args:
+            read_once: 1회 측정 (레코드 목록, 버스 모드는 주소별)
+            publish: 메시지 발행 (연결이 끊겨 있으면 False - 보관하지 않음)
+            lock: 센서 포트의 SerialClient.lock (사용 중이면 이번 측정 건너뜀)
+            fields: 레코드 값 필드 (메시지의 주소 뒤 순서)
+            busy: True이면 이번 측정 건너뜀 (스케줄 수집 중 등)
+        """
+        self.read_once = read_once
+        self.publish = publish
+        self.lock = lock
+        self.fields = tuple(fields)
+        self.busy = busy
+        self.min_interval = min_interval
+        self.max_duration = max_duration
+        self.interval = DEFAULT_INTERVAL
+        self.until = 0.0        # 종료 시각 (monotonic)
+        self.seq = 0
+        self.sent = 0
+        self.skipped = 0
+        self._failing = False
+        self.on_stop: Optional[Callable[[str, dict], None]] = None  # (사유, 통계) - 자동 종료 알림
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, interval: float = None, duration: float = None) -> dict:
+        """스트리밍 시작 (이미 진행 중이면 간격/종료 시각만 갱신)
+
+        Returns:
+            적용된 설정 {"interval", "duration", "fields"}
+        """
+        interval = max(float(interval or DEFAULT_INTERVAL), self.min_interval)
+        duration = min(max(float(duration or DEFAULT_DURATION), 0.0), self.max_duration)
+        self.interval = interval
+        self.until = time.monotonic() + duration
+        if self.active:
+            self._wake.set()  # 대기 중이면 새 간격으로 바로 다시 계산
+        else:
+            self.seq = self.sent = self.skipped = 0
+            self._stop.clear()
+            self.thread = threading.Thread(target=self._run, name="env-stream", daemon=True)
+            self.thread.start()
+        logger.info(f"📡 실시간 스트리밍 시작: {interval:g}초 간격, {duration:g}초 동안")
+        return {"interval": interval, "duration": duration, "fields": ("address",) + self.fields}
+
+    def stop(self, reason: str = "stopped") -> dict:
+        """스트리밍 종료 (진행 중이 아니면 아무것도 하지 않음)"""
+        if self.active:
+            self._stop.set()
+            self._wake.set()
+            if self.thread is not threading.current_thread():
+                self.thread.join(timeout=5)
+            logger.info(f"📡 실시간 스트리밍 종료 ({reason}): 전송 {self.sent}건, 건너뜀 {self.skipped}건")
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "interval": self.interval,
+            "remaining": max(round(self.until - time.monotonic()), 0) if self.active else 0,
+            "sent": self.sent,
+            "skipped": self.skipped,
+        }
+
+    def _sample(self):
+        # 포트를 다른 스레드가 쓰고 있으면 기다리지 않음 (스케줄 수집의 지연은 최대 1회 측정 시간)
+        if self.busy() or not self.lock.acquire(blocking=False):
+            self.skipped += 1
+            metrics.count("stream.skipped")
+            return
+        try:
+            with metrics.span("stream.sample"):
+                readings = self.read_once()
+        finally:
+            self.lock.release()
+        if not readings:
+            self.skipped += 1
+            metrics.count("stream.skipped")
+            return
+        message = {
+            "seq": self.seq,
+            "ts": round(time.time(), 2),
+            "r": [[r.address] + [getattr(r, name) for name in self.fields] for r in readings],
+        }
+        self.seq += 1
+        if self.publish(message):
+            self.sent += 1
+            metrics.count("stream.readings", len(readings))
+
+    def _run(self):
+        reason = "stopped"
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= self.until:
+                reason = "expired"
+                break
+            if now >= next_at:
+                try:
+                    self._sample()
+                    self._failing = False
+                except Exception as e:
+                    self.skipped += 1
+                    if not self._failing:  # 포트가 끊긴 동안 매 측정마다 남기지 않도록 처음 한 번만
+                        logger.warning(f"⚠️ 스트리밍 측정 실패: {e}")
+                    self._failing = True
+                # 밀린 측정은 몰아서 하지 않고 다음 간격부터
+                next_at = max(next_at + self.interval, time.monotonic())
+            self._wake.wait(min(next_at, self.until) - time.monotonic())
+            if self._wake.is_set():
+                self._wake.clear()
+                next_at = min(next_at, time.monotonic() + self.interval)
+        if reason == "expired":
+            logger.info(f"📡 실시간 스트리밍 시간 종료: 전송 {self.sent}건, 건너뜀 {self.skipped}건")
+            if self.on_stop:
+                self.on_stop(reason, dict(self.stats(), active=False, remaining=0))
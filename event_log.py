@@ -0,0 +1,104 @@
+"""구조화 이벤트 로그 (JSON Lines + 메모리 링 버퍼)
+
+event("upload", command="A", address=1, records=1) 처럼 이벤트 종류와 필드만 넘기면
+큐에 들어가고, 문자열/JSON 변환은 기록 스레드(log_setup)에서 필요할 때만 합니다.
+
+- events.jsonl: 한 줄에 하나씩 JSON (ts, mono, level, logger, event, fields 또는 msg)
+- 링 버퍼: 최근 N개의 로그/이벤트를 메모리에 보관, MQTT "logs" 명령으로 조회
+"""
+import collections
+import json
+import logging
+import threading
+import time
+from typing import List
+
+RING_SIZE = 500  # 메모리에 보관할 최근 로그 수
+
+logger = logging.getLogger("events")
+
+
+class _EventMessage:
+    """이벤트의 사람용 표시 ("event k=v ...") - 콘솔/텍스트 로그에 쓸 때만 만들어짐"""
+
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def __str__(self) -> str:
+        parts = [f"{k}={v}" for k, v in self.fields.items()]
+        return f"📌 {self.name} {' '.join(parts)}".rstrip()
+
+
+def event(name: str, /, level: int = logging.INFO, **fields):
+    """구조화 이벤트 기록 (로그 레벨이 꺼져 있으면 아무것도 만들지 않음)"""
+    if logger.isEnabledFor(level):
+        logger.log(level, _EventMessage(name, fields),
+                   extra={"event": name, "fields": fields, "mono": time.monotonic()})
+
+
+def record_to_dict(record: logging.LogRecord) -> dict:
+    data = {
+        "ts": round(record.created, 3),
+        "mono": round(getattr(record, "mono", record.relativeCreated / 1000), 3),
+        "level": record.levelname,
+        "logger": record.name,
+    }
+    if hasattr(record, "event"):
+        data["event"] = record.event
+        data["fields"] = record.fields
+    else:
+        data["event"] = "log"
+        data["msg"] = record.getMessage()
+    if record.exc_info and record.exc_info[0]:
+        data["exc"] = logging.Formatter().formatException(record.exc_info)
+    return data
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """로그 레코드 → JSON 한 줄"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record_to_dict(record), ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+class RingBufferHandler(logging.Handler):
+    """최근 로그 레코드를 메모리에 보관 (변환은 dump 할 때만)"""
+
+    def __init__(self, capacity: int = RING_SIZE):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        with self._lock:
+            self.records.append(record)
+
+    def dump(self, limit: int = None, level: str = None, name: str = None) -> List[dict]:
+        """최근 로그 (오래된 것부터)
+
+        Args:
+            limit: 최대 개수
+            level: 이 레벨 이상만 (예: "WARNING")
+            name: 이 이벤트만 (예: "upload", 일반 로그는 "log")
+        """
+        with self._lock:
+            records = list(self.records)
+        min_level = logging.getLevelName(level.upper()) if level else 0
+        if not isinstance(min_level, int):
+            min_level = 0
+        result = [
+            record_to_dict(r) for r in records
+            if r.levelno >= min_level and (name is None or getattr(r, "event", "log") == name)
+        ]
+        return result[-limit:] if limit else result
+
+
+ring = RingBufferHandler()
+
+
+def recent(limit: int = 100, level: str = None, name: str = None) -> List[dict]:
+    """링 버퍼의 최근 로그 (log_setup.setup_logging 이후에 채워짐)"""
+    return ring.dump(limit, level, name)
@@ -0,0 +1,214 @@
+"""로컬 측정 이력 내보내기 (Parquet / Arrow)
+
+장치의 시계열 저장소(data/timeseries)를 분석 도구(pandas, DuckDB, Spark 등)가 바로 읽을 수 있는
+파티션 구조로 내보냅니다. 세그먼트별 메모리 맵을 CHUNK_ROWS 행씩 잘라 쓰므로
+이력 전체를 메모리에 올리지 않습니다.
+
+    <출력>/farm=<FARM_ID>/series=soil/date=2026-10-19/part-0000065536.parquet
+    <출력>/_export_state.json    # 시리즈별 마지막으로 내보낸 행 번호 (증분 내보내기)
+
+토양 측정값에는 같은 수집에서 촬영한 이미지 경로(image 컬럼, 이미지 저장소 기준)를 함께 기록합니다.
+farms.json(게이트웨이 모드)이 있으면 농가마다 data/farms/<이름>/timeseries를 각 농가의 farm= 파티션으로 내보냅니다.
+
+    py export_history.py --out export
+    py export_history.py --out export --format arrow --series env
+    py export_history.py --out export --full      # 처음부터 다시 내보내기
+    py export_history.py --out export --farm farm-01   # farms.json의 한 농가만 (이름 또는 Farm ID)
+
+pyarrow 필요: pip install pyarrow
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from dotenv import load_dotenv
+
+from farm_config import DATA_DIR, load_farms
+from readings import make_reading_id
+from timeseries_store import TimeSeriesStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성 - 내보내기를 쓸 때만 필요
+    pa = None
+    pq = None
+
+load_dotenv()
+
+STORE_DIR = DATA_DIR / "timeseries"
+IMAGE_DIR = DATA_DIR / "images"
+FARMS_FILE = Path(os.environ.get("FARMS_FILE", Path(__file__).parent / "farms.json"))
+STATE_FILE = "_export_state.json"
+CHUNK_ROWS = 65536  # 한 번에 변환하는 최대 행 수
+SERIES = ("soil", "env")
+FARM_ID = os.environ.get("FARM_ID", "16e23f55-25aa-4cad-a9a8-91ddd32613b8")
+
+
+def load_state(out: Path) -> Dict[str, int]:
+    path = out / STATE_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(out: Path, state: Dict[str, int]):
+    tmp = out / (STATE_FILE + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, out / STATE_FILE)
+
+
+def load_image_index(image_dir: Path) -> Dict[str, str]:
+    """측정값 ID → 이미지 경로 (이미지 저장소 인덱스를 읽기만 함, 수집기 실행 중에도 안전)"""
+    path = image_dir / "index.json"
+    if not path.exists():
+        return {}
+    index = json.loads(path.read_text(encoding="utf-8"))
+    return {
+        reading_id: f"blobs/{digest[:2]}/{digest}{blob['suffix']}"
+        for digest, blob in index["blobs"].items()
+        for reading_id in blob["readings"]
+    }
+
+
+def day_bounds(ts: np.ndarray) -> List[tuple]:
+    """타임스탬프 배열(오름차순)을 현지 날짜별로 나눈 (날짜, 시작, 끝) 목록"""
+    bounds = []
+    lo = 0
+    while lo < len(ts):
+        day = time.localtime(ts[lo])
+        date = time.strftime("%Y-%m-%d", day)
+        next_day = time.mktime((day.tm_year, day.tm_mon, day.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        hi = int(np.searchsorted(ts, next_day, side="left"))
+        bounds.append((date, lo, hi))
+        lo = hi
+    return bounds
+
+
+def to_table(columns: Dict[str, np.ndarray], lo: int, hi: int, images: Dict[str, str] = None):
+    ts = columns["ts"][lo:hi]
+    arrays = {
+        # 타임스탬프는 UTC 마이크로초로 저장 (분석 도구에서 시간 타입으로 인식)
+        "ts": pa.array((ts * 1e6).astype("int64"), type=pa.timestamp("us", tz="UTC")),
+        "address": pa.array(columns["address"][lo:hi].astype(np.int16)),
+    }
+    for name, col in columns.items():
+        if name not in arrays:
+            arrays[name] = pa.array(np.asarray(col[lo:hi]))
+    if images is not None:
+        addresses = columns["address"][lo:hi].tolist()
+        arrays["image"] = pa.array(
+            [images.get(make_reading_id("A", a, t)) for t, a in zip(ts.tolist(), addresses)], type=pa.string()
+        )
+    return pa.table(arrays)
+
+
+def write_table(table, path: Path, fmt: str):
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        pq.write_table(table, tmp, compression="zstd")
+    else:
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def export_series(store: TimeSeriesStore, name: str, out: Path, farm_id: str, fmt: str, start_row: int,
+                  images: Dict[str, str] = None) -> int:
+    """시리즈 하나를 start_row 행부터 내보내기
+
+    images: 측정값 ID → 이미지 경로 (토양 시리즈만)
+
+    Returns:
+        다음 내보내기의 시작 행 번호
+    """
+    series_dir = store.root / name
+    if not (series_dir / "series.json").exists():
+        print(f"  {name}: 저장된 데이터 없음")
+        return start_row
+    series = store.open(name, [])
+    next_row = start_row
+    written = 0
+    for first_row, columns in series.slices_from_row(start_row):
+        count = len(columns["ts"])
+        for offset in range(0, count, CHUNK_ROWS):
+            chunk = {col: view[offset:offset + CHUNK_ROWS] for col, view in columns.items()}
+            ts = chunk["ts"]
+            for date, lo, hi in day_bounds(ts):
+                part_dir = out / f"farm={farm_id}" / f"series={name}" / f"date={date}"
+                part_dir.mkdir(parents=True, exist_ok=True)
+                row = first_row + offset + lo
+                write_table(to_table(chunk, lo, hi, images), part_dir / f"part-{row:010d}.{fmt}", fmt)
+                written += hi - lo
+            next_row = first_row + offset + len(ts)
+    print(f"  {name}: {written:,}행 내보냄 (행 {start_row} ~ {next_row - 1})" if written else f"  {name}: 새 데이터 없음")
+    return next_row
+
+
+def export_targets(args) -> List[tuple]:
+    """내보낼 (Farm ID, 시계열 저장소, 이미지 저장소) 목록
+
+    --store를 지정하지 않았고 farms.json이 있으면 농가별 저장소 전체 (--farm은 이름/Farm ID로 한 농가만 선택),
+    아니면 단일 농가 저장소 하나 (--farm이 파티션에 기록할 Farm ID)
+
+    Raises:
+        ValueError: farms.json 형식 오류, --farm에 해당하는 농가 없음
+    """
+    if args.store is None and FARMS_FILE.exists():
+        farms = load_farms(FARMS_FILE, DATA_DIR)
+        if args.farm:
+            farms = [f for f in farms if args.farm in (f.name, f.farm_id)]
+            if not farms:
+                raise ValueError(f"{FARMS_FILE}에 '{args.farm}' 농가가 없습니다")
+        return [(f.farm_id, f.data_dir / "timeseries", Path(args.images) if args.images else f.data_dir / "images")
+                for f in farms]
+    return [(args.farm or FARM_ID, Path(args.store or STORE_DIR), Path(args.images or IMAGE_DIR))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 측정 이력을 Parquet/Arrow로 내보내기")
+    parser.add_argument("--out", required=True, help="출력 디렉토리")
+    parser.add_argument("--farm", help="farms.json이 있으면 내보낼 농가 (이름 또는 Farm ID), "
+                                       "없으면 파티션에 기록할 Farm ID (기본: FARM_ID)")
+    parser.add_argument("--series", nargs="+", default=list(SERIES), choices=SERIES)
+    parser.add_argument("--format", default="parquet", choices=("parquet", "arrow"))
+    parser.add_argument("--store", help=f"시계열 저장소 위치 (단일 농가, 기본: {STORE_DIR})")
+    parser.add_argument("--images", help="이미지 저장소 위치 (기본: 농가 데이터 폴더의 images)")
+    parser.add_argument("--full", action="store_true", help="이전 내보내기 상태를 무시하고 처음부터")
+    args = parser.parse_args()
+
+    if pa is None:
+        print("❌ pyarrow가 설치되어 있지 않습니다: pip install pyarrow")
+        sys.exit(1)
+    try:
+        targets = export_targets(args)
+    except ValueError as e:
+        print(f"❌ 농가 설정 오류: {e}")
+        sys.exit(1)
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    state = {} if args.full else load_state(out)
+    print(f"=== 이력 내보내기 ({args.format}) → {out} ===")
+    for farm_id, store_dir, image_dir in targets:
+        if len(targets) > 1:
+            print(f"[{farm_id}] {store_dir}")
+        store = TimeSeriesStore(store_dir)
+        try:
+            for name in args.series:
+                key = f"{farm_id}/{name}/{args.format}"
+                images = load_image_index(image_dir) if name == "soil" else None
+                state[key] = export_series(store, name, out, farm_id, args.format, state.get(key, 0), images)
+                save_state(out, state)
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
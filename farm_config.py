@@ -0,0 +1,120 @@
+"""농가별 설정 (게이트웨이 모드: 한 프로세스에서 여러 농가 수집)
+
+미니PC 한 대에 여러 농가(FARM_ID)의 센서가 연결된 경우 farms.json에 농가 목록을 적으면
+프로세스 하나가 MQTT 연결 하나, 카메라/업로드 자원을 공유하면서 모든 농가를 수집합니다.
+파일이 없으면 기존처럼 .env의 FARM_ID 하나만 수집합니다.
+
+    [
+      {"name": "spot1", "farm_id": "16e23f55-...", "organization_id": "00703f64-...",
+       "api_key_soil": "sk_...", "api_key_plant": "sk_...",
+       "soil_port": "COM3", "env_port": "COM4", "cam_index": 0},
+      {"name": "spot2", "farm_id": "2ed9ee6d-...", "api_key_soil": "sk_...",
+       "soil_port": "COM5", "env_port": "COM6", "cam_index": 1, "soil_bus_addresses": "1-4",
+       "net_nodes": ["B@192.168.0.21:4001", "B@192.168.0.22:4001/1-4"]}
+    ]
+
+- name: 로그/메트릭/로컬 저장 폴더(data/farms/<name>)에 쓰는 짧은 이름 (기본: farm_id 앞 8자리)
+- organization_id를 생략하면 첫 번째 농가의 값을 사용 (스케줄 구독)
+- net_nodes: TCP 브리지로 연결된 네트워크 센서 노드 (net_sensor 참고, USB 센서와 함께 수집)
+- 수집 스케줄(start_time, end_time, interval_minutes)은 농가별로 서버에서 받아 갱신
+"""
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from net_sensor import parse_nodes
+from sensor_bus import parse_addresses
+
+DATA_DIR = Path(__file__).parent / "data"
+
+# 수집 스케줄 기본값 (서버에서 MQTT/API로 변경)
+DEFAULT_START_TIME = "00:00"
+DEFAULT_END_TIME = "23:59"
+DEFAULT_INTERVAL_MINUTES = 240
+
+
+@dataclass
+class FarmConfig:
+    """농가 하나의 수집 설정 (SensorCollector가 사용)"""
+
+    farm_id: str
+    name: str = ""
+    organization_id: str = ""
+    api_key_soil: str = ""
+    api_key_plant: str = ""
+    soil_port: Optional[str] = None
+    env_port: Optional[str] = None
+    cam_index: int = 0
+    soil_bus_addresses: List[int] = field(default_factory=list)
+    env_bus_addresses: List[int] = field(default_factory=list)
+    net_nodes: str = ""  # 네트워크 센서 노드 ("A@host:port B@host:port/1-4")
+    data_dir: Path = DATA_DIR
+    # 수집 스케줄 (서버에서 변경)
+    start_time: str = DEFAULT_START_TIME
+    end_time: str = DEFAULT_END_TIME
+    interval_minutes: int = DEFAULT_INTERVAL_MINUTES
+
+    def __post_init__(self):
+        self.name = self.name or self.farm_id[:8]
+
+    def api_key(self, command: str) -> str:
+        """명령(A: 토양, B: 식물)별 API 키"""
+        return self.api_key_soil if command.upper() == "A" else self.api_key_plant
+
+    def schedule(self) -> dict:
+        return {"start_time": self.start_time, "end_time": self.end_time,
+                "interval_minutes": self.interval_minutes}
+
+
+def _addresses(value) -> List[int]:
+    if isinstance(value, list):
+        return [int(v) for v in value]
+    return parse_addresses(str(value or ""))
+
+
+def _nodes(value) -> str:
+    if isinstance(value, list):
+        value = " ".join(value)
+    value = str(value or "")
+    parse_nodes(value)  # 형식 오류는 시작할 때 ValueError
+    return value
+
+
+def load_farms(path: Path, data_dir: Path = DATA_DIR) -> List[FarmConfig]:
+    """farms.json 읽기
+
+    Raises:
+        ValueError: farm_id가 없거나 name/farm_id가 중복된 경우, 노드 형식 오류
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: 농가 목록(JSON 배열)이 비어 있습니다")
+
+    farms = []
+    for entry in entries:
+        if not entry.get("farm_id"):
+            raise ValueError(f"{path}: farm_id가 없는 농가가 있습니다: {entry}")
+        config = FarmConfig(
+            farm_id=entry["farm_id"],
+            name=entry.get("name", ""),
+            organization_id=entry.get("organization_id") or (farms[0].organization_id if farms else ""),
+            api_key_soil=entry.get("api_key_soil", ""),
+            api_key_plant=entry.get("api_key_plant", ""),
+            soil_port=entry.get("soil_port"),
+            env_port=entry.get("env_port"),
+            cam_index=int(entry.get("cam_index", 0)),
+            soil_bus_addresses=_addresses(entry.get("soil_bus_addresses")),
+            env_bus_addresses=_addresses(entry.get("env_bus_addresses")),
+            net_nodes=_nodes(entry.get("net_nodes")),
+        )
+        config.data_dir = data_dir / "farms" / config.name
+        farms.append(config)
+
+    for attr in ("name", "farm_id"):
+        values = [getattr(c, attr) for c in farms]
+        duplicates = sorted({v for v in values if values.count(v) > 1})
+        if duplicates:
+            raise ValueError(f"{path}: 중복된 {attr}: {duplicates}")
+    return farms
@@ -0,0 +1,231 @@
+"""바이너리 센서 프레임 코덱 (CSV와 병행)
+
+ESP32 응답을 CSV 대신 길이 접두사 + 고정소수점 필드 + CRC16 프레임으로 받습니다.
+깨진 바이트는 CRC로 걸러지고, 9600 baud에서 CSV보다 적은 바이트로 전송됩니다.
+
+프레임 형식 (little-endian):
+    SYNC(0xA5) | LEN(1) | TYPE('A'/'B', 1) | ADDRESS(1) | 필드(int16/uint16 x N) | CRC16(2)
+
+- LEN: TYPE부터 필드 끝까지의 바이트 수
+- CRC16: Modbus CRC16 (poly 0xA001, init 0xFFFF), LEN부터 필드 끝까지
+- 필드 값 = 실제 값 x 배율 (SOIL_FIELDS / ENV_FIELDS 참고)
+- 디코딩한 값도 CSV와 같은 스키마 허용 범위(SOIL_SCHEMA / ENV_SCHEMA)로 검사
+
+협상: "F" 명령에 펌웨어가 "FRAME OK"로 응답하면 프레임 모드, 아니면 CSV 유지.
+"""
+import struct
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from metrics import metrics
+from sensor_parser import ENV_SCHEMA, SOIL_SCHEMA
+
+SYNC = 0xA5
+NEGOTIATE_COMMAND = "F"
+NEGOTIATE_ACK = "FRAME OK"
+
+# (필드명, struct 코드, 고정소수점 배율) - 디코딩 값은 parse_*_csv 결과와 같은 단위
+SOIL_FIELDS = (
+    ("temperature", "h", 10),
+    ("humidity", "H", 10),
+    ("ec", "H", 1),
+    ("ph", "H", 1),
+    ("salt", "H", 1),
+    ("n", "H", 1),
+    ("p", "H", 1),
+    ("k", "H", 1),
+)
+ENV_FIELDS = (
+    ("temperature", "h", 10),
+    ("humidity", "H", 10),
+    ("ch2o", "H", 1),
+    ("tvoc", "H", 1),
+    ("pm25", "H", 1),
+    ("pm10", "H", 1),
+    ("co2", "H", 1),
+)
+FRAME_FIELDS = {"A": SOIL_FIELDS, "B": ENV_FIELDS}
+
+# 명령별 (필드명, 최솟값, 최댓값) - CSV 파싱과 같은 스키마 범위 (범위가 없는 필드는 제외)
+FRAME_LIMITS = {
+    command: tuple(
+        (f.name, -np.inf if f.min is None else f.min, np.inf if f.max is None else f.max)
+        for f in schema.fields if f.name is not None and (f.min is not None or f.max is not None)
+    )
+    for command, schema in (("A", SOIL_SCHEMA), ("B", ENV_SCHEMA))
+}
+
+
+class FrameError(ValueError):
+    """프레임 길이/CRC/형식 오류"""
+
+
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+_CRC_TABLE_NP = np.array(_CRC_TABLE, dtype=np.uint16)
+
+
+def crc16(data: bytes) -> int:
+    """Modbus CRC16"""
+    crc = 0xFFFF
+    for b in data:
+        crc = (crc >> 8) ^ _CRC_TABLE[(crc ^ b) & 0xFF]
+    return crc
+
+
+def _payload_struct(command: str) -> struct.Struct:
+    fields = FRAME_FIELDS[command]
+    return struct.Struct("<cB" + "".join(code for _, code, _ in fields))
+
+
+_PAYLOAD_STRUCTS = {cmd: _payload_struct(cmd) for cmd in FRAME_FIELDS}
+
+
+def frame_size(command: str) -> int:
+    """SYNC부터 CRC까지 전체 프레임 바이트 수"""
+    return 2 + _PAYLOAD_STRUCTS[command].size + 2
+
+
+def encode_frame(command: str, address: int, values: Dict[str, float]) -> bytes:
+    """프레임 인코딩 (펌웨어 참조 구현 및 테스트용)"""
+    fields = FRAME_FIELDS[command]
+    raw = [int(round(values[name] * scale)) for name, _, scale in fields]
+    payload = _PAYLOAD_STRUCTS[command].pack(command.encode(), address, *raw)
+    body = bytes([len(payload)]) + payload
+    return bytes([SYNC]) + body + struct.pack("<H", crc16(body))
+
+
+def decode_frame(frame: bytes) -> dict:
+    """프레임 한 개 디코딩 및 검증
+
+    Returns:
+        parse_soil_csv / parse_env_csv 와 같은 형식의 dict
+    """
+    if len(frame) < 6 or frame[0] != SYNC:
+        raise FrameError(f"Invalid frame header: {frame[:2].hex()}")
+    length = frame[1]
+    if len(frame) != length + 4:
+        raise FrameError(f"Frame length mismatch: LEN={length}, got {len(frame)} bytes")
+
+    body = frame[1:-2]
+    (crc,) = struct.unpack_from("<H", frame, len(frame) - 2)
+    if crc16(body) != crc:
+        raise FrameError(f"CRC mismatch: {frame.hex()}")
+
+    command = chr(frame[2])
+    if command not in FRAME_FIELDS:
+        raise FrameError(f"Unknown frame type: {command!r}")
+    payload_struct = _PAYLOAD_STRUCTS[command]
+    if length != payload_struct.size:
+        raise FrameError(f"Unexpected payload size for {command}: {length}")
+
+    _, address, *raw = payload_struct.unpack_from(frame, 2)
+    data = {"address": address}
+    for (name, _, scale), value in zip(FRAME_FIELDS[command], raw):
+        data[name] = value / scale
+    for name, low, high in FRAME_LIMITS[command]:
+        if not low <= data[name] <= high:
+            raise FrameError(f"Value out of range: {name}={data[name]} ({frame.hex()})")
+    return data
+
+
+def read_frame(client, timeout: float = None) -> dict:
+    """SerialClient에서 프레임 한 개 수신 (SYNC 전의 잡음 바이트는 건너뜀)"""
+    with client.lock:
+        while True:
+            b = client.read_bytes(1, timeout)
+            if not b:
+                raise FrameError("Frame timeout")
+            if b[0] == SYNC:
+                break
+        header = client.read_bytes(1, timeout)
+        if not header:
+            raise FrameError("Frame timeout")
+        rest = client.read_bytes(header[0] + 2, timeout)
+        return decode_frame(bytes([SYNC]) + header + rest)
+
+
+def negotiate(client, timeout: float = 1.0) -> bool:
+    """프레임 모드 협상 - 지원하지 않는 펌웨어는 CSV로 유지
+
+    Returns:
+        True if the device switched to binary frames
+    """
+    with client.lock:
+        client.send(NEGOTIATE_COMMAND)
+        ack = client.receive(timeout=timeout)
+        client.protocol = "frame" if ack == NEGOTIATE_ACK else "csv"
+        if client.protocol == "csv":
+            # 구형 펌웨어가 "F"에 대해 보낸 응답이 남아있으면 비움
+            client.read_bytes(4096, 0.1)
+        return client.protocol == "frame"
+
+
+def query_reading(client, command: str, parse_csv: Callable[[str], dict], use_frames: bool = False) -> dict:
+    """명령 전송 후 측정값 한 개 수신 (프레임/CSV 자동 선택)
+
+    Returns:
+        파싱된 dict, 응답이 없으면 None
+    """
+    with client.lock:
+        if use_frames and client.protocol is None:
+            negotiate(client)
+        if client.protocol == "frame":
+            with metrics.span("serial.roundtrip"):
+                client.send(command)
+                return read_frame(client)
+        line = client.query(command)
+        return parse_csv(line) if line else None
+
+
+def frame_dtype(command: str) -> np.dtype:
+    """연속된 프레임 버퍼를 한 번에 해석하기 위한 NumPy dtype"""
+    fields = [("sync", "u1"), ("len", "u1"), ("type", "u1"), ("address", "u1")]
+    for name, code, _ in FRAME_FIELDS[command]:
+        fields.append((name, "<i2" if code == "h" else "<u2"))
+    fields.append(("crc", "<u2"))
+    return np.dtype(fields)
+
+
+def decode_frames(buffer: bytes, command: str) -> Tuple[np.ndarray, np.ndarray]:
+    """같은 종류의 프레임이 연속된 버퍼를 한 번에 디코딩 (벡터화 CRC 검증)
+
+    Returns:
+        (values, valid): values는 address + 각 필드(float64, 배율 적용)의 구조화 배열,
+        valid는 SYNC/LEN/TYPE/CRC/스키마 범위 검증 결과 불리언 마스크
+    """
+    dtype = frame_dtype(command)
+    count = len(buffer) // dtype.itemsize
+    frames = np.frombuffer(buffer, dtype=dtype, count=count)
+
+    # 프레임별 CRC: 바이트 열 단위로 테이블 조회를 모든 프레임에 동시에 적용
+    raw = np.frombuffer(buffer, dtype=np.uint8, count=count * dtype.itemsize).reshape(count, dtype.itemsize)
+    crc = np.full(count, 0xFFFF, dtype=np.uint16)
+    for col in range(1, dtype.itemsize - 2):
+        crc = (crc >> 8) ^ _CRC_TABLE_NP[(crc ^ raw[:, col]) & 0xFF]
+
+    valid = (
+        (frames["sync"] == SYNC)
+        & (frames["len"] == _PAYLOAD_STRUCTS[command].size)
+        & (frames["type"] == ord(command))
+        & (frames["crc"] == crc)
+    )
+
+    out_fields = [("address", "u1")] + [(name, "f8") for name, _, _ in FRAME_FIELDS[command]]
+    values = np.empty(count, dtype=out_fields)
+    values["address"] = frames["address"]
+    for name, _, scale in FRAME_FIELDS[command]:
+        values[name] = frames[name] / scale
+    for name, low, high in FRAME_LIMITS[command]:
+        valid &= (values[name] >= low) & (values[name] <= high)
+    return values, valid
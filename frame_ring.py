@@ -0,0 +1,207 @@
+"""공유 메모리 프레임 링 (카메라 프레임을 프로세스 간 복사 없이 전달)
+
+카메라 작업 프로세스가 프레임을 공유 메모리 슬롯에 한 번만 쓰고, 다른 프로세스(인코더, 선명도 평가 등)는
+슬롯 번호(FrameRef)만 큐로 받아 같은 메모리를 읽기 전용 ndarray로 봅니다.
+pickle한 ndarray나 임시 JPEG 파일로 넘길 때의 복사/디스크 기록이 없습니다 (bench_frames.py 참고).
+
+    ring = FrameRing(slots=4, max_shape=(1080, 1920, 3))       # 소유 프로세스 (종료 시 unlink)
+    ref, buf = ring.reserve((h, w, 3)); cap.read(buf); ring.publish(ref, readers=2)
+    other = FrameRing.attach(ring.spec())                       # 다른 프로세스 (spec은 pickle 가능)
+    with other.frame(ref) as img: ...                           # 다 읽으면 참조 해제
+
+- 슬롯마다 참조 수: publish할 때 readers개, 각 소비자가 release하면 1씩 감소 → 0이면 다시 쓸 수 있음
+- 슬롯이 모두 사용 중이면 reserve()는 None (프레임 버림) - 소비자가 죽어서 stale_after보다 오래
+  해제되지 않은 슬롯은 회수
+- 재사용된 슬롯의 오래된 FrameRef로 읽으면 ValueError (seq로 확인)
+- 헤더 갱신은 multiprocessing.Lock으로 보호 (프레임 데이터 읽기/쓰기는 잠금 없음)
+- attach는 소유 프로세스가 시작한 작업 프로세스에서 (resource_tracker를 공유해야 소유 프로세스만 삭제)
+"""
+import logging
+import time
+from contextlib import contextmanager
+from multiprocessing import get_context, shared_memory
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = 60.0  # 이 시간(초)이 지나도 해제되지 않은 슬롯은 회수 (소비자 프로세스 종료 등)
+
+# 슬롯 상태
+FREE, WRITING, READY = 0, 1, 2
+
+_HEADER_DTYPE = np.dtype([
+    ("state", "<i4"), ("refs", "<i4"), ("seq", "<i8"), ("ts", "<f8"),
+    ("height", "<i4"), ("width", "<i4"), ("channels", "<i4"), ("reserved", "<i4"),
+])
+_DATA_OFFSET = 4096  # 헤더 영역 (슬롯 100개 정도까지), 프레임 데이터는 페이지 경계부터
+
+
+class FrameRef(NamedTuple):
+    """큐로 보내는 프레임 핸들 (슬롯 번호 + 쓰기 순번)"""
+    slot: int
+    seq: int
+
+
+class FrameRing:
+    """공유 메모리 프레임 슬롯 링 (uint8 프레임, 참조 수 관리)"""
+
+    def __init__(self, slots: int = 4, max_shape: Tuple[int, ...] = (1080, 1920, 3),
+                 stale_after: float = STALE_AFTER, _attach: dict = None):
+        """
+        Args:
+            slots: 슬롯 수 (동시에 처리 중일 수 있는 프레임 수)
+            max_shape: 가장 큰 프레임 크기 (슬롯 크기) - 더 작은 프레임은 앞부분만 사용
+            stale_after: 해제되지 않은 슬롯을 회수하기까지의 시간 (초)
+        """
+        if _attach:
+            self.slots = _attach["slots"]
+            self.slot_bytes = _attach["slot_bytes"]
+            self.lock = _attach["lock"]
+            self.stale_after = _attach["stale_after"]
+            self.shm = shared_memory.SharedMemory(name=_attach["name"])
+            self.owner = False
+        else:
+            self.slots = slots
+            self.slot_bytes = int(np.prod(max_shape))
+            self.lock = get_context("spawn").Lock()
+            self.stale_after = stale_after
+            if slots * _HEADER_DTYPE.itemsize + 8 > _DATA_OFFSET:
+                raise ValueError(f"슬롯이 너무 많습니다: {slots}")
+            self.shm = shared_memory.SharedMemory(create=True, size=_DATA_OFFSET + slots * self.slot_bytes)
+            self.owner = True
+        self.header = np.ndarray((self.slots,), dtype=_HEADER_DTYPE, buffer=self.shm.buf, offset=8)
+        self._seq = np.ndarray((1,), dtype="<i8", buffer=self.shm.buf)  # 마지막 쓰기 순번 (모든 프로세스 공유)
+        if self.owner:
+            self.header[:] = 0
+            self._seq[0] = 0
+        self.dropped = 0
+        self.reclaimed = 0
+
+    @classmethod
+    def attach(cls, spec: dict) -> "FrameRing":
+        """다른 프로세스에서 만든 링 열기 (spec: 소유 프로세스의 ring.spec())"""
+        return cls(_attach=spec)
+
+    def spec(self) -> dict:
+        """다른 프로세스로 넘길 링 정보 (작업 프로세스 setup 인자로 전달 - 잠금 포함)"""
+        return {"name": self.shm.name, "slots": self.slots, "slot_bytes": self.slot_bytes,
+                "lock": self.lock, "stale_after": self.stale_after}
+
+    def _data(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=_DATA_OFFSET + slot * self.slot_bytes)
+
+    def reserve(self, shape: Tuple[int, ...]) -> Optional[Tuple[FrameRef, np.ndarray]]:
+        """빈 슬롯을 쓰기용으로 잡고 (FrameRef, 쓰기 가능한 view) 반환 - 빈 슬롯이 없으면 None
+
+        가장 오래된 빈 슬롯을 사용하므로 최근 프레임이 가능한 한 오래 남습니다.
+        """
+        if int(np.prod(shape)) > self.slot_bytes:
+            raise ValueError(f"프레임이 슬롯보다 큽니다: {shape} > {self.slot_bytes} bytes")
+        now = time.time()
+        with self.lock:
+            header = self.header
+            free = np.flatnonzero(header["state"] == FREE)
+            if not len(free):
+                # 소비자가 해제하지 못한 채 종료된 슬롯 회수 (쓰는 중이던 슬롯 포함)
+                stale = np.flatnonzero((header["state"] != FREE) & (now - header["ts"] > self.stale_after))
+                if len(stale):
+                    header["state"][stale] = FREE
+                    header["refs"][stale] = 0
+                    self.reclaimed += len(stale)
+                    logger.warning(f"⚠️ 프레임 슬롯 {len(stale)}개 회수 ({self.stale_after:.0f}초 동안 해제되지 않음)")
+                    free = stale
+            if not len(free):
+                self.dropped += 1
+                return None
+            slot = int(free[np.argmin(header["seq"][free])])
+            self._seq[0] += 1
+            seq = int(self._seq[0])
+            entry = header[slot]
+            entry["state"], entry["refs"], entry["seq"], entry["ts"] = WRITING, 0, seq, now
+            entry["height"] = shape[0]
+            entry["width"] = shape[1] if len(shape) > 1 else 1
+            entry["channels"] = shape[2] if len(shape) > 2 else 1
+        return FrameRef(slot, seq), self._data(slot, shape)
+
+    def publish(self, ref: FrameRef, readers: int = 1, ts: float = None):
+        """쓰기 완료 → 소비자 readers명이 읽을 수 있음 (readers가 0이면 바로 비움)"""
+        with self.lock:
+            entry = self.header[ref.slot]
+            if entry["seq"] != ref.seq or entry["state"] != WRITING:
+                raise ValueError(f"쓰기 중인 슬롯이 아닙니다: {ref}")
+            entry["refs"] = readers
+            entry["ts"] = ts or time.time()
+            entry["state"] = READY if readers > 0 else FREE
+
+    def write(self, frame: np.ndarray, readers: int = 1) -> Optional[FrameRef]:
+        """프레임을 슬롯에 복사해 게시 (이미 다른 곳에 있는 프레임용 - 캡처는 reserve()로 바로 쓰기)"""
+        reserved = self.reserve(frame.shape)
+        if reserved is None:
+            return None
+        ref, buf = reserved
+        np.copyto(buf, frame, casting="unsafe")
+        self.publish(ref, readers)
+        return ref
+
+    def view(self, ref: FrameRef) -> np.ndarray:
+        """게시된 프레임의 읽기 전용 view (복사 없음)
+
+        Raises:
+            ValueError: 슬롯이 이미 해제/재사용된 경우
+        """
+        with self.lock:
+            entry = self.header[ref.slot]
+            if entry["seq"] != ref.seq or entry["state"] != READY:
+                raise ValueError(f"프레임이 이미 해제되었거나 재사용되었습니다: {ref}")
+            shape = (int(entry["height"]), int(entry["width"]), int(entry["channels"]))
+        if shape[2] == 1:
+            shape = shape[:2]
+        data = self._data(ref.slot, shape)
+        data.flags.writeable = False
+        return data
+
+    def release(self, ref: FrameRef):
+        """소비자 한 명이 다 읽음 (참조 수가 0이 되면 슬롯을 다시 쓸 수 있음)"""
+        with self.lock:
+            entry = self.header[ref.slot]
+            if entry["seq"] != ref.seq or entry["state"] != READY:
+                return  # 이미 회수된 슬롯
+            entry["refs"] -= 1
+            if entry["refs"] <= 0:
+                entry["state"] = FREE
+
+    @contextmanager
+    def frame(self, ref: FrameRef):
+        """with ring.frame(ref) as img: ... - 블록이 끝나면 release()"""
+        try:
+            yield self.view(ref)
+        finally:
+            self.release(ref)
+
+    def stats(self) -> dict:
+        with self.lock:
+            states = self.header["state"].copy()
+        return {
+            "slots": self.slots,
+            "in_use": int((states != FREE).sum()),
+            "written": int(self._seq[0]),
+            "dropped": self.dropped,
+            "reclaimed": self.reclaimed,
+        }
+
+    def close(self):
+        """이 프로세스의 매핑 해제 (소유 프로세스는 공유 메모리도 삭제)"""
+        # 공유 메모리를 가리키는 배열을 먼저 놓아야 매핑을 닫을 수 있음
+        self.header = self._seq = None
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning("⚠️ 프레임 링: 아직 사용 중인 view가 있어 매핑을 닫지 못했습니다")
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
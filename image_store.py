@@ -0,0 +1,305 @@
+"""이미지 저장소 (내용 주소 방식, 보존 기간 / 용량 제한)
+
+촬영한 이미지를 SHA-256 해시 이름의 파일(blob)로 저장하고, 측정값 ID → 해시 인덱스를 유지합니다.
+같은 이미지(테스트 모드의 strawberry.jpg 등)는 한 번만 저장됩니다.
+
+    data/images/
+        index.json                  # blob 목록 + 측정값 ID 매핑 (원자적 교체)
+        blobs/ab/ab12...ef.jpg      # 해시 앞 2자리로 디렉토리 분산
+
+- 용량(max_bytes) 초과 시 가장 오래 사용하지 않은 blob부터 삭제 (LRU)
+- 보존 기간(max_age_days)이 지난 blob 삭제
+- 업로드 대기 중(pending)인 측정값이 하나라도 가리키는 blob은 삭제하지 않음 - 업로드가 끝나면(실패 포함)
+  측정값별로 release(), 중간에 꺼져서 남은 표시는 pending_ttl이 지나면 만료
+- index.json은 변경 후 save_interval마다 한 번만 기록 (종료 시 flush()) - 기록 전에 꺼지면 디스크의 blob으로
+  목록을 다시 만들고 측정값 연결만 잃음
+- blob 하나에 연결하는 측정값 ID는 max_readings개까지 (테스트 이미지처럼 계속 재사용되는 blob은 오래된 것부터 정리)
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DIR = Path("data/images")
+MAX_BYTES = 2 * 1024 ** 3   # 2GB
+MAX_AGE_DAYS = 30
+PENDING_TTL = 86400  # 업로드 대기 표시 만료 (초) - release 없이 남은 표시가 용량 제한을 막지 않도록
+SAVE_INTERVAL = 60   # index.json 기록 간격 (초)
+MAX_READINGS = 1000  # blob 하나에 연결하는 측정값 ID 최대 개수
+HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def git_tracked(directory: Path) -> set:
+    """디렉토리 안에서 git이 추적하는 파일 이름 (git 저장소가 아니거나 git이 없으면 빈 집합)"""
+    try:
+        out = subprocess.run(["git", "ls-files", "-z", "."], cwd=directory, capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    if out.returncode != 0:
+        return set()
+    return {name for name in out.stdout.decode("utf-8", "replace").split("\0") if name}
+
+
+class ImageStore:
+    """내용 주소 방식 이미지 저장소"""
+
+    def __init__(self, root: Path = IMAGE_DIR, max_bytes: int = MAX_BYTES, max_age_days: float = MAX_AGE_DAYS,
+                 pending_ttl: float = PENDING_TTL, save_interval: float = SAVE_INTERVAL,
+                 max_readings: int = MAX_READINGS):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.pending_ttl = pending_ttl
+        self.save_interval = save_interval
+        self.max_readings = max_readings
+        self.dirty = False
+        self.saved_at = 0.0
+        self.lock = threading.RLock()
+        self.index_file = self.root / "index.json"
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+
+        # 해시 → {"size", "created", "used", "suffix", "readings": [측정값 ID]}
+        # 사용 순서 (앞쪽이 가장 오래 전에 사용) - 삭제 후보를 O(1)로 찾기 위해 OrderedDict
+        self.blobs: "OrderedDict[str, dict]" = OrderedDict()
+        self.readings: Dict[str, str] = {}   # 측정값 ID → 해시
+        self.pending: Dict[str, float] = {}   # 업로드 대기 중인 측정값 ID → 만료 시각
+        self.total_bytes = 0
+        self.evicted = 0
+        self._load()
+
+    def _load(self):
+        if self.index_file.exists():
+            try:
+                index = json.loads(self.index_file.read_text(encoding="utf-8"))
+                blobs = sorted(index["blobs"].items(), key=lambda item: item[1]["used"])
+                self.blobs = OrderedDict(blobs)
+                pending = index.get("pending", {})
+                if isinstance(pending, list):
+                    # 이전 형식 (해시 목록) - 그 blob의 측정값을 지금부터 만료 시간까지 대기로 표시
+                    expires = time.time() + self.pending_ttl
+                    pending = {reading_id: expires for digest in pending if digest in self.blobs
+                               for reading_id in self.blobs[digest]["readings"]}
+                self.pending = dict(pending)
+            except (ValueError, KeyError) as e:
+                logger.warning(f"⚠️ 이미지 인덱스 손상, 다시 구성합니다: {e}")
+                self.blobs = OrderedDict()
+
+        # 저장 중에 꺼져서 남은 임시 파일 삭제
+        for tmp in self.blob_dir.glob("*/*.tmp"):
+            tmp.unlink()
+
+        # 인덱스 기록 전에 꺼져서 빠진 blob, 파일이 없어진 항목 정리
+        on_disk = {p.stem: p for p in self.blob_dir.glob("*/*")}
+        for digest in [d for d in self.blobs if d not in on_disk]:
+            del self.blobs[digest]
+        for digest, path in on_disk.items():
+            if digest not in self.blobs:
+                stat = path.stat()
+                self.blobs[digest] = {"size": stat.st_size, "created": stat.st_mtime,
+                                      "used": stat.st_mtime, "suffix": path.suffix, "readings": []}
+                self.blobs.move_to_end(digest, last=False)
+
+        for digest, blob in self.blobs.items():
+            for reading_id in blob["readings"]:
+                self.readings[reading_id] = digest
+        self.pending = {r: expires for r, expires in self.pending.items() if r in self.readings}
+        for digest in self.blobs:
+            self._compact(digest)
+        self.total_bytes = sum(blob["size"] for blob in self.blobs.values())
+
+        # 기존 방식(data/images/farm_<ts>.jpg)으로 쌓인 파일을 저장소로 옮김
+        # - git이 추적하는 파일(저장소에 포함된 예시 이미지)은 그대로 둠 (옮기면 작업 트리가 바뀜)
+        tracked = git_tracked(self.root)
+        legacy = sorted(p for p in self.root.glob("*.jpg") if p.name not in tracked)
+        for path in legacy:
+            self.put_file(path, move=True, pending=False)
+        if legacy:
+            logger.info(f"📦 기존 이미지 {len(legacy)}개를 저장소로 이동 (중복 제외 {len(self.blobs)}개)")
+        self._save()
+
+    def _changed(self, now: float):
+        """인덱스 변경 표시 - 마지막 기록 후 save_interval이 지났으면 바로 기록"""
+        self.dirty = True
+        if now - self.saved_at >= self.save_interval:
+            self._save()
+
+    def flush(self):
+        """기록하지 않은 인덱스 변경을 바로 기록 (종료 시 호출)"""
+        with self.lock:
+            if self.dirty:
+                self._save()
+
+    def _save(self):
+        self.dirty = False
+        self.saved_at = time.time()
+        index = {"blobs": self.blobs, "pending": self.pending}
+        tmp = self.index_file.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_file)
+
+    def _blob_path(self, digest: str, suffix: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}{suffix}"
+
+    def put_file(self, path, reading_ids: Iterable[str] = (), move: bool = False, pending: bool = True) -> Path:
+        """이미지 파일 저장
+
+        Args:
+            path: 원본 파일
+            reading_ids: 이 이미지와 연결할 측정값 ID
+            move: True면 원본을 저장소로 이동 (촬영 파일), False면 복사 (테스트 이미지)
+            pending: reading_ids를 업로드 대기로 표시 (release() 또는 만료 전까지 삭제되지 않음)
+
+        Returns:
+            저장소 안의 파일 경로
+        """
+        path = Path(path)
+        digest = file_digest(path)
+        now = time.time()
+        with self.lock:
+            blob = self.blobs.get(digest)
+            if blob is None:
+                target = self._blob_path(digest, path.suffix)
+                target.parent.mkdir(exist_ok=True)
+                tmp = target.with_name(target.name + ".tmp")
+                if move:
+                    shutil.move(str(path), str(tmp))
+                else:
+                    shutil.copyfile(path, tmp)
+                os.replace(tmp, target)
+                blob = self.blobs[digest] = {"size": target.stat().st_size, "created": now,
+                                             "used": now, "suffix": path.suffix, "readings": []}
+                self.total_bytes += blob["size"]
+            else:
+                # 이미 있는 이미지 - 내용이 같으므로 원본만 정리
+                if move:
+                    path.unlink()
+                blob["used"] = now
+                self.blobs.move_to_end(digest)
+            expires = now + self.pending_ttl
+            for reading_id in reading_ids:
+                self._link(reading_id, digest)
+                if pending:
+                    self.pending[reading_id] = expires
+            self._compact(digest)
+            self._changed(now)
+            return self._blob_path(digest, blob["suffix"])
+
+    def _link(self, reading_id: str, digest: str):
+        old = self.readings.get(reading_id)
+        if old == digest:
+            return
+        if old is not None:
+            self.blobs[old]["readings"].remove(reading_id)
+        self.readings[reading_id] = digest
+        self.blobs[digest]["readings"].append(reading_id)
+
+    def _compact(self, digest: str):
+        """blob의 측정값 ID가 max_readings를 넘으면 업로드 대기 중이 아닌 오래된 것부터 연결 해제"""
+        readings = self.blobs[digest]["readings"]
+        excess = len(readings) - self.max_readings
+        if excess <= 0:
+            return
+        dropped = [r for r in readings if r not in self.pending][:excess]
+        for reading_id in dropped:
+            del self.readings[reading_id]
+        dropped = set(dropped)
+        readings[:] = [r for r in readings if r not in dropped]
+
+    def get(self, reading_id: str) -> Optional[Path]:
+        """측정값 ID로 이미지 경로 조회 (없거나 삭제되었으면 None)"""
+        with self.lock:
+            digest = self.readings.get(reading_id)
+            if digest is None:
+                return None
+            blob = self.blobs[digest]
+            blob["used"] = time.time()  # 사용 시각은 다음 저장 때 함께 기록
+            self.blobs.move_to_end(digest)
+            return self._blob_path(digest, blob["suffix"])
+
+    def release(self, *reading_ids: str):
+        """업로드 끝남 (성공/실패) - 측정값의 삭제 보호 해제 (같은 이미지를 가리키는 다른 측정값은 그대로)"""
+        with self.lock:
+            released = [r for r in reading_ids if self.pending.pop(r, None) is not None]
+            if released:
+                self._changed(time.time())
+
+    def _pinned(self, now: float) -> set:
+        """업로드 대기 중인 측정값이 가리키는 해시 (만료된 표시는 정리)"""
+        expired = [r for r, expires in self.pending.items() if expires <= now]
+        for reading_id in expired:
+            del self.pending[reading_id]
+        if expired:
+            logger.warning(f"⚠️ 업로드 대기 표시 {len(expired)}개 만료 (release 없이 {self.pending_ttl / 3600:.1f}시간 경과)")
+        return {self.readings[r] for r in self.pending}
+
+    def evict(self, now: float = None) -> int:
+        """보존 기간이 지났거나 용량을 넘는 blob 삭제 (업로드 대기 중인 blob 제외)
+
+        Returns:
+            삭제한 blob 수
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self.lock:
+            pending = len(self.pending)
+            pinned = self._pinned(now)
+            expired = [d for d, blob in self.blobs.items() if now - blob["created"] > self.max_age]
+            for digest in expired:
+                if digest not in pinned:
+                    self._remove(digest)
+                    removed += 1
+            # 가장 오래 전에 사용한 것부터 (OrderedDict 앞쪽)
+            for digest in list(self.blobs):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                if digest not in pinned:
+                    self._remove(digest)
+                    removed += 1
+            if self.total_bytes > self.max_bytes:
+                logger.warning(f"⚠️ 업로드 대기 이미지만으로 용량 초과: {self.total_bytes / 1e6:.1f}MB")
+            if removed or len(self.pending) != pending:
+                self.evicted += removed
+                self._changed(now)
+        return removed
+
+    def _remove(self, digest: str):
+        blob = self.blobs.pop(digest)
+        for reading_id in blob["readings"]:
+            self.readings.pop(reading_id, None)
+            self.pending.pop(reading_id, None)
+        self.total_bytes -= blob["size"]
+        try:
+            self._blob_path(digest, blob["suffix"]).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "blobs": len(self.blobs),
+                "bytes": self.total_bytes,
+                "pending": len(self.pending),
+                "readings": len(self.readings),
+                "evicted": self.evicted,
+            }
@@ -9,7 +9,7 @@ echo 설치 경로: %INSTALL_DIR%
 :: 1. 의존성 설치
 echo.
 echo [1/3] 의존성 설치...
-py -m pip install opencv-python pyserial requests paho-mqtt python-dotenv
+py -m pip install opencv-python numpy pyserial requests paho-mqtt python-dotenv
 echo 패키지 설치 완료
 
 :: 2. .env 파일 생성
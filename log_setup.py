@@ -0,0 +1,129 @@
+"""로그 설정 (큐 기반 비차단 기록 + 파일 교체)
+
+수집 스레드, MQTT 스레드 등에서 남기는 로그는 큐에 넣기만 하고 바로 반환합니다.
+별도 스레드(QueueListener)가 콘솔과 파일에 기록하며, 파일은 크기 또는 날짜가 바뀌면
+이름을 바꿔 교체합니다 (sensor_log.txt → sensor_log.txt.1 → ...). 기존 내용을 다시 쓰지 않습니다.
+
+main_mqtt, mqtt_client 등 모든 모듈은 logging.getLogger(__name__)로 기록하고,
+프로그램 시작 시 setup_logging()을 한 번 호출해 같은 파일로 모읍니다.
+구조화 이벤트(event_log)도 같은 큐를 거쳐 JSON Lines 파일과 링 버퍼에 기록됩니다.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from pathlib import Path
+
+import event_log
+
+LOG_FORMAT = "[%(asctime)s] %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_BYTES = 1024 * 1024   # 파일당 최대 크기
+BACKUP_COUNT = 5          # 보관할 이전 파일 수
+QUEUE_SIZE = 10000        # 기록 스레드가 밀릴 때 보관할 최대 로그 수 (넘으면 버림)
+
+_listener = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버리는 QueueHandler (버린 개수 집계)"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 같은 프로세스 안의 큐이므로 메시지 변환은 기록 스레드에 맡김 (호출 스레드는 넣기만)
+        if not hasattr(record, "mono"):
+            record.mono = time.monotonic()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RotatingDailyFileHandler(logging.handlers.RotatingFileHandler):
+    """크기 초과 또는 날짜 변경 시 교체 (번호 붙은 이전 파일로 이름 변경)"""
+
+    def __init__(self, filename, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.rollover_at = self._next_midnight(time.time())
+
+    @staticmethod
+    def _next_midnight(now: float) -> float:
+        t = time.localtime(now)
+        return time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if record.created >= self.rollover_at:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_midnight(time.time())
+
+
+def setup_logging(log_file: Path, level: int = logging.INFO, max_bytes: int = MAX_BYTES,
+                  backup_count: int = BACKUP_COUNT, console: bool = True,
+                  events_file: Path = None) -> DroppingQueueHandler:
+    """루트 로거를 큐 기반 기록으로 설정 (여러 번 호출해도 한 번만 적용)
+
+    events_file: 지정하면 모든 로그/이벤트를 JSON Lines로도 기록 (같은 방식으로 교체)
+
+    Returns:
+        큐 핸들러 (dropped: 큐가 가득 차서 버린 로그 수)
+    """
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None:
+        return next(h for h in root.handlers if isinstance(h, DroppingQueueHandler))
+
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    handlers = []
+    try:
+        file_handler = RotatingDailyFileHandler(log_file, max_bytes, backup_count)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"⚠️ 로그 파일을 열 수 없습니다 ({log_file}): {e}", file=sys.stderr)
+    if events_file:
+        try:
+            json_handler = RotatingDailyFileHandler(events_file, max_bytes, backup_count)
+            json_handler.setFormatter(event_log.JsonLinesFormatter())
+            handlers.append(json_handler)
+        except OSError as e:
+            print(f"⚠️ 이벤트 파일을 열 수 없습니다 ({events_file}): {e}", file=sys.stderr)
+    handlers.append(event_log.ring)
+    if console:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue = queue.Queue(QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return queue_handler
+
+
+def shutdown_logging():
+    """남은 로그를 모두 기록하고 기록 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            if handler is not event_log.ring:  # 종료 후에도 최근 로그 조회 가능
+                handler.close()
+        _listener = None
@@ -5,6 +5,7 @@ API 키 인증 방식 사용 - 센서 등록 시 발급받은 API 키 필요
 """
 import time
 import os
+from functools import partial
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -15,6 +16,11 @@ load_dotenv()
 
 from serial_client import SerialClient, find_soil_sensor_port, find_env_sensor_port
 from camera import capture_image, get_test_image
+from sensor_parser import ENV_SCHEMA, SOIL_SCHEMA, parse_line
+
+# 원시 값 그대로 (배율/범위 검사 없음) + 원본 응답("raw")
+parse_soil_csv = partial(parse_line, SOIL_SCHEMA, scaled=False, keep_raw=True)
+parse_env_csv = partial(parse_line, ENV_SCHEMA, scaled=False, keep_raw=True)
 
 PORT_SOIL = find_soil_sensor_port()
 PORT_ENV = find_env_sensor_port()
@@ -39,55 +45,6 @@ FARM_ID = os.environ.get("FARM_ID", "")
 API_KEY = os.environ.get("SENSOR_API_KEY", "")
 
 
-def parse_soil_csv(line: str) -> dict:
-    """A 명령어 응답 파싱: 토양 센서 데이터 (9개 값)
-
-    순서: address, temperature, humidity, ec, ph, salt, n, p, k
-    """
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
-
-    # ino 기준: address, temperature, huminity, ec, ph, salt, n, p, k
-    address, temperature, huminity, ec, ph, salt, n, p, k = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temperature,
-        "humidity": huminity,  # huminity(오타)지만 의미는 humidity
-        "ec": ec,
-        "ph": ph,
-        "salt": salt,
-        "n": n,
-        "p": p,
-        "k": k,
-        "raw": line,
-    }
-
-
-def parse_env_csv(line: str) -> dict:
-    """B 명령어 응답 파싱: 환경 센서 데이터 (9개 값)
-
-    순서: address, temp, hum, ch2o, tvoc, pm25, pm10, co2, 0
-    단위: 온도°C, 습도%, 포름알데하드ug/m³, 휘발성환경물질ug/m³, 초미세먼지ug/m³, 미세먼지ug/m³, 이산화탄소ppm, 0
-    """
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
-
-    address, temp, hum, ch2o, tvoc, pm25, pm10, co2, _ = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temp,
-        "humidity": hum,
-        "ch2o": ch2o,        # 포름알데하드 (ug/m³)
-        "tvoc": tvoc,        # 휘발성유기화합물 (ug/m³)
-        "pm25": pm25,        # 초미세먼지 PM2.5 (ug/m³)
-        "pm10": pm10,        # 미세먼지 PM10 (ug/m³)
-        "co2": co2,          # 이산화탄소 (ppm)
-        "raw": line,
-    }
-
-
 def upload_sensor_data(command: str, sensor_data: dict, image_path: str = None) -> dict:
     """센서 데이터를 서버에 업로드 (통합 엔드포인트)
 
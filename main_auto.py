@@ -5,6 +5,7 @@ API 키 인증 방식 사용 - 센서 등록 시 발급받은 API 키 필요
 """
 import time
 import os
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 
@@ -16,6 +17,11 @@ load_dotenv()
 
 from serial_client import SerialClient, find_soil_sensor_port, find_env_sensor_port
 from camera import capture_image, get_test_image
+from sensor_parser import ENV_SCHEMA, SOIL_SCHEMA, parse_line
+
+# 원시 값 그대로 (배율/범위 검사 없음)
+parse_soil_csv = partial(parse_line, SOIL_SCHEMA, scaled=False)
+parse_env_csv = partial(parse_line, ENV_SCHEMA, scaled=False)
 
 # === 설정 ===
 INTERVAL_HOURS = 4  # 실행 간격 (시간). 4시간 = 하루 6번, 6시간 = 하루 4번
@@ -34,45 +40,6 @@ FARM_ID = os.environ.get("FARM_ID", "")
 API_KEY = os.environ.get("SENSOR_API_KEY", "")
 
 
-def parse_soil_csv(line: str) -> dict:
-    """토양 센서 데이터 파싱 (9개 값)"""
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
-
-    address, temperature, humidity, ec, ph, salt, n, p, k = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temperature,
-        "humidity": humidity,
-        "ec": ec,
-        "ph": ph,
-        "salt": salt,
-        "n": n,
-        "p": p,
-        "k": k,
-    }
-
-
-def parse_env_csv(line: str) -> dict:
-    """환경 센서 데이터 파싱 (9개 값)"""
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
-
-    address, temp, hum, ch2o, tvoc, pm25, pm10, co2, _ = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temp,
-        "humidity": hum,
-        "ch2o": ch2o,
-        "tvoc": tvoc,
-        "pm25": pm25,
-        "pm10": pm10,
-        "co2": co2,
-    }
-
-
 def upload_sensor_data(command: str, sensor_data: dict, image_path: str = None) -> dict:
     """센서 데이터를 서버에 업로드 (통합 엔드포인트)
 
@@ -1,8 +1,13 @@
 import time
+from functools import partial
 from pathlib import Path
 
 from serial_client import SerialClient, find_sensor_port
 from camera import capture_image
+from sensor_parser import SOIL_SCHEMA, parse_line
+
+# 원시 값 그대로 (배율/범위 검사 없음) + 원본 응답("raw")
+parse_soil_csv = partial(parse_line, SOIL_SCHEMA, scaled=False, keep_raw=True)
 
 PORT = find_sensor_port()
 if not PORT:
@@ -12,27 +17,6 @@ BAUD = 9600
 CAM_INDEX = 1
 
 
-def parse_soil_csv(line: str) -> dict:
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
-
-    # ino 기준: address, temperature, huminity, ec, ph, salt, n, p, k
-    address, temperature, huminity, ec, ph, salt, n, p, k = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temperature,
-        "humidity": huminity,
-        "ec": ec,
-        "ph": ph,
-        "salt": salt,
-        "n": n,
-        "p": p,
-        "k": k,
-        "raw": line,
-    }
-
-
 def main():
     sc = SerialClient(PORT, BAUD)
     print(f"[INFO] Serial: {PORT}@{BAUD}")
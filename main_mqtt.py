@@ -4,26 +4,53 @@
 기존 타이머 기반 자동 수집도 병행합니다.
 """
 import os
+import json
 import time
+import shutil
+import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urlencode
 
 # .env 파일 로드
 from dotenv import load_dotenv
 load_dotenv()
 
 import requests
+from requests.adapters import HTTPAdapter
+from serial import SerialException
 
 from serial_client import SerialClient, find_soil_sensor_port, find_env_sensor_port
-from camera import capture_image, get_test_image
-from mqtt_client import SensorMQTTClient
+from device_watcher import DeviceWatcher
+from sensor_bus import BusPoller, parse_addresses
+from frame_codec import query_reading
+from net_sensor import NetworkSensorGateway, RemoteGateway, parse_nodes, serve_gateway
+from sensor_parser import parse_soil_csv, parse_env_csv
+from readings import Reading, SoilReading, EnvReading
+from oversampling import collect_burst
+from timeseries_store import TimeSeriesStore
+from rollups import RollupManager
+from image_store import ImageStore
+from env_stream import LiveStream
+from camera import capture_image, encode_best, grab_frames
+from frame_ring import FrameRing
+from op_watchdog import watchdog
+from upload_scheduler import UploadScheduler
+from mqtt_client import FarmChannel, SensorMQTTClient
+from farm_config import DATA_DIR, FarmConfig, load_farms
+from log_setup import setup_logging
+from event_log import event, recent
+from metrics import metrics, event_sink
+from metrics_server import MetricsServer
+from telemetry import TelemetryReporter
+from worker_supervisor import Supervisor
 
 # === 설정 ===
-# 수집 스케줄 설정 (서버에서 MQTT로 변경 가능)
-COLLECTION_START_TIME = "00:00"  # 기본값: 00:00 (24시간 수집)
-COLLECTION_END_TIME = "23:59"    # 기본값: 23:59
-INTERVAL_MINUTES = 240           # 기본값: 240분 (4시간)
+# 수집 스케줄은 농가별 설정(FarmConfig)에 있음 - 기본값 00:00 ~ 23:59, 240분 간격 (서버에서 MQTT로 변경 가능)
 
 TEST_MODE = False   # True: strawberry.jpg 사용, False: 카메라 사용
 CAM_INDEX = 0
@@ -32,8 +59,69 @@ CAM_INDEX = 0
 BAUD_SOIL = 9600
 BAUD_ENV = 9600
 
+# USB 포트 분리/연결 감시 간격 (초)
+DEVICE_WATCH_INTERVAL = 2.0
+
+# 공유 버스(RS-485) 센서 주소 목록 (예: "1,2,5-8"). 비어 있으면 포트당 센서 1개
+SOIL_BUS_ADDRESSES = parse_addresses(os.environ.get("SOIL_BUS_ADDRESSES", ""))
+ENV_BUS_ADDRESSES = parse_addresses(os.environ.get("ENV_BUS_ADDRESSES", ""))
+BUS_PIPELINE_DEPTH = 4  # 응답을 기다리지 않고 미리 보낼 요청 수
+
+# 네트워크 센서 노드 (TCP 시리얼 브리지, 예: "A@192.168.0.21:4001 B@192.168.0.22:4001/1-4") - net_sensor 참고
+NET_SENSOR_NODES = os.environ.get("NET_SENSOR_NODES", "")
+NET_RESPONSE_TIMEOUT = float(os.environ.get("NET_RESPONSE_TIMEOUT", "2"))  # 노드 응답 대기 (초)
+NET_POLL_TIMEOUT = 60.0  # 수집 1회에 네트워크 노드 전체 폴링을 기다리는 최대 시간 (초)
+
+# 작업 프로세스 모드: 카메라 촬영, 서버 업로드, 네트워크 노드 폴링을 별도 프로세스에서 실행
+# (카메라가 멈추거나 OpenCV가 죽어도 시리얼 수집/MQTT는 계속, 멈춘 작업 프로세스만 재시작)
+PROCESS_WORKERS = os.environ.get("PROCESS_WORKERS", "").lower() in ("1", "true", "yes")
+# 작업별 제한 시간 (op_watchdog) - 넘으면 중단하고 서버에 watchdog_trip 상태 발행
+CAMERA_TIMEOUT = 30.0   # 촬영 1회 제한 (초) - 작업 프로세스는 재시작, 아니면 촬영 스레드를 버림
+UPLOAD_TIMEOUT = 60.0   # 업로드 1회 제한 (초, 요청 timeout 30초 + 여유)
+SERIAL_TIMEOUT = 60.0   # 시리얼 측정 1회 제한 (초, 버스 모드는 주소 전체) - 넘으면 포트를 닫아 중단
+COLLECT_TIMEOUT = float(os.environ.get("COLLECT_TIMEOUT", "300"))  # 수집 1회 전체 - 넘으면 collecting 해제
+# 작업 프로세스 모드의 촬영: camera 프로세스가 프레임 여러 장을 공유 메모리(frame_ring)에 캡처하고
+# encoder 프로세스가 가장 선명한 한 장만 JPEG으로 저장 (프레임은 프로세스 사이에서 복사하지 않음)
+CAPTURE_FRAMES = int(os.environ.get("CAPTURE_FRAMES", "3"))
+# 공유 메모리 슬롯 크기 (카메라 최대 해상도, 가로x세로) - 더 큰 프레임은 기존 방식(capture_image)으로 촬영
+CAPTURE_MAX_RESOLUTION = os.environ.get("CAPTURE_MAX_RESOLUTION", "1920x1080")
+_frame_width, _frame_height = (int(v) for v in CAPTURE_MAX_RESOLUTION.lower().split("x"))
+FRAME_MAX_SHAPE = (_frame_height, _frame_width, 3)
+
+# 바이너리 프레임(CRC16) 응답 사용 - 펌웨어가 지원하지 않으면 자동으로 CSV 사용
+USE_BINARY_FRAMES = os.environ.get("SENSOR_BINARY_FRAMES", "").lower() in ("1", "true", "yes")
+
+# 버스트 오버샘플링: 수집 1회에 K번 측정 후 이상치 제거 평균만 업로드 (1이면 사용 안 함)
+OVERSAMPLE_COUNT = int(os.environ.get("OVERSAMPLE_COUNT", "1"))
+OVERSAMPLE_INTERVAL = 0.2  # 측정 간 대기 (초)
+
+# 로컬 저장 폴더: <DATA_DIR>/timeseries (모든 측정값을 장치에 보관), <DATA_DIR>/images
+# (게이트웨이 모드는 농가별로 data/farms/<이름>/ 아래)
+# 이미지 저장소: 같은 이미지는 한 번만 저장, 용량/보존 기간 초과 시 오래된 것부터 삭제
+IMAGE_MAX_MB = int(os.environ.get("IMAGE_MAX_MB", "2048"))
+IMAGE_MAX_DAYS = float(os.environ.get("IMAGE_MAX_DAYS", "30"))
+TEST_IMAGE = Path(__file__).parent / "strawberry.jpg"
+# MQTT로 발행할 집계 단계 (구간이 끝날 때마다 요약 전송)
+ROLLUP_PUBLISH_TIERS = ("1h", "1d")
+
+# 단계별 구간을 하나씩 이벤트 로그(DEBUG)로도 내보내기 (히스토그램은 항상 집계, METRICS_ENABLED=false면 모두 끔)
+METRICS_SPAN_EVENTS = os.environ.get("METRICS_SPAN_EVENTS", "").lower() in ("1", "true", "yes")
+# 로컬 메트릭 엔드포인트 (Prometheus) - 0이면 사용 안 함. 기본은 이 PC에서만 접근 가능
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+# MQTT 상태 보고 간격 (초, 0이면 사용 안 함) - farm/{FARM_ID}/telemetry
+TELEMETRY_INTERVAL = float(os.environ.get("TELEMETRY_INTERVAL", "60"))
+# 실시간 스트리밍(stream_start 명령) 상한: 최소 측정 간격(초), 최대 스트리밍 시간(초)
+STREAM_MIN_INTERVAL = float(os.environ.get("STREAM_MIN_INTERVAL", "0.5"))
+STREAM_MAX_DURATION = float(os.environ.get("STREAM_MAX_DURATION", "600"))
+
 # 서버 URL (통합 엔드포인트)
 SERVER_URL = "http://218.38.121.112:8000/v1/iot/sensor-data"
+# 동시 업로드 최대 수 - 모든 농가가 연결 풀 하나를 공유 (같은 서버 연결 재사용, 응답 시간을 보고 자동으로 줄임)
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "2"))
+# 업로드 평균 대역폭 (KB/s, 0이면 제한 없음) - 측정값을 먼저 보내고 이미지는 이 속도로 나눠 보냄 (upload_scheduler)
+UPLOAD_RATE_KBPS = float(os.environ.get("UPLOAD_RATE_KBPS", "0"))
+UPLOAD_BURST_KB = float(os.environ.get("UPLOAD_BURST_KB", "256"))  # 쉬었다가 한 번에 보낼 수 있는 양
 
 # API 키 설정 (센서별 별도 API 키)
 # 토양 센서 API 키 (A 명령)
@@ -48,64 +136,72 @@ MQTT_PORT = int(os.environ.get("MQTT_PORT", "1883"))
 FARM_ID = os.environ.get("FARM_ID", "16e23f55-25aa-4cad-a9a8-91ddd32613b8")
 # Organization ID (센서 전송 주기 구독용) - 메타오가닉
 ORG_ID = os.environ.get("ORG_ID", "00703f64-7a9b-4f2a-833a-1c2558f5afcf")
+# MQTT client_id - 비워두면 처음 실행 시 만들어 파일에 저장하고 계속 같은 값 사용 (영속 세션)
+MQTT_CLIENT_ID = os.environ.get("MQTT_CLIENT_ID", "")
+MQTT_CLIENT_ID_FILE = Path(__file__).parent / "data" / "mqtt_client_id.json"
+# 발행 메시지 형식: json(기본, 기존 토픽) / cbor / msgpack (토픽 끝에 /cbor 등이 붙음)
+MQTT_CODEC = os.environ.get("MQTT_CODEC", "json")
 
 # 스케줄 조회 API URL (IoT 디바이스용 - API Key 인증)
 SCHEDULE_API_URL = "http://218.38.121.112:8000/v1/iot/schedule"
 
+# 게이트웨이 모드: 이 파일이 있으면 여기 적힌 농가들을 한 프로세스에서 수집 (farm_config 참고)
+FARMS_FILE = Path(os.environ.get("FARMS_FILE", Path(__file__).parent / "farms.json"))
+# 수집/명령 처리 작업 스레드 수 (모든 농가 공유, 같은 농가는 한 번에 하나만 수집)
+FARM_WORKERS = int(os.environ.get("FARM_WORKERS", "4"))
+
 
 LOG_FILE = Path(__file__).parent / "sensor_log.txt"
-LOG_MAX_LINES = 5000  # 로그 파일 최대 줄 수
+LOG_MAX_BYTES = 1024 * 1024  # 로그 파일 최대 크기 (넘거나 날짜가 바뀌면 sensor_log.txt.1 ... 로 교체)
+LOG_BACKUP_COUNT = 5         # 보관할 이전 로그 파일 수
+EVENTS_FILE = Path(__file__).parent / "events.jsonl"  # 구조화 이벤트 (JSON Lines)
 
-def log(msg: str):
-    """타임스탬프 포함 로그 출력 (콘솔 + 파일)"""
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_line = f"[{ts}] {msg}"
-    print(log_line, flush=True)
+logger = logging.getLogger("main_mqtt")
 
-    # 파일에도 기록
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(log_line + "\n")
+# 업로드/스케줄 조회용 HTTP 연결 풀 (모든 농가 공유)
+http = requests.Session()
+http.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=UPLOAD_CONCURRENCY))
+http.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=UPLOAD_CONCURRENCY))
+# 작업 프로세스 모드는 업로드 프로세스가 요청을 하나씩 처리 - 동시 업로드 수도 1 (프로세스 큐에서 기다린 시간이
+# 요청 시간으로 잡혀 혼잡으로 오인하지 않도록)
+uploads = UploadScheduler(1 if PROCESS_WORKERS else UPLOAD_CONCURRENCY, UPLOAD_RATE_KBPS * 1024, UPLOAD_BURST_KB * 1024)
 
-        # 로그 파일 크기 관리 (5000줄 초과 시 오래된 줄 삭제)
-        if LOG_FILE.exists() and LOG_FILE.stat().st_size > 500000:  # ~500KB 초과시
-            lines = LOG_FILE.read_text(encoding="utf-8").splitlines()
-            if len(lines) > LOG_MAX_LINES:
-                # 최근 3000줄만 유지
-                LOG_FILE.write_text("\n".join(lines[-3000:]) + "\n", encoding="utf-8")
-    except Exception:
-        pass  # 파일 쓰기 실패 시 무시
 
+def log(msg: str):
+    """타임스탬프 포함 로그 출력 (콘솔 + 파일)
+
+    큐에 넣기만 하고 바로 반환합니다. 실제 기록은 log_setup의 기록 스레드가 합니다.
+    """
+    logger.info(msg)
 
-def fetch_schedule_from_server() -> bool:
-    """서버에서 현재 수집 스케줄을 가져옴
+
+def fetch_schedule_from_server(config: FarmConfig) -> bool:
+    """서버에서 농가의 현재 수집 스케줄을 가져와 config에 적용
 
     Returns:
         True if successful, False otherwise
     """
-    global COLLECTION_START_TIME, COLLECTION_END_TIME, INTERVAL_MINUTES
-
-    log(f"📡 서버에서 수집 스케줄 조회 중...")
+    log(f"📡 서버에서 수집 스케줄 조회 중... ({config.name})")
 
     try:
         # 스케줄 조회는 토양 센서 API 키 사용 (둘 다 같은 농가이므로)
-        headers = {"X-API-Key": API_KEY_SOIL}
-        response = requests.get(SCHEDULE_API_URL, headers=headers, timeout=10)
+        headers = {"X-API-Key": config.api_key_soil}
+        response = http.get(SCHEDULE_API_URL, headers=headers, timeout=10)
 
         if response.status_code == 200:
             data = response.json()
-            COLLECTION_START_TIME = data.get("start_time", COLLECTION_START_TIME)
-            COLLECTION_END_TIME = data.get("end_time", COLLECTION_END_TIME)
-            INTERVAL_MINUTES = data.get("interval_minutes", INTERVAL_MINUTES)
+            config.start_time = data.get("start_time", config.start_time)
+            config.end_time = data.get("end_time", config.end_time)
+            config.interval_minutes = data.get("interval_minutes", config.interval_minutes)
 
-            log(f"✅ 스케줄 조회 성공: {COLLECTION_START_TIME} ~ {COLLECTION_END_TIME}, {INTERVAL_MINUTES}분 간격")
+            log(f"✅ 스케줄 조회 성공: {config.start_time} ~ {config.end_time}, {config.interval_minutes}분 간격")
             return True
         else:
             log(f"⚠️ 스케줄 조회 실패 (HTTP {response.status_code}): 기본값 사용")
             return False
 
     except requests.exceptions.ConnectionError:
-        log(f"⚠️ 서버 연결 실패: 기본값 사용 ({COLLECTION_START_TIME}~{COLLECTION_END_TIME}, {INTERVAL_MINUTES}분)")
+        log(f"⚠️ 서버 연결 실패: 기본값 사용 ({config.start_time}~{config.end_time}, {config.interval_minutes}분)")
         return False
     except requests.exceptions.Timeout:
         log(f"⚠️ 서버 응답 시간 초과: 기본값 사용")
@@ -115,241 +211,543 @@ def fetch_schedule_from_server() -> bool:
         return False
 
 
-def parse_soil_csv(line: str) -> dict:
-    """토양 센서 데이터 파싱 (9개 값)"""
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
+def upload_lane(sensor_data: Reading, image_path: str = None) -> tuple:
+    """(차선, 크기) - 이미지가 있으면 image 차선, 없으면 sensor 차선 (크기는 토큰 버킷에 사용)"""
+    size = len(urlencode(sensor_data.to_form()))
+    if image_path and Path(image_path).exists():
+        return "image", size + Path(image_path).stat().st_size
+    return "sensor", size
 
-    address, temperature, humidity, ec, ph, salt, n, p, k = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temperature / 10,  # 센서 데이터가 10배로 들어옴
-        "humidity": humidity / 10,        # 센서 데이터가 10배로 들어옴
-        "ec": ec,
-        "ph": ph,
-        "salt": salt,
-        "n": n,
-        "p": p,
-        "k": k,
-    }
 
+def upload_slot(sensor_data: Reading, image_path: str = None):
+    """업로드 자리 (블록 = 요청 전체)"""
+    return uploads.slot(*upload_lane(sensor_data, image_path))
 
-def parse_env_csv(line: str) -> dict:
-    """환경 센서 데이터 파싱 (9개 값)"""
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
 
-    address, temp, hum, ch2o, tvoc, pm25, pm10, co2, _ = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temp,
-        "humidity": hum,
-        "ch2o": ch2o,
-        "tvoc": tvoc,
-        "pm25": pm25,
-        "pm10": pm10,
-        "co2": co2,
-    }
+def upload_sensor_data(command: str, sensor_data: Reading, image_path: str = None, stats: dict = None,
+                       api_key: str = None, scheduled: bool = True) -> dict:
+    """센서 데이터를 서버에 업로드 (통합 엔드포인트)
 
-
-def upload_sensor_data(command: str, sensor_data: dict, image_path: str = None) -> dict:
-    """센서 데이터를 서버에 업로드 (통합 엔드포인트)"""
+    stats: 오버샘플링 통계 (샘플 수, 필드별 MAD/제외 개수) - 있으면 함께 전송
+    api_key: 농가 API 키 (없으면 .env의 명령별 키)
+    scheduled: False면 호출자가 이미 자리(upload_slot / uploads.acquire)를 잡은 경우 (대역폭/동시 업로드 수 제한 생략)
+    """
     # 명령에 따라 적절한 API 키 선택
     if command.upper() == 'A':
-        api_key = API_KEY_SOIL
+        api_key = api_key or API_KEY_SOIL
         if not api_key:
             raise RuntimeError("SENSOR_API_KEY_SOIL 환경변수가 설정되지 않았습니다")
     else:
-        api_key = API_KEY_PLANT
+        api_key = api_key or API_KEY_PLANT
         if not api_key:
             raise RuntimeError("SENSOR_API_KEY_PLANT 환경변수가 설정되지 않았습니다")
 
     headers = {"X-API-Key": api_key}
 
-    form_data = {
-        "command": command.upper(),
-        "temp": float(sensor_data["temperature"]),
-        "humi": float(sensor_data["humidity"]),
-    }
-
-    if command.upper() == 'A':
-        form_data.update({
-            "ec": float(sensor_data["ec"]),
-            "ph": float(sensor_data["ph"]),
-            "salt": float(sensor_data["salt"]),
-            "n": float(sensor_data["n"]),
-            "p": float(sensor_data["p"]),
-            "k": float(sensor_data["k"]),
-        })
-    else:
-        form_data.update({
-            "ch2o": float(sensor_data["ch2o"]),
-            "tvoc": float(sensor_data["tvoc"]),
-            "pm25": float(sensor_data["pm25"]),
-            "pm10": float(sensor_data["pm10"]),
-            "co2": float(sensor_data["co2"]),
-        })
+    form_data = sensor_data.to_form()
+    if stats:
+        form_data["sample_count"] = stats["samples"]
+        form_data["spread"] = json.dumps(stats["fields"], separators=(",", ":"))
 
     files = None
     if image_path and Path(image_path).exists():
         img_path = Path(image_path)
         f = open(img_path, "rb")
         files = {"image": (img_path.name, f, "image/jpeg")}
+        metrics.count("upload.image_bytes", img_path.stat().st_size)
 
     try:
-        r = requests.post(
-            SERVER_URL,
-            headers=headers,
-            data=form_data,
-            files=files,
-            timeout=30,
-        )
+        # 전체 요청 (연결 + 전송 + 서버 처리 + 응답 수신) - 차선/대역폭/동시 업로드 수 제한, 연결 재사용
+        slot = upload_slot(sensor_data, image_path) if scheduled else nullcontext()
+        with slot, metrics.span(f"upload.request.{command.upper()}"):
+            r = http.post(
+                SERVER_URL,
+                headers=headers,
+                data=form_data,
+                files=files,
+                timeout=30,
+            )
     finally:
         if files:
             files["image"][1].close()
+    # 요청 시작 ~ 응답 헤더 수신 (연결 풀 대여, 연결, 본문 전송, 서버 처리 포함 - 응답 본문 읽기만 제외)
+    # requests는 연결/전송 시간을 따로 주지 않으므로 서버 처리 시간으로 볼 수 없음
+    metrics.observe("upload.response", r.elapsed.total_seconds())
+    metrics.count("upload.bytes", len(r.request.body or b""))
 
     if not r.ok:
+        metrics.count(f"upload.http_errors.{command.upper()}")
         raise RuntimeError(f"Upload failed: HTTP {r.status_code}\n{r.text[:500]}")
 
     return r.json()
 
 
-class SensorCollector:
-    """센서 데이터 수집기"""
+# 파싱 단계 측정용 (query_reading / BusPoller 콜백)
+_parse_soil = metrics.wrap("parse.soil", parse_soil_csv)
+_parse_env = metrics.wrap("parse.env", parse_env_csv)
 
-    def __init__(self):
+
+class SensorCollector:
+    """센서 데이터 수집기 (농가 하나)"""
+
+    def __init__(self, config: FarmConfig, tag: str = "", watcher: DeviceWatcher = None,
+                 workers: Supervisor = None):
+        """
+        Args:
+            config: 농가 설정 (포트, API 키, 카메라, 저장 폴더, 수집 스케줄)
+            tag: 로그 앞에 붙일 농가 표시 (게이트웨이 모드에서 "[spot1] " 등)
+            watcher: 여러 농가가 공유하는 포트 감시 스레드 (없으면 직접 만듦)
+                공유하면 감시 이름이 "<농가 이름>/soil" 형식
+            workers: 작업 프로세스 모드 - 촬영/업로드/네트워크 노드 폴링을 작업 프로세스에서 실행
+        """
+        self.config = config
+        self.workers = workers
+        self.frames_fit = True  # 카메라 프레임이 공유 메모리 슬롯에 들어가는지 (아니면 capture_image 사용)
+        self.tag = tag
         self.sc_soil = None
         self.sc_env = None
+        self.bus_soil = None
+        self.bus_env = None
+        self.net = None  # 네트워크 센서 노드 (TCP 브리지)
         self.collecting = False
+        self.collecting_command = None  # 수집 중인 센서 (A/B) - 같은 포트의 스트리밍이 양보
+        self.cycle = 0  # 수집 번호 - watchdog이 해제한 뒤 늦게 끝난 수집이 새 수집 상태를 지우지 않도록
         self.lock = threading.Lock()
+        self.on_watchdog_trip = None  # (trip: dict) 콜백 - 작업 시간 초과를 서버에 알림
+        self.last_reading = {}  # 명령(A/B) → 마지막 측정 시각
+        self.own_watcher = watcher is None
+        self.watcher = watcher or DeviceWatcher(interval=DEVICE_WATCH_INTERVAL)
+        self.watch_prefix = "" if self.own_watcher else f"{config.name}/"
+        self.store = TimeSeriesStore(config.data_dir / "timeseries")
+        self.images = ImageStore(config.data_dir / "images", IMAGE_MAX_MB * 1024 * 1024, IMAGE_MAX_DAYS)
+        self.series = {
+            "A": self.store.open("soil", ("address",) + SoilReading.VALUE_FIELDS),
+            "B": self.store.open("env", ("address",) + EnvReading.VALUE_FIELDS),
+        }
+        # 1분/1시간/1일 집계 (재시작 시 진행 중이던 구간은 원본에서 복구)
+        self.rollups = {
+            "A": RollupManager(self.store, "soil", SoilReading.VALUE_FIELDS),
+            "B": RollupManager(self.store, "env", EnvReading.VALUE_FIELDS),
+        }
+        for command, rollup in self.rollups.items():
+            try:
+                rollup.recover(self.series[command])
+            except Exception as e:
+                self.log(f"⚠️ 집계 복구 실패 ({rollup.series}): {e}")
+
+    def log(self, msg: str):
+        log(f"{self.tag}{msg}")
 
     def initialize(self):
         """시리얼 포트 초기화"""
-        port_soil = find_soil_sensor_port()
-        port_env = find_env_sensor_port()
+        port_soil = self.config.soil_port
+        port_env = self.config.env_port
 
         if port_soil:
-            self.sc_soil = SerialClient(port_soil, BAUD_SOIL)
-            log(f"✅ 토양 센서 연결: {port_soil}")
+            self.sc_soil = self._open_serial(port_soil, BAUD_SOIL, "토양")
         else:
-            log("⚠️ 토양 센서 미연결")
+            self.log("⚠️ 토양 센서 미연결")
 
         if port_env:
-            self.sc_env = SerialClient(port_env, BAUD_ENV)
-            log(f"✅ 환경 센서 연결: {port_env}")
+            self.sc_env = self._open_serial(port_env, BAUD_ENV, "환경")
         else:
-            log("⚠️ 환경 센서 미연결")
+            self.log("⚠️ 환경 센서 미연결")
+
+        # 주소가 지정된 경우 한 포트 뒤의 여러 센서를 폴링
+        if self.sc_soil and self.config.soil_bus_addresses:
+            self.bus_soil = BusPoller(self.sc_soil, "A", self.config.soil_bus_addresses, _parse_soil,
+                                      pipeline_depth=BUS_PIPELINE_DEPTH)
+            self.log(f"   토양 센서 버스 주소: {self.config.soil_bus_addresses}")
+        if self.sc_env and self.config.env_bus_addresses:
+            self.bus_env = BusPoller(self.sc_env, "B", self.config.env_bus_addresses, _parse_env,
+                                     pipeline_depth=BUS_PIPELINE_DEPTH)
+            self.log(f"   환경 센서 버스 주소: {self.config.env_bus_addresses}")
+
+        # 네트워크 센서 노드 - 모든 노드를 동시에 폴링해 USB 센서 측정값과 함께 업로드
+        nodes = parse_nodes(self.config.net_nodes)
+        if nodes and self.workers:
+            name = "acquisition" + ("" if self.own_watcher else f".{self.config.name}")
+            worker = self.workers.add(name, serve_gateway, self.config.net_nodes, NET_RESPONSE_TIMEOUT)
+            self.net = RemoteGateway(worker, nodes)
+        elif nodes:
+            self.net = NetworkSensorGateway(nodes, {"A": _parse_soil, "B": _parse_env},
+                                            response_timeout=NET_RESPONSE_TIMEOUT)
+            self.net.start()
+            self.log(f"✅ 네트워크 센서 노드: {len(nodes)}개 ({', '.join(self.net.commands())})")
+
+        # 핫플러그 감시: 분리된 포트는 다시 연결되면 해당 센서만 재오픈
+        if self.sc_soil:
+            self.watcher.watch(f"{self.watch_prefix}soil", self.sc_soil)
+        if self.sc_env:
+            self.watcher.watch(f"{self.watch_prefix}env", self.sc_env)
+        self.watcher.start()
 
-        return port_soil or port_env
+        return port_soil or port_env or bool(nodes)
+
+    def _open_serial(self, port: str, baud: int, label: str) -> SerialClient:
+        """설정된 포트 열기 - 부팅 시 포트가 없어도 끊긴 상태로 만들어 두고, 연결되면 포트 감시가 엶"""
+        try:
+            client = SerialClient(port, baud)
+            self.log(f"✅ {label} 센서 연결: {port}")
+        except (SerialException, OSError) as e:
+            client = SerialClient(port, baud, connect=False)
+            self.log(f"⚠️ {label} 센서 포트 없음 ({port}) - 연결되면 자동으로 엽니다: {e}")
+        return client
+
+    def has_net(self, command: str) -> bool:
+        """해당 명령(A/B)의 네트워크 노드가 있는지"""
+        return self.net is not None and command in self.net.commands()
+
+    def serial_status(self) -> dict:
+        """센서별 연결 상태, 재연결 횟수, 다운타임 (버스 모드는 주소별 집계 포함)"""
+        status = {name: client.stats() for name, client in (("soil", self.sc_soil), ("env", self.sc_env)) if client}
+        if self.bus_soil and "soil" in status:
+            status["soil"]["bus"] = self.bus_soil.stats()
+        if self.bus_env and "env" in status:
+            status["env"]["bus"] = self.bus_env.stats()
+        if self.net:
+            status["net"] = self.net.summary()
+        return status
 
     def close(self):
         """시리얼 포트 닫기"""
+        if self.own_watcher:
+            self.watcher.stop()
+        self.store.close()
+        self.images.flush()
+        if self.net:
+            self.net.close()
         if self.sc_soil:
             self.sc_soil.close()
         if self.sc_env:
             self.sc_env.close()
-        log("시리얼 연결 종료")
-
-    def collect_soil(self, with_image: bool = True) -> bool:
-        """토양 센서 데이터 수집 및 업로드"""
-        if not self.sc_soil:
-            log("❌ 토양 센서가 연결되지 않았습니다")
-            return False
+        self.log("시리얼 연결 종료")
+
+    def _guard(self, op: str, timeout: float, abort=None):
+        """watchdog 감시 블록 (시간 초과는 이 농가 이름으로 기록/발행)"""
+        return watchdog.guard(op, timeout, abort=abort, on_trip=self._on_trip, farm=self.config.name)
+
+    def _on_trip(self, trip: dict):
+        if self.on_watchdog_trip:
+            self.on_watchdog_trip(trip)
+
+    def capture(self, filename: str) -> str:
+        """카메라 촬영 → 이미지 경로 (작업 프로세스 모드는 camera/encoder 작업 프로세스에서)
+
+        Raises:
+            WatchdogTimeout: 작업 프로세스가 아닌데 촬영이 CAMERA_TIMEOUT을 넘은 경우 (촬영 스레드는 버림)
+        """
+        if self.workers:
+            # 작업 프로세스가 제한 시간을 직접 적용 (넘으면 재시작) - watchdog은 시간 초과 기록만
+            if self.frames_fit:
+                with self._guard("camera", CAMERA_TIMEOUT):
+                    refs = self.workers["camera"].call("grab", self.config.cam_index, CAPTURE_FRAMES,
+                                                       timeout=CAMERA_TIMEOUT)
+                if refs:
+                    with self._guard("encoder", CAMERA_TIMEOUT):
+                        path, score = self.workers["encoder"].call("encode_best", refs, filename,
+                                                                   timeout=CAMERA_TIMEOUT)
+                    self.log(f"   선명도: {score:.0f} ({len(refs)}장 중 선택)")
+                    return path
+                # 빈 목록 = 프레임이 슬롯보다 큼 - 이후로는 바로 기존 방식으로 촬영
+                self.frames_fit = False
+                self.log(f"⚠️ 카메라 해상도가 CAPTURE_MAX_RESOLUTION({CAPTURE_MAX_RESOLUTION})보다 큽니다 "
+                         f"- 한 장씩 촬영 (선명도 비교 안 함)")
+            with self._guard("camera", CAMERA_TIMEOUT):
+                return self.workers["camera"].call("capture", filename, self.config.cam_index,
+                                                   timeout=CAMERA_TIMEOUT)
+        # VideoCapture 열기/읽기는 중단할 방법이 없으므로 별도 스레드에서 실행하고 제한 시간까지만 기다림
+        # - 버린 촬영이 카메라를 잡고 있는 동안은 새 스레드를 만들지 않고 바로 실패 (exclusive)
+        # - 다른 농가의 촬영이 끝나기는 제한 시간의 절반까지만 기다림 (남은 시간에 촬영)
+        return watchdog.call("camera", CAMERA_TIMEOUT, capture_image, filename, cam_index=self.config.cam_index,
+                             wait=CAMERA_TIMEOUT / 2, exclusive=True,
+                             on_trip=self._on_trip, info={"farm": self.config.name})
+
+    def upload(self, command: str, reading: Reading, image_path: str = None, stats: dict = None) -> dict:
+        """농가 API 키로 업로드 (작업 프로세스 모드는 upload 작업 프로세스에서)"""
+        api_key = self.config.api_key(command)
+        if self.workers:
+            # 자리(차선/대역폭)는 여기서 잡음 - 제한 시간은 자리를 기다린 시간을 빼고 요청에만 적용
+            # (시간 초과면 업로드 프로세스를 재시작하므로 요청도 함께 끝남)
+            with upload_slot(reading, image_path), self._guard(f"upload.{command}", UPLOAD_TIMEOUT):
+                return self.workers["upload"].call("upload", command, reading, image_path, stats, api_key,
+                                                   scheduled=False, timeout=UPLOAD_TIMEOUT)
+
+        ticket = uploads.acquire(*upload_lane(reading, image_path))
+
+        def send():
+            # 자리는 요청을 실제로 보내는 스레드가 반납 - 시간 초과로 버린 요청도 끝날 때까지 자리와 대역폭을 차지
+            ok = False
+            try:
+                result = upload_sensor_data(command, reading, image_path, stats, api_key, scheduled=False)
+                ok = True
+                return result
+            finally:
+                uploads.release(ticket, ok)
+
+        # requests의 timeout은 소켓 동작마다 적용 - 느리게 조금씩 오는 응답까지 포함한 전체 시간 제한
+        return watchdog.call(f"upload.{command}", UPLOAD_TIMEOUT, send,
+                             on_trip=self._on_trip, info={"farm": self.config.name})
+
+    def _read_soil_once(self) -> list:
+        """토양 센서 1회 측정 (버스 모드는 주소별, 네트워크 노드 포함)"""
+        readings = []
+        # 네트워크 노드가 있으면 끊긴 USB 포트는 건너뛰고 노드 측정값만 사용
+        if self.sc_soil and (self.sc_soil.connected or not self.has_net("A")):
+            with self._guard("serial.A", SERIAL_TIMEOUT, abort=self.sc_soil.abort):
+                if self.bus_soil:
+                    readings = [SoilReading.from_dict(d) for d in self.bus_soil.poll().values()]
+                else:
+                    soil_data = query_reading(self.sc_soil, "A", _parse_soil, USE_BINARY_FRAMES)
+                    readings = [SoilReading.from_dict(soil_data)] if soil_data else []
+        if self.has_net("A"):
+            readings += [SoilReading.from_dict(d) for d in self.net.readings("A", NET_POLL_TIMEOUT)]
+        return readings
+
+    def _read_env_once(self) -> list:
+        """환경 센서 1회 측정 (버스 모드는 주소별, 네트워크 노드 포함)"""
+        readings = []
+        if self.sc_env and (self.sc_env.connected or not self.has_net("B")):
+            with self._guard("serial.B", SERIAL_TIMEOUT, abort=self.sc_env.abort):
+                if self.bus_env:
+                    readings = [EnvReading.from_dict(d) for d in self.bus_env.poll().values()]
+                else:
+                    env_data = query_reading(self.sc_env, "B", _parse_env, USE_BINARY_FRAMES)
+                    readings = [EnvReading.from_dict(env_data)] if env_data else []
+        if self.has_net("B"):
+            readings += [EnvReading.from_dict(d) for d in self.net.readings("B", NET_POLL_TIMEOUT)]
+        return readings
+
+    def _sample(self, read_once, reading_type) -> list:
+        """[(레코드, 오버샘플링 통계 또는 None)] - 결과는 로컬 저장소에도 기록"""
+        with metrics.span(f"collect.sample.{reading_type.command}"):
+            if OVERSAMPLE_COUNT > 1:
+                readings = collect_burst(read_once, reading_type, OVERSAMPLE_COUNT, OVERSAMPLE_INTERVAL)
+            else:
+                readings = [(reading, None) for reading in read_once()]
+        with metrics.span("store.append"):
+            for reading, _ in readings:
+                self.record(reading)
+        metrics.count(f"readings.{reading_type.command}", len(readings))
+        return readings
+
+    def record(self, reading: Reading):
+        """로컬 시계열 저장소에 기록 (실패해도 수집/업로드는 계속)"""
+        self.last_reading[reading.command] = reading.ts
+        try:
+            self.series[reading.command].append(reading)
+            self.rollups[reading.command].add(reading)
+        except Exception as e:
+            self.log(f"⚠️ 로컬 저장 실패: {e}")
+
+    def maintain_rollups(self):
+        """끝난 집계 구간 닫기 + 보존 기간 지난 집계 삭제 (메인 루프에서 주기적으로 호출)"""
+        for rollup in self.rollups.values():
+            try:
+                rollup.flush_due()
+                rollup.enforce_retention()
+            except Exception as e:
+                self.log(f"⚠️ 집계 유지 실패 ({rollup.series}): {e}")
+
+    def maintain_images(self):
+        """용량/보존 기간을 넘은 이미지 삭제 (업로드 대기 중인 이미지 제외)"""
+        try:
+            removed = self.images.evict()
+            if removed:
+                self.log(f"🗑️ 오래된 이미지 {removed}개 삭제 ({self.images.stats()['bytes'] / 1e6:.1f}MB 사용 중)")
+        except Exception as e:
+            self.log(f"⚠️ 이미지 정리 실패: {e}")
+
+    def query_rollup(self, series: str, tier: str, start: float = None, end: float = None) -> list:
+        """로컬 집계 조회 (진행 중인 구간 포함)
+
+        Returns:
+            [{"ts", "address", "count", "fields": {필드: [min, max, mean]}}]
+        """
+        rollup = next(r for r in self.rollups.values() if r.series == series)
+        cols = rollup.query(tier, start, end, include_open=True)
+        return [
+            {
+                "ts": cols["ts"][i],
+                "address": int(cols["address"][i]),
+                "count": int(cols["count"][i]),
+                "fields": {
+                    name: [cols[f"{name}_min"][i], cols[f"{name}_max"][i], round(cols[f"{name}_mean"][i], 3)]
+                    for name in rollup.fields
+                },
+            }
+            for i in range(len(cols["ts"]))
+        ]
 
+    def _begin(self, command: str) -> Optional[int]:
+        """수집 시작 표시 → 수집 번호 (이미 수집 중이면 None)"""
         with self.lock:
             if self.collecting:
-                log("⚠️ 이미 수집 중입니다")
-                return False
+                return None
+            self.cycle += 1
             self.collecting = True
+            self.collecting_command = command
+            return self.cycle
 
-        try:
-            log("🌱 토양 센서(A) 데이터 수집 시작...")
-            self.sc_soil.send("A")
-            line = self.sc_soil.receive()
-
-            if not line:
-                log("❌ 토양 센서 응답 없음")
+    def _end(self, cycle: int) -> bool:
+        """수집 상태 해제 (이미 해제되었거나 다음 수집이 시작됐으면 그대로 둠)"""
+        with self.lock:
+            if self.cycle != cycle or not self.collecting:
                 return False
-
-            log(f"   [RAW] 센서 응답: '{line}'")
-            soil_data = parse_soil_csv(line)
-            log(f"   데이터: temp={soil_data['temperature']}, humidity={soil_data['humidity']}, ec={soil_data['ec']}, ph={soil_data['ph']}")
-
-            # 이미지 촬영
-            img_path = None
-            if with_image:
-                ts = int(time.time())
-                img_filename = f"farm_{ts}.jpg"
-                if TEST_MODE:
-                    img_path = get_test_image(img_filename)
-                else:
-                    img_path = capture_image(img_filename, cam_index=CAM_INDEX)
-                log(f"   이미지: {img_path}")
-
-            # 서버 업로드
-            result = upload_sensor_data('A', soil_data, img_path)
-            log(f"✅ 토양 데이터 업로드 완료: records={result.get('records_created')}")
-            if result.get('ai_task_id'):
-                log(f"   AI 분석 시작: task_id={result.get('ai_task_id')}")
+            self.collecting = False
+            self.collecting_command = None
             return True
 
+    def _release_stuck(self, cycle: int):
+        """수집이 COLLECT_TIMEOUT을 넘김 (watchdog) - 멈춘 스레드는 두고 다음 명령을 받을 수 있게 상태만 해제"""
+        if self._end(cycle):
+            self.log(f"🔓 수집이 {COLLECT_TIMEOUT:.0f}초를 넘겨 수집 상태를 해제했습니다")
+
+    def collect_soil(self, with_image: bool = True) -> bool:
+        """토양 센서 데이터 수집 및 업로드"""
+        if not self.sc_soil and not self.has_net("A"):
+            self.log("❌ 토양 센서가 연결되지 않았습니다")
+            return False
+        if self.sc_soil and not self.sc_soil.connected and not self.has_net("A"):
+            self.log(f"❌ 토양 센서 포트 끊김 ({self.sc_soil.port}), 재연결 대기 중")
+            return False
+
+        cycle = self._begin("A")
+        if cycle is None:
+            self.log("⚠️ 이미 수집 중입니다")
+            return False
+
+        started = time.perf_counter()
+        try:
+            with self._guard("collect.A", COLLECT_TIMEOUT, abort=lambda: self._release_stuck(cycle)):
+                self.log("🌱 토양 센서(A) 데이터 수집 시작...")
+                readings = self._sample(self._read_soil_once, SoilReading)
+
+                if not readings:
+                    self.log("❌ 토양 센서 응답 없음")
+                    metrics.count("collect.A.no_response")
+                    return False
+
+                for soil_data, stats in readings:
+                    self.log(f"   데이터[{soil_data.address}]: temp={soil_data.temperature}, humidity={soil_data.humidity}, ec={soil_data.ec}, ph={soil_data.ph}")
+                    if stats:
+                        rejected = {k: v["rejected"] for k, v in stats["fields"].items() if v["rejected"]}
+                        self.log(f"   오버샘플링: {stats['samples']}회 측정, 이상치 제외={rejected or '없음'}")
+
+                # 이미지 촬영 (저장소에 측정값 ID로 연결, 업로드가 끝날 때까지 삭제 보호)
+                img_path = None
+                reading_ids = []
+                if with_image:
+                    reading_ids = [soil_data.reading_id for soil_data, _ in readings]
+                    with metrics.span("collect.image"):
+                        if TEST_MODE:
+                            img_path = self.images.put_file(TEST_IMAGE, reading_ids)
+                        else:
+                            ts = int(time.time())
+                            captured = self.capture(f"{self.config.name}_{ts}.jpg")
+                            img_path = self.images.put_file(captured, reading_ids, move=True)
+
+                try:
+                    if img_path:
+                        self.log(f"   이미지: {img_path}")
+                        self.maintain_images()
+
+                    # 서버 업로드 (이미지는 첫 번째 측정값에만 첨부)
+                    for soil_data, stats in readings:
+                        result = self.upload('A', soil_data, img_path, stats)
+                        img_path = None
+                        event("upload", farm=self.config.name, command="A", address=soil_data.address,
+                              records=result.get('records_created'), ai_task_id=result.get('ai_task_id'))
+                finally:
+                    # 실패/시간 초과도 보호 해제 - 다시 보내지 않으므로 남겨 두면 용량 제한만 막힘
+                    self.images.release(*reading_ids)
+                metrics.count("collect.A.ok")
+                return True
+
         except Exception as e:
-            log(f"❌ 토양 센서 처리 실패: {e}")
+            self.log(f"❌ 토양 센서 처리 실패: {e}")
+            metrics.count("collect.A.failed")
             return False
         finally:
-            self.collecting = False
+            metrics.observe("collect.A", time.perf_counter() - started)
+            self._end(cycle)
 
     def collect_env(self) -> bool:
         """환경 센서 데이터 수집 및 업로드"""
-        if not self.sc_env:
-            log("❌ 환경 센서가 연결되지 않았습니다")
+        if not self.sc_env and not self.has_net("B"):
+            self.log("❌ 환경 센서가 연결되지 않았습니다")
+            return False
+        if self.sc_env and not self.sc_env.connected and not self.has_net("B"):
+            self.log(f"❌ 환경 센서 포트 끊김 ({self.sc_env.port}), 재연결 대기 중")
             return False
 
-        with self.lock:
-            if self.collecting:
-                log("⚠️ 이미 수집 중입니다")
-                return False
-            self.collecting = True
+        cycle = self._begin("B")
+        if cycle is None:
+            self.log("⚠️ 이미 수집 중입니다")
+            return False
 
+        started = time.perf_counter()
         try:
-            log("🌿 환경 센서(B) 데이터 수집 시작...")
-            self.sc_env.send("B")
-            line = self.sc_env.receive()
+            with self._guard("collect.B", COLLECT_TIMEOUT, abort=lambda: self._release_stuck(cycle)):
+                self.log("🌿 환경 센서(B) 데이터 수집 시작...")
+                readings = self._sample(self._read_env_once, EnvReading)
 
-            if not line:
-                log("❌ 환경 센서 응답 없음")
-                return False
+                if not readings:
+                    self.log("❌ 환경 센서 응답 없음")
+                    metrics.count("collect.B.no_response")
+                    return False
 
-            env_data = parse_env_csv(line)
-            log(f"   데이터: temp={env_data['temperature']}, humidity={env_data['humidity']}, co2={env_data['co2']}, pm25={env_data['pm25']}")
+                for env_data, stats in readings:
+                    self.log(f"   데이터[{env_data.address}]: temp={env_data.temperature}, humidity={env_data.humidity}, co2={env_data.co2}, pm25={env_data.pm25}")
 
-            # 서버 업로드 (이미지 없음)
-            result = upload_sensor_data('B', env_data)
-            log(f"✅ 환경 데이터 업로드 완료: records={result.get('records_created')}")
-            return True
+                    # 서버 업로드 (이미지 없음)
+                    result = self.upload('B', env_data, stats=stats)
+                    event("upload", farm=self.config.name, command="B", address=env_data.address, records=result.get('records_created'))
+                metrics.count("collect.B.ok")
+                return True
 
         except Exception as e:
-            log(f"❌ 환경 센서 처리 실패: {e}")
+            self.log(f"❌ 환경 센서 처리 실패: {e}")
+            metrics.count("collect.B.failed")
             return False
         finally:
-            self.collecting = False
+            metrics.observe("collect.B", time.perf_counter() - started)
+            self._end(cycle)
 
     def collect_all(self) -> bool:
         """전체 센서 데이터 수집"""
-        log("📡 전체 센서 데이터 수집 시작...")
+        self.log("📡 전체 센서 데이터 수집 시작...")
         soil_ok = self.collect_soil(with_image=True)
         time.sleep(1)  # 잠시 대기
         env_ok = self.collect_env()
         return soil_ok or env_ok
 
 
-def is_within_collection_window() -> bool:
-    """현재 시간이 수집 시간대 내인지 확인"""
+def camera_worker(frames: dict) -> dict:
+    """카메라 작업 프로세스 (Supervisor setup) - frames: 공유 메모리 프레임 링 spec"""
+    ring = FrameRing.attach(frames)
+    return {
+        "capture": capture_image,
+        "grab": lambda cam_index, count: grab_frames(ring, cam_index, count),
+    }
+
+
+def encoder_worker(frames: dict) -> dict:
+    """인코더 작업 프로세스 (Supervisor setup) - 링의 프레임을 복사 없이 읽어 선명도 비교 + JPEG 저장"""
+    ring = FrameRing.attach(frames)
+    return {"encode_best": lambda refs, filename: encode_best(ring, refs, filename)}
+
+
+def upload_worker() -> dict:
+    """업로드 작업 프로세스 (Supervisor setup) - 연결 풀은 작업 프로세스 안에서 재사용"""
+    return {"upload": upload_sensor_data}
+
+
+def is_within_collection_window(config: FarmConfig) -> bool:
+    """현재 시간이 농가의 수집 시간대 내인지 확인"""
     now = datetime.now().time()
-    start = datetime.strptime(COLLECTION_START_TIME, "%H:%M").time()
-    end = datetime.strptime(COLLECTION_END_TIME, "%H:%M").time()
+    start = datetime.strptime(config.start_time, "%H:%M").time()
+    end = datetime.strptime(config.end_time, "%H:%M").time()
 
     if start <= end:
         # 일반적인 경우: 09:00 ~ 18:00
@@ -359,36 +757,84 @@ def is_within_collection_window() -> bool:
         return now >= start or now <= end
 
 
-def main():
-    global COLLECTION_START_TIME, COLLECTION_END_TIME, INTERVAL_MINUTES
-
-    log("=" * 50)
-    log("MQTT 기반 센서 데이터 수집 시작")
-    log("=" * 50)
-    log(f"서버: {SERVER_URL}")
-    log(f"MQTT 브로커: {MQTT_BROKER}:{MQTT_PORT}")
-    log(f"Farm ID: {FARM_ID}")
-    log(f"Organization ID: {ORG_ID}")
-    log(f"토양 센서 API Key: {API_KEY_SOIL[:20] if API_KEY_SOIL else '(미설정)'}...")
-    log(f"식물 센서 API Key: {API_KEY_PLANT[:20] if API_KEY_PLANT else '(미설정)'}...")
-    log("")
-
-    # 서버에서 현재 수집 스케줄 가져오기
-    fetch_schedule_from_server()
-
-    log(f"적용된 수집 스케줄: {COLLECTION_START_TIME} ~ {COLLECTION_END_TIME}, {INTERVAL_MINUTES}분 간격")
-    log("")
-
-    # 센서 초기화
-    collector = SensorCollector()
-    if not collector.initialize():
-        log("❌ 연결된 센서가 없습니다")
-        return
-
-    # MQTT 명령 핸들러
-    def handle_command(action: str, payload: dict):
-        """MQTT 명령 처리"""
-        log(f"🎯 MQTT 명령 수신: {action}")
+def load_farm_configs() -> List[FarmConfig]:
+    """게이트웨이 설정(farms.json)이 있으면 그 농가들, 없으면 .env의 농가 하나"""
+    if FARMS_FILE.exists():
+        return load_farms(FARMS_FILE, DATA_DIR)
+    return [FarmConfig(
+        farm_id=FARM_ID,
+        organization_id=ORG_ID,
+        api_key_soil=API_KEY_SOIL,
+        api_key_plant=API_KEY_PLANT,
+        soil_port=find_soil_sensor_port(),
+        env_port=find_env_sensor_port(),
+        cam_index=CAM_INDEX,
+        soil_bus_addresses=SOIL_BUS_ADDRESSES,
+        env_bus_addresses=ENV_BUS_ADDRESSES,
+        net_nodes=NET_SENSOR_NODES,
+        data_dir=DATA_DIR,
+    )]
+
+
+def run_logged(func, *args):
+    """작업 스레드에서 실행 (예외는 로그로 남김 - 다른 농가의 작업은 계속)"""
+    try:
+        func(*args)
+    except Exception as e:
+        log(f"❌ 작업 실패 ({getattr(func, '__name__', func)}): {e}")
+
+
+def interval_label(minutes: int) -> str:
+    """수집 간격 표시 (예: 90 → "1시간 30분", 120 → "2시간")"""
+    if minutes >= 60 and minutes % 60 == 0:
+        return f"{minutes // 60}시간"
+    if minutes >= 60:
+        return f"{minutes // 60}시간 {minutes % 60}분"
+    return f"{minutes}분"
+
+
+class FarmRuntime:
+    """농가 하나의 MQTT 명령/스케줄 처리와 스케줄 기반 자동 수집 상태"""
+
+    def __init__(self, collector: SensorCollector, channel: FarmChannel):
+        self.config = collector.config
+        self.collector = collector
+        self.channel = channel
+        self.was_in_window = False
+        self.last_auto_collect = time.time()
+
+        # 실시간 스트리밍 (환경 센서) - 스케줄 수집 중이거나 포트 사용 중이면 측정을 건너뜀
+        self.stream = None
+        if collector.sc_env or collector.has_net("B"):
+            # 네트워크 노드만 있으면 포트 잠금 대신 노드 연결 풀이 요청 순서를 지킴
+            lock = collector.sc_env.lock if collector.sc_env else threading.Lock()
+            self.stream = LiveStream(collector._read_env_once, channel.publish_stream, lock,
+                                     EnvReading.VALUE_FIELDS, busy=lambda: collector.collecting_command == "B",
+                                     min_interval=STREAM_MIN_INTERVAL, max_duration=STREAM_MAX_DURATION)
+            self.stream.on_stop = lambda reason, stats: channel.publish_status(
+                "stream_stopped", {"reason": reason, **stats})
+
+    def log(self, msg: str):
+        self.collector.log(msg)
+
+    def status_details(self) -> dict:
+        collector = self.collector
+        details = {
+            "soil_connected": bool(collector.sc_soil and collector.sc_soil.connected) or collector.has_net("A"),
+            "env_connected": bool(collector.sc_env and collector.sc_env.connected) or collector.has_net("B"),
+            "serial": collector.serial_status(),
+            "schedule": self.config.schedule(),
+        }
+        if collector.workers:
+            details["workers"] = collector.workers.stats()
+        details["watchdog"] = watchdog.stats()
+        details["uploads"] = uploads.stats()
+        return details
+
+    def handle_command(self, action: str, payload: dict):
+        """MQTT 명령 처리 (작업 스레드에서 실행)"""
+        collector = self.collector
+        event("command", farm=self.config.name, action=action, request_id=payload.get("request_id"))
 
         if action == "collect_soil":
             collector.collect_soil(with_image=True)
@@ -396,155 +842,371 @@ def main():
             collector.collect_env()
         elif action == "collect_all":
             collector.collect_all()
+        elif action == "rollup":
+            # 예: {"action": "rollup", "series": "soil", "tier": "1h", "hours": 24}
+            series = payload.get("series", "soil")
+            tier = payload.get("tier", "1h")
+            hours = float(payload.get("hours", 24))
+            try:
+                summaries = collector.query_rollup(series, tier, start=time.time() - hours * 3600)
+                self.channel.publish_rollup(series, tier, summaries)
+            except (KeyError, StopIteration):
+                self.log(f"⚠️ 알 수 없는 집계: {series}/{tier}")
+        elif action == "logs":
+            # 예: {"action": "logs", "limit": 100, "level": "WARNING", "event": "upload"}
+            entries = recent(int(payload.get("limit", 100)), payload.get("level"), payload.get("event"))
+            self.channel.publish_logs(entries, payload.get("request_id"))
+        elif action == "stream_start":
+            # 예: {"action": "stream_start", "interval": 1.0, "duration": 300}
+            if not self.stream:
+                self.log("❌ 환경 센서가 연결되지 않아 스트리밍할 수 없습니다")
+                self.channel.publish_status("stream_error", {"request_id": payload.get("request_id"),
+                                                             "error": "env sensor not connected"})
+                return
+            try:
+                settings = self.stream.start(payload.get("interval"), payload.get("duration"))
+            except (TypeError, ValueError):
+                self.log(f"⚠️ 잘못된 스트리밍 설정: {payload}")
+                return
+            self.channel.publish_status("stream_started", {"request_id": payload.get("request_id"),
+                                                           "topic": f"farm/{self.config.farm_id}/stream",
+                                                           **settings})
+        elif action == "stream_stop":
+            if self.stream:
+                stats = self.stream.stop("command")
+                self.channel.publish_status("stream_stopped", {"request_id": payload.get("request_id"),
+                                                               "reason": "command", **stats})
         elif action == "status":
-            mqtt_client.publish_status("online", {
-                "soil_connected": collector.sc_soil is not None,
-                "env_connected": collector.sc_env is not None,
-                "schedule": {
-                    "start_time": COLLECTION_START_TIME,
-                    "end_time": COLLECTION_END_TIME,
-                    "interval_minutes": INTERVAL_MINUTES
-                }
+            self.channel.publish_status("online", {
+                **self.status_details(),
+                "images": collector.images.stats(),
+                "mqtt": self.channel.buffer_stats(),
+                "stream": self.stream.stats() if self.stream else None,
             })
         else:
-            log(f"⚠️ 알 수 없는 명령: {action}")
+            self.log(f"⚠️ 알 수 없는 명령: {action}")
 
-    # 수집 스케줄 업데이트 핸들러
-    def handle_schedule_update(start_time: str, end_time: str, interval_minutes: int, payload: dict):
+    def handle_schedule_update(self, start_time: str, end_time: str, interval_minutes: int, payload: dict):
         """서버에서 수집 스케줄 변경 시 처리"""
-        global COLLECTION_START_TIME, COLLECTION_END_TIME, INTERVAL_MINUTES
+        config = self.config
 
         # 변경 전 값 저장
-        old_start = COLLECTION_START_TIME
-        old_end = COLLECTION_END_TIME
-        old_interval = INTERVAL_MINUTES
+        old_start = config.start_time
+        old_end = config.end_time
+        old_interval = config.interval_minutes
 
         # 새 값 적용
-        COLLECTION_START_TIME = start_time
-        COLLECTION_END_TIME = end_time
-        INTERVAL_MINUTES = interval_minutes
+        config.start_time = start_time
+        config.end_time = end_time
+        config.interval_minutes = interval_minutes
 
         # 변경 사항 확인
         time_changed = (old_start != start_time) or (old_end != end_time)
         interval_changed = old_interval != interval_minutes
 
         # 눈에 띄는 로그 출력
-        log("")
-        log("=" * 60)
-        log("🔔 서버에서 수집 스케줄 변경 알림 수신")
-        log("=" * 60)
+        self.log("")
+        self.log("=" * 60)
+        self.log("🔔 서버에서 수집 스케줄 변경 알림 수신")
+        self.log("=" * 60)
 
         if time_changed:
-            log(f"   📅 수집 시간대: {old_start} ~ {old_end}  →  {start_time} ~ {end_time}")
+            self.log(f"   📅 수집 시간대: {old_start} ~ {old_end}  →  {start_time} ~ {end_time}")
         else:
-            log(f"   📅 수집 시간대: {start_time} ~ {end_time} (변경 없음)")
+            self.log(f"   📅 수집 시간대: {start_time} ~ {end_time} (변경 없음)")
 
         if interval_changed:
-            # 간격을 읽기 쉽게 변환
-            old_label = f"{old_interval // 60}시간 {old_interval % 60}분" if old_interval >= 60 else f"{old_interval}분"
-            new_label = f"{interval_minutes // 60}시간 {interval_minutes % 60}분" if interval_minutes >= 60 else f"{interval_minutes}분"
-            if old_interval >= 60 and old_interval % 60 == 0:
-                old_label = f"{old_interval // 60}시간"
-            if interval_minutes >= 60 and interval_minutes % 60 == 0:
-                new_label = f"{interval_minutes // 60}시간"
-            log(f"   ⏱️  수집 간격: {old_label}  →  {new_label}")
+            self.log(f"   ⏱️  수집 간격: {interval_label(old_interval)}  →  {interval_label(interval_minutes)}")
         else:
-            log(f"   ⏱️  수집 간격: {interval_minutes}분 (변경 없음)")
+            self.log(f"   ⏱️  수집 간격: {interval_minutes}분 (변경 없음)")
 
-        log("-" * 60)
-        log(f"   ✅ 변경된 설정이 즉시 적용되었습니다")
-        log(f"   📡 다음 자동 수집은 현재 설정에 따라 실행됩니다")
-        log("=" * 60)
-        log("")
+        self.log("-" * 60)
+        self.log(f"   ✅ 변경된 설정이 즉시 적용되었습니다")
+        self.log(f"   📡 다음 자동 수집은 현재 설정에 따라 실행됩니다")
+        self.log("=" * 60)
+        self.log("")
 
         # MQTT 상태 업데이트 발행
-        mqtt_client.publish_status("schedule_updated", {
+        self.channel.publish_status("schedule_updated", {
             "old_schedule": {
                 "start_time": old_start,
                 "end_time": old_end,
                 "interval_minutes": old_interval
             },
-            "new_schedule": {
-                "start_time": start_time,
-                "end_time": end_time,
-                "interval_minutes": interval_minutes
-            }
+            "new_schedule": config.schedule(),
         })
 
-    # MQTT 클라이언트 시작
+    def handle_device_event(self, change: str, name: str, client):
+        """센서 분리/재연결 시 서버에 상태 알림"""
+        stats = client.stats()
+        event("serial", farm=self.config.name, sensor=name, change=change, port=client.port,
+              reconnects=stats["reconnect_count"])
+        self.channel.publish_status(f"serial_{change}", {"sensor": name, **stats})
+
+    def handle_watchdog_trip(self, trip: dict):
+        """촬영/시리얼/업로드/수집이 제한 시간을 넘겨 중단되면 서버에 알림"""
+        self.channel.publish_status("watchdog_trip", trip)
+
+    def handle_rollup(self, series: str, tier, summary: dict):
+        """집계 구간이 끝나면 요약만 MQTT로 발행 (원본 스트림 대신)"""
+        if tier.name in ROLLUP_PUBLISH_TIERS:
+            self.channel.publish_rollup(series, tier.name, [summary])
+
+    def collect_scheduled(self):
+        self.collector.collect_all()
+        self.log(f"   다음 수집: {self.config.interval_minutes}분 후")
+
+    def start(self, pool: ThreadPoolExecutor):
+        """시작 시 즉시 수집 (수집 시간대 내인 경우)"""
+        self.was_in_window = is_within_collection_window(self.config)
+        if self.was_in_window:
+            self.log("🚀 시작 시 즉시 데이터 수집 실행...")
+            pool.submit(run_logged, self.collect_scheduled)
+        else:
+            self.log(f"   현재 수집 시간대 외입니다. {self.config.start_time}에 수집이 시작됩니다.")
+        self.last_auto_collect = time.time()  # 즉시 수집 후 타이머 시작
+
+    def tick(self, current_time: float, pool: ThreadPoolExecutor):
+        """메인 루프에서 30초마다 호출: 스케줄 기반 자동 수집 + 집계 유지"""
+        in_window = is_within_collection_window(self.config)
+
+        # 수집 시간대 진입 감지
+        if in_window and not self.was_in_window:
+            self.log(f"📅 수집 시간대 시작: {self.config.start_time}")
+            self.last_auto_collect = current_time  # 즉시 수집하지 않고 다음 간격에 수집
+
+        # 수집 시간대 종료 감지
+        if not in_window and self.was_in_window:
+            self.log(f"📅 수집 시간대 종료: {self.config.end_time}")
+
+        self.was_in_window = in_window
+
+        # 수집 시간대 내에서만 자동 수집 (간격 체크, 분 단위)
+        if in_window and current_time - self.last_auto_collect >= self.config.interval_minutes * 60:
+            self.log("⏰ 스케줄 기반 자동 수집 실행")
+            pool.submit(run_logged, self.collect_scheduled)
+            self.last_auto_collect = current_time
+
+        self.collector.maintain_rollups()
+
+
+def main():
+    log_handler = setup_logging(LOG_FILE, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                                events_file=EVENTS_FILE)
+    if METRICS_SPAN_EVENTS:
+        metrics.add_sink(event_sink)
+
+    try:
+        farms = load_farm_configs()
+    except (OSError, ValueError) as e:
+        log(f"❌ 농가 설정 파일 오류 ({FARMS_FILE}): {e}")
+        return
+    gateway = len(farms) > 1
+
+    log("=" * 50)
+    log("MQTT 기반 센서 데이터 수집 시작" + (f" (게이트웨이: 농가 {len(farms)}곳)" if gateway else ""))
+    log("=" * 50)
+    log(f"서버: {SERVER_URL}")
+    log(f"MQTT 브로커: {MQTT_BROKER}:{MQTT_PORT}")
+    for config in farms:
+        log(f"Farm ID: {config.farm_id}" + (f" ({config.name})" if gateway else ""))
+        log(f"Organization ID: {config.organization_id}")
+        log(f"토양 센서 API Key: {config.api_key_soil[:20] if config.api_key_soil else '(미설정)'}...")
+        log(f"식물 센서 API Key: {config.api_key_plant[:20] if config.api_key_plant else '(미설정)'}...")
+    log("")
+
+    # 서버에서 현재 수집 스케줄 가져오기
+    for config in farms:
+        fetch_schedule_from_server(config)
+        log(f"적용된 수집 스케줄: {config.start_time} ~ {config.end_time}, {config.interval_minutes}분 간격")
+    log("")
+
+    # MQTT 클라이언트 (게이트웨이 모드도 연결 하나 - 농가별 명령은 토픽으로 구분)
     mqtt_client = SensorMQTTClient(
         broker_host=MQTT_BROKER,
         broker_port=MQTT_PORT,
-        farm_id=FARM_ID,
-        organization_id=ORG_ID
+        farm_id=None if gateway else farms[0].farm_id,
+        organization_id=None if gateway else farms[0].organization_id,
+        client_id=MQTT_CLIENT_ID or None,
+        client_id_file=MQTT_CLIENT_ID_FILE,
+        codec=MQTT_CODEC
     )
-    mqtt_client.on_command(handle_command)
-    mqtt_client.on_schedule_update(handle_schedule_update)
+
+    # 수집/명령 처리 작업 스레드 (모든 농가 공유) - MQTT 네트워크 스레드가 수집을 기다리지 않도록
+    pool = ThreadPoolExecutor(max_workers=max(2, min(FARM_WORKERS, len(farms) + 1)), thread_name_prefix="farm")
+    # 게이트웨이 모드는 포트 감시 스레드도 하나만
+    watcher = DeviceWatcher(interval=DEVICE_WATCH_INTERVAL) if gateway else None
+
+    # 작업 프로세스 (카메라/업로드 - 네트워크 노드 폴링은 농가 초기화 때 추가)
+    supervisor = None
+    frames = None
+    if PROCESS_WORKERS:
+        supervisor = Supervisor()
+        frames = FrameRing(slots=CAPTURE_FRAMES * 2, max_shape=FRAME_MAX_SHAPE)
+        supervisor.add("camera", camera_worker, frames.spec())
+        supervisor.add("encoder", encoder_worker, frames.spec())
+        supervisor.add("upload", upload_worker)
+        supervisor.start()
+
+    # 센서 초기화
+    runtimes: List[FarmRuntime] = []
+    for config in farms:
+        collector = SensorCollector(config, f"[{config.name}] " if gateway else "", watcher, supervisor)
+        try:
+            connected = collector.initialize()
+        except Exception as e:
+            collector.log(f"❌ 센서 초기화 실패: {e}")
+            connected = False
+        if not connected:
+            collector.log("❌ 연결된 센서가 없습니다")
+            collector.close()
+            continue
+
+        runtime = FarmRuntime(collector, mqtt_client.channel(config.farm_id))
+        runtimes.append(runtime)
+        mqtt_client.on_command(lambda action, payload, rt=runtime: pool.submit(run_logged, rt.handle_command,
+                                                                               action, payload),
+                               farm_id=config.farm_id)
+        mqtt_client.on_schedule_update(runtime.handle_schedule_update, organization_id=config.organization_id)
+        for rollup in collector.rollups.values():
+            rollup.on_rollup = runtime.handle_rollup
+        collector.on_watchdog_trip = runtime.handle_watchdog_trip
+        if collector.own_watcher:
+            collector.watcher.on_event = runtime.handle_device_event
+
+    if not runtimes:
+        log("❌ 연결된 센서가 없습니다")
+        pool.shutdown()
+        if supervisor:
+            supervisor.stop()
+            frames.close()
+        return
+
+    if watcher:
+        by_name = {rt.config.name: rt for rt in runtimes}
+
+        def handle_device_event(change: str, name: str, client):
+            farm_name, _, sensor = name.partition("/")
+            by_name[farm_name].handle_device_event(change, sensor, client)
+
+        watcher.on_event = handle_device_event
+
+    # 로컬 메트릭 엔드포인트 (별도 스레드 - 스크랩이 수집을 방해하지 않음)
+    metrics_server = None
+    if METRICS_PORT:
+        metrics_server = MetricsServer(METRICS_PORT, METRICS_HOST)
+        metrics_server.gauge("sensor_log_queue_depth", log_handler.queue.qsize)
+        metrics_server.gauge("sensor_log_dropped", lambda: log_handler.dropped)
+        metrics_server.gauge("sensor_mqtt_connected", lambda: int(mqtt_client.connected))
+        metrics_server.gauge("sensor_mqtt_reconnects", lambda: mqtt_client.reconnect_count)
+        metrics_server.gauge("sensor_mqtt_disconnects", lambda: mqtt_client.disconnect_count)
+        metrics_server.gauge("sensor_mqtt_offline_buffered", lambda: len(mqtt_client.offline_buffer))
+        metrics_server.gauge("sensor_mqtt_offline_dropped", lambda: mqtt_client.dropped_count)
+        metrics_server.gauge("sensor_mqtt_offline_delayed", lambda: mqtt_client.delayed_count)
+        metrics_server.gauge("sensor_upload_concurrency_limit", lambda: uploads.limit)
+        metrics_server.gauge("sensor_upload_throughput_bytes", lambda: uploads.throughput)
+        for lane in ("sensor", "image"):
+            metrics_server.gauge("sensor_upload_waiting", lambda l=lane: uploads.waiting[l], lane=lane)
+        for rt in runtimes:
+            farm = rt.config.name
+            images = rt.collector.images
+            metrics_server.gauge("sensor_images_pending", lambda i=images: i.stats()["pending"], farm=farm)
+            metrics_server.gauge("sensor_images_bytes", lambda i=images: i.stats()["bytes"], farm=farm)
+            for name, client in (("soil", rt.collector.sc_soil), ("env", rt.collector.sc_env)):
+                if client:
+                    metrics_server.gauge("sensor_serial_connected", lambda c=client: int(c.connected),
+                                         farm=farm, sensor=name)
+                    metrics_server.gauge("sensor_serial_reconnects", lambda c=client: c.reconnect_count,
+                                         farm=farm, sensor=name)
+            if rt.collector.net:
+                metrics_server.gauge("sensor_net_nodes_up", lambda n=rt.collector.net: n.summary()["up"], farm=farm)
+        if supervisor:
+            for name, worker in supervisor.workers.items():
+                metrics_server.gauge("sensor_worker_cpu_percent", lambda w=worker: w.stats()["cpu_pct"], worker=name)
+                metrics_server.gauge("sensor_worker_rss_mb", lambda w=worker: w.stats()["rss_mb"], worker=name)
+                metrics_server.gauge("sensor_worker_restarts", lambda w=worker: w.restarts, worker=name)
+        try:
+            metrics_server.start()
+        except OSError as e:
+            log(f"⚠️ 메트릭 엔드포인트 시작 실패 (포트 {METRICS_PORT}): {e}")
+            metrics_server = None
+
+    # 주기적 상태 보고 (바뀐 값만 짧게) - 게이트웨이 모드는 첫 번째 농가 토픽에 농가별 값을 모아서 보냄
+    telemetry = None
+    if TELEMETRY_INTERVAL > 0:
+        telemetry = TelemetryReporter(runtimes[0].channel.publish_telemetry, interval=TELEMETRY_INTERVAL)
+        telemetry.gauge("disk_mb", lambda: shutil.disk_usage(DATA_DIR).free // 1048576)
+        telemetry.gauge("log_q", log_handler.queue.qsize)
+        telemetry.gauge("mqtt_reconn", lambda: mqtt_client.reconnect_count)
+        telemetry.gauge("mqtt_buf", lambda: len(mqtt_client.offline_buffer))
+        telemetry.gauge("mqtt_drop", lambda: mqtt_client.dropped_count)
+        telemetry.gauge("up_limit", lambda: round(uploads.limit, 2))
+        telemetry.gauge("up_wait_img", lambda: uploads.waiting["image"])
+        for rt in runtimes:
+            prefix = f"{rt.config.name}." if gateway else ""
+            last = rt.collector.last_reading
+            telemetry.gauge(f"{prefix}last.A", lambda r=last: int(r["A"]) if "A" in r else None)
+            telemetry.gauge(f"{prefix}last.B", lambda r=last: int(r["B"]) if "B" in r else None)
+            telemetry.gauge(f"{prefix}img_pending", lambda i=rt.collector.images: i.stats()["pending"])
+            for name, client in (("soil", rt.collector.sc_soil), ("env", rt.collector.sc_env)):
+                if client:
+                    telemetry.gauge(f"{prefix}serial.{name}", lambda c=client: int(c.connected))
+            if rt.collector.net:
+                telemetry.gauge(f"{prefix}net_up", lambda n=rt.collector.net: n.summary()["up"])
+        if supervisor:
+            for name, worker in supervisor.workers.items():
+                telemetry.gauge(f"w.{name}.cpu", lambda w=worker: w.stats()["cpu_pct"])
+                telemetry.gauge(f"w.{name}.rss_mb", lambda w=worker: w.stats()["rss_mb"])
+                telemetry.gauge(f"w.{name}.restarts", lambda w=worker: w.restarts)
 
     try:
+        # 브로커에 연결되지 않아도 바로 반환 (백그라운드에서 재시도, 상태 메시지는 보관 후 전송)
         mqtt_client.connect()
-        mqtt_client.publish_status("online", {
-            "soil_connected": collector.sc_soil is not None,
-            "env_connected": collector.sc_env is not None,
-            "schedule": {
-                "start_time": COLLECTION_START_TIME,
-                "end_time": COLLECTION_END_TIME,
-                "interval_minutes": INTERVAL_MINUTES
-            }
-        })
+        for rt in runtimes:
+            rt.channel.publish_status("online", rt.status_details())
+
+        if telemetry:
+            telemetry.start()
 
         log("")
         log("🟢 MQTT 명령 대기 중... (Ctrl+C로 종료)")
-        log(f"   수집 스케줄: {COLLECTION_START_TIME} ~ {COLLECTION_END_TIME}")
-        log(f"   수집 간격: {INTERVAL_MINUTES}분")
-        log(f"   스케줄 토픽: organization/{ORG_ID}/settings/schedule")
+        for rt in runtimes:
+            rt.log(f"   수집 스케줄: {rt.config.start_time} ~ {rt.config.end_time}")
+            rt.log(f"   수집 간격: {rt.config.interval_minutes}분")
+        for organization_id in mqtt_client.organization_ids():
+            log(f"   스케줄 토픽: organization/{organization_id}/settings/schedule")
         log("")
 
-        # 메인 루프: 스케줄 기반 자동 수집 + MQTT 명령 대기
-        was_in_window = is_within_collection_window()
-
-        # 시작 시 즉시 수집 실행 (수집 시간대 내인 경우)
-        if was_in_window:
-            log("🚀 시작 시 즉시 데이터 수집 실행...")
-            collector.collect_all()
-            log(f"   다음 수집: {INTERVAL_MINUTES}분 후")
-        else:
-            log(f"   현재 수집 시간대 외입니다. {COLLECTION_START_TIME}에 수집이 시작됩니다.")
-
-        last_auto_collect = time.time()  # 즉시 수집 후 타이머 시작
+        # 메인 루프: 스케줄 기반 자동 수집 + MQTT 명령 대기 (수집은 작업 스레드에서)
+        for rt in runtimes:
+            rt.start(pool)
 
         while True:
             current_time = time.time()
-            in_window = is_within_collection_window()
-
-            # 수집 시간대 진입 감지
-            if in_window and not was_in_window:
-                log(f"📅 수집 시간대 시작: {COLLECTION_START_TIME}")
-                last_auto_collect = current_time  # 즉시 수집하지 않고 다음 간격에 수집
-
-            # 수집 시간대 종료 감지
-            if not in_window and was_in_window:
-                log(f"📅 수집 시간대 종료: {COLLECTION_END_TIME}")
-
-            was_in_window = in_window
-
-            # 수집 시간대 내에서만 자동 수집
-            if in_window:
-                # 간격 체크 (분 단위)
-                if current_time - last_auto_collect >= INTERVAL_MINUTES * 60:
-                    log("⏰ 스케줄 기반 자동 수집 실행")
-                    collector.collect_all()
-                    last_auto_collect = current_time
-                    log(f"   다음 수집: {INTERVAL_MINUTES}분 후")
-
+            for rt in runtimes:
+                rt.tick(current_time, pool)
             time.sleep(30)  # 30초마다 체크
 
     except KeyboardInterrupt:
         log("\n사용자에 의해 종료됨")
     finally:
-        mqtt_client.publish_status("offline")
+        for rt in runtimes:
+            if rt.stream:
+                rt.stream.stop("shutdown")
+            rt.channel.publish_status("offline")
         mqtt_client.disconnect()
-        collector.close()
+        if telemetry:
+            telemetry.stop()
+        if metrics_server:
+            metrics_server.stop()
+        pool.shutdown(wait=True)  # 진행 중인 수집/업로드가 끝난 뒤 저장소 닫기
+        if supervisor:
+            supervisor.stop()
+            frames.close()
+        if watcher:
+            watcher.stop()
+        for rt in runtimes:
+            rt.collector.close()
 
 
 if __name__ == "__main__":
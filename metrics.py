@@ -0,0 +1,170 @@
+"""단계별 지연 시간 측정 (구간 타이머 + 고정 버킷 히스토그램 + 카운터)
+
+수집 경로의 각 단계(시리얼 대기, 파싱, 카메라, 업로드 등)를 구간(span)으로 감싸
+지연 시간 히스토그램과 호출/오류 횟수를 모읍니다.
+
+    with metrics.span("camera.open"):
+        cap = cv2.VideoCapture(...)
+
+- 꺼져 있으면(METRICS_ENABLED=false) span()은 아무 일도 하지 않는 공용 객체를 반환
+- 히스토그램은 버킷 경계가 고정되어 있어 값 하나 기록이 O(log 버킷 수), 메모리 고정
+- 싱크(add_sink): 구간이 끝날 때마다 (단계, 초, 오류 여부)를 받는 함수 - 이벤트 로그 등으로 내보내기
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from event_log import event
+
+# 지연 시간 버킷 경계 (초) - 시리얼 응답(ms)부터 업로드/카메라(수 초)까지
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sink = Callable[[str, float, bool], None]
+
+
+def bucket_quantile(buckets: Sequence[float], counts: Sequence[int], q: float) -> float:
+    """버킷 개수에서 선형 보간한 분위수 추정 (예: q=0.95 → p95)
+
+    counts는 버킷별 개수 (마지막 칸: 가장 큰 경계 초과). 두 스냅샷의 차이를 넘기면 구간 분위수.
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, n in enumerate(counts):
+        if seen + n >= rank and n:
+            lo = buckets[i - 1] if i else 0.0
+            hi = buckets[i] if i < len(buckets) else buckets[-1]
+            return lo + (hi - lo) * (rank - seen) / n
+        seen += n
+    return buckets[-1]
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (Prometheus 방식: 버킷별 개수 + 합계 + 전체 개수)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸: 가장 큰 경계 초과
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        return bucket_quantile(self.buckets, self.counts, q)
+
+    def snapshot(self) -> dict:
+        return {"buckets": list(self.buckets), "counts": list(self.counts),
+                "sum": self.sum, "count": self.count}
+
+
+class _NullSpan:
+    """측정이 꺼져 있을 때 쓰는 구간 (아무것도 하지 않음)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("registry", "stage", "start")
+
+    def __init__(self, registry: "Registry", stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class Registry:
+    """단계별 히스토그램과 카운터 모음"""
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.sinks: List[Sink] = []
+        self.lock = threading.Lock()
+
+    def span(self, stage: str):
+        """단계 구간 타이머 (with 문). 예외로 끝나면 <단계>.errors 카운터 증가"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """함수 호출 전체를 구간으로 측정하는 래퍼 (파서 콜백 등)"""
+        def timed(*args, **kwargs):
+            with self.span(stage):
+                return func(*args, **kwargs)
+        return timed
+
+    def observe(self, stage: str, seconds: float, error: bool = False):
+        """구간 하나 기록 (외부에서 잰 시간도 가능, 예: 서버 응답 시간)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+            if error:
+                key = f"{stage}.errors"
+                self.counters[key] = self.counters.get(key, 0) + 1
+        for sink in self.sinks:
+            try:
+                sink(stage, seconds, error)
+            except Exception:
+                pass  # 내보내기 실패가 수집을 방해하지 않도록
+
+    def count(self, name: str, value: float = 1):
+        """카운터 증가 (업로드 바이트 수, 성공/실패 횟수 등)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_sink(self, sink: Sink):
+        self.sinks.append(sink)
+
+    def quantile(self, stage: str, q: float) -> float:
+        with self.lock:
+            hist = self.histograms.get(stage)
+            return hist.quantile(q) if hist else 0.0
+
+    def snapshot(self) -> Tuple[Dict[str, dict], Dict[str, float]]:
+        """(히스토그램, 카운터) 복사본"""
+        with self.lock:
+            return ({stage: h.snapshot() for stage, h in self.histograms.items()}, dict(self.counters))
+
+
+def event_sink(stage: str, seconds: float, error: bool):
+    """구간마다 이벤트 로그에 기록하는 싱크 (DEBUG 레벨 - 기본 설정에서는 만들어지지도 않음)"""
+    event("span", level=logging.DEBUG, stage=stage, ms=round(seconds * 1000, 2), error=error)
+
+
+metrics = Registry(enabled=os.environ.get("METRICS_ENABLED", "true").lower() not in ("0", "false", "no"))
@@ -0,0 +1,204 @@
+"""로컬 메트릭 HTTP 엔드포인트 (Prometheus 텍스트 형식)
+
+    curl http://127.0.0.1:9108/metrics
+
+별도 데몬 스레드의 HTTP 서버가 요청 시점에 metrics 레지스트리 스냅샷을 변환해 응답합니다.
+수집 스레드는 스냅샷 복사 동안만 잠금을 공유하므로 스크랩이 수집을 지연시키지 않습니다.
+
+- 단계별 지연 시간: sensor_stage_seconds{stage="serial.roundtrip"} (히스토그램)
+- 단계별 실패: sensor_stage_errors_total{stage=...}
+- 수집 결과: sensor_collect_total{command="A", result="ok|failed|no_response"}
+- 기타 카운터: sensor_<이름>_total (업로드 바이트 등)
+- 게이지: 등록한 함수 값 (큐 길이, MQTT 재연결 횟수 등) - 농가/작업 프로세스별 값은 같은 이름에 라벨로 구분
+  예: sensor_images_pending{farm="farm-01"}, sensor_worker_cpu_percent{worker="camera"} (값이 None이면 생략)
+- 프로세스: process_resident_memory_bytes, process_cpu_seconds_total
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import Registry, metrics
+
+try:
+    import psutil  # 선택 의존성 - 없으면 OS별 방법으로 RSS 조회
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_COLLECT_RE = re.compile(r"^collect\.(\w+)\.(ok|failed|no_response)$")
+
+
+def _rss_windows() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+    return counters.WorkingSetSize
+
+
+def process_rss() -> int:
+    """현재 프로세스 상주 메모리 (바이트, 알 수 없으면 0)"""
+    try:
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        if sys.platform == "win32":
+            return _rss_windows()
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+Gauges = Dict[str, List[Tuple[Dict[str, str], Callable[[], Optional[float]]]]]
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def render(registry: Registry, gauges: Gauges = None, started: float = None) -> str:
+    """레지스트리 + 게이지({이름: [(라벨, 조회 함수)]}) → Prometheus 텍스트 형식"""
+    histograms, counters = registry.snapshot()
+    lines: List[str] = []
+
+    if histograms:
+        lines += ["# HELP sensor_stage_seconds Latency of each collection stage",
+                  "# TYPE sensor_stage_seconds histogram"]
+        for stage in sorted(histograms):
+            h = histograms[stage]
+            stage_label = _label(stage)
+            cumulative = 0
+            for bound, n in zip(h["buckets"] + [float("inf")], h["counts"]):
+                cumulative += n
+                lines.append(f'sensor_stage_seconds_bucket{{stage="{stage_label}",le="{_number(bound)}"}} {cumulative}')
+            lines.append(f'sensor_stage_seconds_sum{{stage="{stage_label}"}} {_number(h["sum"])}')
+            lines.append(f'sensor_stage_seconds_count{{stage="{stage_label}"}} {h["count"]}')
+
+    errors = {k[:-len(".errors")]: v for k, v in counters.items() if k.endswith(".errors")}
+    if errors:
+        lines += ["# HELP sensor_stage_errors_total Stages that ended with an exception",
+                  "# TYPE sensor_stage_errors_total counter"]
+        lines += [f'sensor_stage_errors_total{{stage="{_label(s)}"}} {_number(v)}' for s, v in sorted(errors.items())]
+
+    collects = [(m.groups(), v) for k, v in counters.items() for m in [_COLLECT_RE.match(k)] if m]
+    if collects:
+        lines += ["# HELP sensor_collect_total Collection cycles by sensor command and result",
+                  "# TYPE sensor_collect_total counter"]
+        lines += [f'sensor_collect_total{{command="{c}",result="{r}"}} {_number(v)}' for (c, r), v in sorted(collects)]
+
+    for name in sorted(counters):
+        if name.endswith(".errors") or _COLLECT_RE.match(name):
+            continue
+        metric = f"sensor_{_metric_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {_number(counters[name])}"]
+
+    for name, series in sorted((gauges or {}).items()):
+        metric = _metric_name(name)
+        samples = []
+        for labels, read in series:
+            try:
+                value = read()
+            except Exception as e:
+                logger.debug(f"게이지 조회 실패 ({name}{_labels(labels)}): {e}")
+                continue
+            if value is not None:  # 아직 값이 없는 게이지는 생략
+                samples.append(f"{metric}{_labels(labels)} {_number(value)}")
+        if samples:
+            lines += [f"# TYPE {metric} gauge"] + samples
+
+    lines += [
+        "# TYPE process_resident_memory_bytes gauge",
+        f"process_resident_memory_bytes {process_rss()}",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {_number(time.process_time())}",
+    ]
+    if started is not None:
+        lines += ["# TYPE process_start_time_seconds gauge", f"process_start_time_seconds {_number(started)}"]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """/metrics 를 제공하는 HTTP 서버 (데몬 스레드)"""
+
+    def __init__(self, port: int = METRICS_PORT, host: str = "127.0.0.1", registry: Registry = metrics):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.gauges: Gauges = {}
+        self.started = time.time()
+        self.httpd = None
+        self.thread = None
+
+    def gauge(self, name: str, read: Callable[[], Optional[float]], **labels: str):
+        """스크랩할 때마다 read()를 호출해 값을 내보내는 게이지 등록
+
+        같은 이름을 라벨만 바꿔 여러 번 등록하면 한 메트릭의 시계열로 나감 (예: farm="farm-01")
+        """
+        self.gauges.setdefault(name, []).append((labels, read))
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render(server.registry, server.gauges, server.started).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 스크랩마다 접근 로그를 남기지 않음
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self.thread.start()
+        logger.info(f"📊 메트릭 엔드포인트: http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -3,16 +3,63 @@ MQTT Client for Sensor Module
 Subscribes to command topics and executes callbacks
 """
 
+import collections
 import json
 import logging
-from typing import Callable, Optional
+import os
+import random
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 
 import paho.mqtt.client as mqtt
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from event_log import event
+from metrics import metrics
+from payload_codec import get_codec, split_topic, topic_for
+
 logger = logging.getLogger(__name__)
 
+# 재연결 대기: min(최대, 최소 x 2^시도) 범위에서 무작위 (full jitter) - 장치들이 동시에 몰리지 않도록
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 120.0
+# 연결이 끊긴 동안 보관할 발행 메시지 수 (넘으면 가장 오래된 것부터 버림)
+OFFLINE_BUFFER_SIZE = 500
+# 중복 처리를 막기 위해 기억할 최근 명령 request_id 수 (QoS 1은 같은 명령이 다시 올 수 있음)
+RECENT_REQUESTS = 200
+
+
+def load_client_id(path: Path, farm_id: str = None) -> str:
+    """파일에 저장된 client_id (없거나 다른 농장 것이면 새로 만들어 저장)
+
+    재시작해도 같은 client_id로 접속해야 브로커가 이전 세션(구독, 끊긴 동안 온 QoS 1 명령)을
+    이어주고, 재시작마다 새 세션이 쌓이지 않습니다.
+    """
+    prefix = f"sensor-{farm_id or 'unknown'}-{socket.gethostname()[:8]}-"
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("farm_id") == farm_id and saved.get("client_id"):
+            return saved["client_id"]
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # 같은 호스트 이름의 미니PC가 여러 대여도 겹치지 않도록 처음 한 번만 무작위 접미사 생성
+    client_id = f"{prefix}{random.randint(1000, 9999)}"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"farm_id": farm_id, "client_id": client_id}, f)
+        os.replace(tmp, path)
+        logger.info(f"🆔 MQTT client_id 생성: {client_id}")
+    except OSError as e:
+        logger.warning(f"⚠️ client_id 저장 실패 ({path}): {e} - 재시작하면 새 세션으로 접속")
+    return client_id
+
 
 class SensorMQTTClient:
     """MQTT Client for receiving commands from server"""
@@ -23,40 +70,84 @@ class SensorMQTTClient:
         broker_port: int = 1883,
         farm_id: str = None,
         organization_id: str = None,
-        client_id: str = None
+        client_id: str = None,
+        client_id_file: Path = None,
+        codec: str = "json"
     ):
+        """
+        Args:
+            client_id: fixed client id (overrides client_id_file)
+            client_id_file: where to persist a generated client id. With a stable id the
+                session is persistent (clean_session=False), so QoS 1 commands sent while
+                the device restarts are delivered on reconnect.
+            codec: payload format for published messages ("json", "cbor" or "msgpack").
+                Non-JSON messages go to "<topic>/<codec>"; incoming messages are decoded
+                by their topic suffix (see payload_codec).
+        """
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.farm_id = farm_id
         self.organization_id = organization_id
-        # 고유 client_id 생성 (farm_id + hostname + random suffix) - 여러 미니PC 동시 연결 지원
-        import socket
-        import random
-        hostname = socket.gethostname()[:8]
-        suffix = random.randint(1000, 9999)
-        self.client_id = client_id or f"sensor-{farm_id or 'unknown'}-{hostname}-{suffix}"
+        # client_id: farm_id + hostname + 접미사 - 여러 미니PC 동시 연결 지원
+        if client_id:
+            self.client_id = client_id
+        elif client_id_file:
+            self.client_id = load_client_id(Path(client_id_file), farm_id or "gateway")
+        else:
+            hostname = socket.gethostname()[:8]
+            self.client_id = f"sensor-{farm_id or 'unknown'}-{hostname}-{random.randint(1000, 9999)}"
+        # 매번 바뀌는 client_id로 영속 세션을 만들면 브로커에 주인 없는 세션만 쌓이므로 고정 id일 때만 사용
+        self.persistent_session = bool(client_id or client_id_file)
+        self.session_present = False
+        self._recent_requests = collections.OrderedDict()
+        self.codec = get_codec(codec)
         self.client: Optional[mqtt.Client] = None
         self.connected = False
-        self.command_callback: Optional[Callable] = None
-        self.schedule_callback: Optional[Callable] = None
+        self.connect_count = 0      # 연결 성공 횟수 (1회 초과분이 재연결)
+        self.disconnect_count = 0   # 예상치 못한 연결 끊김 횟수
+        # 농가별 명령 콜백 / 조직별 스케줄 콜백 (게이트웨이 모드는 농가 여러 개를 한 연결로)
+        self.command_callbacks: Dict[str, Callable] = {}
+        self.schedule_callbacks: Dict[str, List[Callable]] = {}
+
+        # 연결이 끊긴 동안의 발행 메시지 (topic, payload, qos, 보관 시각) - 재연결 시 순서대로 전송
+        self.offline_buffer = collections.deque()
+        self.offline_buffer_size = OFFLINE_BUFFER_SIZE
+        self.dropped_count = 0      # 버퍼가 가득 차서 버린 메시지 수
+        self.delayed_count = 0      # 버퍼에 있다가 재연결 후 전송된 메시지 수
+        self._publish_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._attempt = 0           # 연속 연결 실패 횟수 (재연결 대기 시간 계산)
 
     def on_connect(self, client, userdata, flags, rc):
         """Callback when connected to MQTT broker"""
         if rc == 0:
-            logger.info(f"✅ MQTT 브로커 연결 성공: {self.broker_host}:{self.broker_port}")
-            self.connected = True
-
-            # Subscribe to command topic for this farm
-            if self.farm_id:
-                topic = f"farm/{self.farm_id}/command"
-                client.subscribe(topic, qos=1)
-                logger.info(f"📡 토픽 구독: {topic}")
-
-            # Subscribe to organization settings topic (for schedule updates)
-            if self.organization_id:
-                schedule_topic = f"organization/{self.organization_id}/settings/schedule"
-                client.subscribe(schedule_topic, qos=1)
-                logger.info(f"📡 토픽 구독: {schedule_topic}")
+            self.session_present = bool(flags.get("session present"))
+            session = "이전 세션 이어받음" if self.session_present else "새 세션"
+            logger.info(f"✅ MQTT 브로커 연결 성공: {self.broker_host}:{self.broker_port} ({session})")
+            self.connect_count += 1
+            self._attempt = 0
+
+            # 세션이 이어져도 다시 구독 (브로커가 세션을 만료시켰을 수 있고, 같은 구독은 덮어쓰기만 됨)
+
+            # Subscribe to command topics (one wildcard subscription when hosting several farms)
+            farms = self.farm_ids()
+            if farms:
+                topic = f"farm/{farms[0] if len(farms) == 1 else '+'}/command"
+                # 형식 접미사가 붙은 토픽(command/cbor 등)도 함께 구독
+                client.subscribe([(topic, 1), (f"{topic}/+", 1)])
+                logger.info(f"📡 토픽 구독: {topic}[/형식] (농가 {len(farms)}곳)")
+
+            # Subscribe to organization settings topics (for schedule updates)
+            for organization_id in self.organization_ids():
+                schedule_topic = f"organization/{organization_id}/settings/schedule"
+                client.subscribe([(schedule_topic, 1), (f"{schedule_topic}/+", 1)])
+                logger.info(f"📡 토픽 구독: {schedule_topic}[/형식]")
+
+            # 끊긴 동안 쌓인 메시지를 순서대로 보낸 뒤 새 메시지 발행 허용
+            with self._publish_lock:
+                self._flush_offline_buffer()
+                self.connected = True
         else:
             logger.error(f"❌ MQTT 연결 실패, 코드: {rc}")
             self.connected = False
@@ -65,6 +156,7 @@ class SensorMQTTClient:
         """Callback when disconnected from MQTT broker"""
         self.connected = False
         if rc != 0:
+            self.disconnect_count += 1
             logger.warning(f"⚠️ MQTT 연결 끊김 (예상치 못함), 코드: {rc}")
         else:
             logger.info("👋 MQTT 연결 종료")
@@ -72,19 +164,28 @@ class SensorMQTTClient:
     def on_message(self, client, userdata, msg):
         """Callback when a message is received"""
         try:
-            topic = msg.topic
-            payload = json.loads(msg.payload.decode())
+            # 형식: MQTT v5 content-type 속성 또는 토픽 접미사 (없으면 JSON)
+            content_type = getattr(getattr(msg, "properties", None), "ContentType", None)
+            topic, codec = split_topic(msg.topic, content_type)
+            payload = codec.decode(msg.payload)
 
-            logger.info(f"📥 메시지 수신: {topic}")
-            logger.info(f"   내용: {json.dumps(payload, ensure_ascii=False)}")
+            # payload는 다시 직렬화하지 않고 그대로 넘김 (기록 스레드에서 필요할 때만 변환)
+            event("mqtt_message", topic=topic, payload=payload)
 
             # Check if this is a schedule update message
             if "settings/schedule" in topic:
                 start_time = payload.get("start_time")
                 end_time = payload.get("end_time")
                 interval_minutes = payload.get("interval_minutes")
-                if start_time and end_time and interval_minutes and self.schedule_callback:
-                    self.schedule_callback(start_time, end_time, interval_minutes, payload)
+                if start_time and end_time and interval_minutes:
+                    for callback in self.schedule_callbacks.get(topic.split("/")[1], []):
+                        callback(start_time, end_time, interval_minutes, payload)
+                return
+
+            # 토픽의 농가로 전달 (와일드카드 구독이면 이 장치에 없는 농가의 명령도 들어옴)
+            callback = self.command_callbacks.get(topic.split("/")[1])
+            if callback is None:
+                logger.debug(f"다른 농가의 명령 무시: {topic}")
                 return
 
             # Handle command messages
@@ -97,93 +198,310 @@ class SensorMQTTClient:
                 logger.warning("⚠️ 'action' 필드가 없습니다")
                 return
 
-            # Call the registered callback
-            if self.command_callback:
-                self.command_callback(action, payload)
-            else:
-                logger.warning("⚠️ 명령 콜백이 등록되지 않았습니다")
+            # QoS 1은 최소 한 번 전달 - 재연결 시 같은 명령이 다시 오면 한 번만 실행
+            if request_id:
+                if request_id in self._recent_requests:
+                    logger.info(f"⏭️ 이미 처리한 명령 무시: {action} ({request_id})")
+                    return
+                self._recent_requests[request_id] = True
+                if len(self._recent_requests) > RECENT_REQUESTS:
+                    self._recent_requests.popitem(last=False)
 
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON 파싱 오류: {e}")
+            callback(action, payload)
+
+        except ValueError as e:
+            logger.error(f"❌ 메시지 디코딩 오류 ({msg.topic}): {e}")
         except Exception as e:
             logger.error(f"❌ 메시지 처리 오류: {e}")
 
-    def on_command(self, callback: Callable[[str, dict], None]):
+    @property
+    def reconnect_count(self) -> int:
+        return max(self.connect_count - 1, 0)
+
+    def on_command(self, callback: Callable[[str, dict], None], farm_id: str = None):
         """Register a callback for command messages
 
         Args:
             callback: Function that takes (action: str, payload: dict)
+            farm_id: farm whose commands go to this callback (default: self.farm_id).
+                Register once per farm to host several farms on one connection.
         """
-        self.command_callback = callback
-        logger.info("📝 명령 콜백 등록 완료")
+        self.command_callbacks[farm_id or self.farm_id] = callback
+        logger.info(f"📝 명령 콜백 등록 완료 ({farm_id or self.farm_id})")
 
-    def on_schedule_update(self, callback: Callable[[str, str, int, dict], None]):
+    def on_schedule_update(self, callback: Callable[[str, str, int, dict], None], organization_id: str = None):
         """Register a callback for schedule update messages
 
         Args:
             callback: Function that takes (start_time: str, end_time: str, interval_minutes: int, payload: dict)
+            organization_id: organization to follow (default: self.organization_id).
+                Several farms of the same organization may register.
         """
-        self.schedule_callback = callback
+        self.schedule_callbacks.setdefault(organization_id or self.organization_id, []).append(callback)
         logger.info("📝 수집 스케줄 업데이트 콜백 등록 완료")
 
+    def farm_ids(self) -> List[str]:
+        return [f for f in self.command_callbacks if f] or ([self.farm_id] if self.farm_id else [])
+
+    def organization_ids(self) -> List[str]:
+        orgs = [o for o in self.schedule_callbacks if o]
+        if self.organization_id and self.organization_id not in orgs:
+            orgs.append(self.organization_id)
+        return orgs
+
+    def channel(self, farm_id: str) -> "FarmChannel":
+        """Publishing handle for one farm on this shared connection"""
+        return FarmChannel(self, farm_id)
+
     def connect(self):
-        """Connect to MQTT broker"""
+        """Start the MQTT network thread
+
+        Never raises: if the broker is unreachable (also at boot), the thread keeps
+        retrying with exponential backoff and jitter, and publishes are buffered.
+        """
         logger.info(f"🚀 MQTT 브로커 연결 시도: {self.broker_host}:{self.broker_port}")
 
-        self.client = mqtt.Client(client_id=self.client_id)
+        self.client = mqtt.Client(client_id=self.client_id, clean_session=not self.persistent_session)
         self.client.on_connect = self.on_connect
         self.client.on_disconnect = self.on_disconnect
         self.client.on_message = self.on_message
-
-        try:
-            self.client.connect(self.broker_host, self.broker_port, 60)
-            self.client.loop_start()
-            logger.info("✅ MQTT 클라이언트 시작됨")
-        except Exception as e:
-            logger.error(f"❌ MQTT 연결 실패: {e}")
-            raise
+        self.client.connect_async(self.broker_host, self.broker_port, 60)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mqtt", daemon=True)
+        self._thread.start()
+        logger.info("✅ MQTT 클라이언트 시작됨")
+
+    def _backoff(self) -> float:
+        """다음 연결 시도까지 대기 시간 (초)"""
+        ceiling = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * 2 ** self._attempt)
+        return random.uniform(RECONNECT_MIN_DELAY, max(ceiling, RECONNECT_MIN_DELAY))
+
+    def _run(self):
+        """네트워크 루프 + 재연결 (paho loop_start 대신 직접 관리)"""
+        while not self._stop.is_set():
+            try:
+                self.client.reconnect()
+            except (OSError, ValueError) as e:
+                self._attempt += 1
+                delay = self._backoff()
+                logger.warning(f"⚠️ MQTT 연결 실패 ({e}), {delay:.1f}초 후 재시도")
+                self._stop.wait(delay)
+                continue
+
+            rc = mqtt.MQTT_ERR_SUCCESS
+            while rc == mqtt.MQTT_ERR_SUCCESS and not self._stop.is_set():
+                rc = self.client.loop(timeout=1.0)
+            if self._stop.is_set():
+                break
+
+            # 연결 끊김 또는 브로커가 연결 거부
+            self.connected = False
+            self._attempt += 1
+            delay = self._backoff()
+            logger.warning(f"⚠️ MQTT 재연결 대기: {delay:.1f}초 (코드: {rc})")
+            self._stop.wait(delay)
 
     def disconnect(self):
-        """Disconnect from MQTT broker"""
+        """Disconnect from MQTT broker (sends what is already queued first)"""
         if self.client:
             logger.info("🛑 MQTT 연결 종료 중...")
-            self.client.loop_stop()
-            self.client.disconnect()
+            self._stop.set()
+            if self._thread:
+                self._thread.join(timeout=5)
+            if self.connected:
+                # 종료 직전 발행한 메시지(offline 상태 등)를 보내고 끊기
+                deadline = time.monotonic() + 2.0
+                while self.client.want_write() and time.monotonic() < deadline:
+                    self.client.loop(timeout=0.1)
+                self.client.disconnect()
+                self.client.loop(timeout=0.1)
             self.connected = False
             logger.info("✅ MQTT 연결 종료됨")
 
-    def publish_status(self, status: str, details: dict = None):
+    def _publish(self, topic: str, payload, qos: int = 1) -> bool:
+        """발행 (연결이 끊겨 있으면 버퍼에 보관했다가 재연결 시 순서대로 전송)
+
+        Returns:
+            False if an older buffered message had to be dropped to make room
+        """
+        with self._publish_lock:
+            ok = True
+            if len(self.offline_buffer) >= self.offline_buffer_size:
+                self.offline_buffer.popleft()
+                self.dropped_count += 1
+                metrics.count("mqtt.dropped")
+                ok = False
+            # 보관 시점에 연결되어 있지 않았으면 지연 전송으로 집계
+            self.offline_buffer.append((topic, payload, qos, time.monotonic(), not self.connected))
+            if self.connected:
+                self._flush_offline_buffer()
+            return ok
+
+    def _publish_message(self, topic: str, message, qos: int = 1) -> bool:
+        """설정한 형식으로 인코딩해서 발행 (JSON이 아니면 토픽에 /<형식> 접미사)"""
+        return self._publish(topic_for(topic, self.codec), self.codec.encode(message), qos)
+
+    def _flush_offline_buffer(self):
+        """버퍼의 메시지를 순서대로 전송 (연결 직후 네트워크 스레드, 또는 발행 시)"""
+        with self._publish_lock:
+            flushed = 0
+            while self.offline_buffer:
+                topic, payload, qos, queued_at, delayed = self.offline_buffer[0]
+                info = self.client.publish(topic, payload, qos=qos)
+                # QoS 1 이상은 연결이 없어도 paho가 보관했다가 재연결 후 다시 보냄 - 버퍼에서 빼야 두 번 가지 않음
+                handed_off = info.rc == mqtt.MQTT_ERR_SUCCESS or (info.rc == mqtt.MQTT_ERR_NO_CONN and qos > 0)
+                if handed_off:
+                    self.offline_buffer.popleft()
+                    if delayed:
+                        flushed += 1
+                        self.delayed_count += 1
+                        metrics.count("mqtt.delayed")
+                        metrics.observe("mqtt.buffer_delay", time.monotonic() - queued_at)
+                if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                    break  # 다시 끊김 - 나머지는 다음 연결에서
+            if flushed:
+                logger.info(f"📤 연결 끊김 동안 보관한 메시지 {flushed}건 전송 (남은 {len(self.offline_buffer)}건)")
+
+    def _pending_note(self) -> str:
+        return "" if self.connected else f" (연결 대기 중, 보관 {len(self.offline_buffer)}건)"
+
+    def buffer_stats(self) -> dict:
+        return {
+            "buffered": len(self.offline_buffer),
+            "dropped": self.dropped_count,
+            "delayed": self.delayed_count,
+            "reconnects": self.reconnect_count,
+            "session_present": self.session_present,
+        }
+
+    def publish_status(self, status: str, details: dict = None, farm_id: str = None):
         """Publish status message to server
 
         Args:
             status: Status string (e.g., "online", "collecting", "error")
             details: Additional details dictionary
+            farm_id: farm to publish for (default: self.farm_id)
         """
-        if not self.client or not self.connected:
-            logger.warning("⚠️ MQTT 연결되지 않음, 상태 전송 실패")
-            return
-
-        topic = f"farm/{self.farm_id}/status"
+        farm_id = farm_id or self.farm_id
+        topic = f"farm/{farm_id}/status"
         message = {
             "status": status,
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "farm_id": self.farm_id,
+            "farm_id": farm_id,
         }
         if details:
             message["details"] = details
 
         try:
-            payload = json.dumps(message)
-            self.client.publish(topic, payload, qos=1)
-            logger.info(f"📤 상태 전송: {topic} | {status}")
+            self._publish_message(topic, message, qos=1)
+            logger.info(f"📤 상태 전송: {topic} | {status}{self._pending_note()}")
         except Exception as e:
             logger.error(f"❌ 상태 전송 실패: {e}")
 
+    def publish_rollup(self, series: str, tier: str, summaries: list, farm_id: str = None):
+        """Publish compact rollup summaries instead of raw readings
+
+        Args:
+            series: "soil" or "env"
+            tier: "1m", "1h" or "1d"
+            summaries: [{"ts", "address", "count", "fields": {name: [min, max, mean]}}]
+        """
+        farm_id = farm_id or self.farm_id
+        topic = f"farm/{farm_id}/rollup"
+        message = {"series": series, "tier": tier, "farm_id": farm_id, "buckets": summaries}
+
+        try:
+            self._publish_message(topic, message, qos=1)
+            logger.info(f"📤 집계 전송: {topic} | {series}/{tier} x{len(summaries)}{self._pending_note()}")
+        except Exception as e:
+            logger.error(f"❌ 집계 전송 실패: {e}")
+
+    def publish_telemetry(self, message: dict, farm_id: str = None) -> bool:
+        """Publish a periodic telemetry heartbeat (compact encoding, QoS 0, not buffered while offline)
+
+        Returns:
+            False if not connected or an older buffered message was dropped
+            (the caller folds the missed deltas into the next heartbeat)
+        """
+        if not self.connected:
+            return False
+        topic = f"farm/{farm_id or self.farm_id}/telemetry"
+        try:
+            return self._publish_message(topic, message, qos=0)
+        except Exception as e:
+            logger.error(f"❌ 상태 보고 전송 실패: {e}")
+            return False
+
+    def publish_stream(self, message: dict, farm_id: str = None) -> bool:
+        """Publish one live-stream sample (QoS 0, not buffered while offline)
+
+        Returns:
+            False if not connected (the sample is dropped, the next one is sent)
+        """
+        if not self.connected:
+            return False
+        topic = topic_for(f"farm/{farm_id or self.farm_id}/stream", self.codec)
+        try:
+            return self.client.publish(topic, self.codec.encode(message), qos=0).rc == mqtt.MQTT_ERR_SUCCESS
+        except Exception as e:
+            logger.error(f"❌ 스트리밍 전송 실패: {e}")
+            return False
+
+    def publish_logs(self, entries: list, request_id: str = None, farm_id: str = None):
+        """Publish recent log entries from the in-memory ring buffer
+
+        Args:
+            entries: [{"ts", "mono", "level", "logger", "event", "fields" or "msg"}]
+            request_id: request_id of the "logs" command (echoed back)
+        """
+        farm_id = farm_id or self.farm_id
+        topic = f"farm/{farm_id}/logs"
+        message = {"farm_id": farm_id, "request_id": request_id, "entries": entries}
+
+        try:
+            self._publish_message(topic, message, qos=1)
+            logger.info(f"📤 로그 전송: {topic} | {len(entries)}건{self._pending_note()}")
+        except Exception as e:
+            logger.error(f"❌ 로그 전송 실패: {e}")
+
+
+class FarmChannel:
+    """One farm's view of a shared SensorMQTTClient
+
+    Publishes go to farm/{farm_id}/... over the shared connection and offline buffer.
+    Everything else (connected, buffer_stats, ...) is read from the shared client.
+    """
+
+    def __init__(self, client: SensorMQTTClient, farm_id: str):
+        self.client = client
+        self.farm_id = farm_id
+
+    def publish_status(self, status: str, details: dict = None):
+        self.client.publish_status(status, details, farm_id=self.farm_id)
+
+    def publish_rollup(self, series: str, tier: str, summaries: list):
+        self.client.publish_rollup(series, tier, summaries, farm_id=self.farm_id)
+
+    def publish_telemetry(self, message: dict) -> bool:
+        return self.client.publish_telemetry(message, farm_id=self.farm_id)
+
+    def publish_stream(self, message: dict) -> bool:
+        return self.client.publish_stream(message, farm_id=self.farm_id)
+
+    def publish_logs(self, entries: list, request_id: str = None):
+        self.client.publish_logs(entries, request_id, farm_id=self.farm_id)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
 
 def main():
     """Test the MQTT client"""
     import time
 
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
     # Test configuration
     BROKER_HOST = "218.38.121.112"  # Server IP
     BROKER_PORT = 1883
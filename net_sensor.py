@@ -0,0 +1,402 @@
+"""네트워크 센서 노드 (TCP 시리얼 브리지) 폴링
+
+센서를 PC에 USB로 꽂는 대신 ESP32 Wi-Fi 브리지나 ser2net처럼 TCP로 시리얼을 그대로 넘겨주는 노드에
+같은 A/B 명령(한 줄 요청 → CSV 한 줄 응답)을 보냅니다. asyncio로 모든 노드를 동시에 폴링하므로
+게이트웨이 한 대가 노드 수백 개를 맡을 수 있습니다.
+
+    노드 형식: "A@192.168.0.21:4001"      토양 센서 노드
+              "B@192.168.0.22:4001/1-4"  환경 센서 버스 (주소 1~4, "B1" ~ "B4" 명령)
+
+- 노드별 연결 풀: 연결을 열어 두고 재사용 (ser2net은 보통 노드당 연결 1개만 허용 → 기본 1)
+- 시간 초과/오류가 난 연결은 닫고 새로 연결 (늦게 도착한 응답이 다음 요청의 응답으로 섞이지 않도록)
+- 노드 상태: 연속 실패가 fail_threshold번이면 down → 점점 늘어나는 간격으로 한 번씩만 다시 시도
+- 바이너리 프레임(frame_codec)은 사용하지 않음 (CSV 응답만)
+
+메인 스레드에서는 start()로 이벤트 루프 스레드를 띄운 뒤 poll_sync()로 호출합니다.
+작업 프로세스 모드(worker_supervisor)에서는 serve_gateway가 작업 프로세스에서 폴링하고
+RemoteGateway가 같은 사용법으로 대신 호출합니다.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from metrics import metrics
+from sensor_bus import format_command, parse_addresses
+from sensor_parser import parse_env_csv, parse_soil_csv
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 3.0     # 연결 대기 (초)
+RESPONSE_TIMEOUT = 2.0    # 응답 한 줄 대기 (초)
+IDLE_TIMEOUT = 60.0       # 이보다 오래 쓰지 않은 연결은 닫고 새로 연결 (브리지가 끊은 연결 정리)
+MAX_CONCURRENCY = 128     # 동시에 진행하는 노드 요청 수 (게이트웨이 전체)
+FAIL_THRESHOLD = 3        # 연속 실패 횟수 → down
+RETRY_MIN_DELAY = 5.0     # down 노드 재시도 간격 (초, 실패할 때마다 2배)
+RETRY_MAX_DELAY = 300.0
+
+
+def parse_node(spec: str) -> "SensorNode":
+    """노드 설정 문자열 파싱 ("A@host:port" 또는 "A@host:port/1,2,5-8")
+
+    Raises:
+        ValueError: 형식 오류
+    """
+    try:
+        command, _, endpoint = spec.strip().partition("@")
+        endpoint, _, addresses = endpoint.partition("/")
+        host, _, port = endpoint.rpartition(":")
+        if command.upper() not in ("A", "B") or not host:
+            raise ValueError
+        return SensorNode(command.upper(), host, int(port), parse_addresses(addresses))
+    except ValueError:
+        raise ValueError(f"노드 형식 오류: '{spec}' (예: A@192.168.0.21:4001, B@192.168.0.22:4001/1-4)")
+
+
+def parse_nodes(value: str) -> List["SensorNode"]:
+    """공백 또는 ;로 구분한 노드 목록 (환경변수 형식, 주소 목록 안의 쉼표는 그대로)"""
+    specs = [spec for spec in (value or "").replace(";", " ").split() if spec]
+    return [parse_node(spec) for spec in specs]
+
+
+class SensorNode:
+    """TCP 브리지 노드 하나 (명령 문자, 주소, 상태)"""
+
+    def __init__(self, command: str, host: str, port: int, addresses: Sequence[int] = ()):
+        """
+        Args:
+            command: 'A' 토양, 'B' 환경
+            addresses: 버스 주소 목록 (비어 있으면 주소 없이 명령 문자만 전송)
+        """
+        self.command = command
+        self.host = host
+        self.port = port
+        self.addresses = list(addresses)
+        self.name = f"{command}@{host}:{port}"
+        # 상태
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_seen: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.latency: Optional[float] = None  # 지수 이동 평균 (초)
+        self.down_since: Optional[float] = None
+        self.retry_at = 0.0
+        self.retry_delay = RETRY_MIN_DELAY
+
+    def __repr__(self):
+        return f"SensorNode({self.name})"
+
+    @property
+    def commands(self) -> List[str]:
+        """한 번 폴링할 때 보낼 명령 목록"""
+        if not self.addresses:
+            return [self.command]
+        return [format_command(self.command, addr) for addr in self.addresses]
+
+    @property
+    def up(self) -> bool:
+        return self.down_since is None
+
+    def due(self, now: float) -> bool:
+        """이번 폴링에 포함할지 (down 노드는 재시도 시각이 된 경우만)"""
+        return self.up or now >= self.retry_at
+
+    def record_ok(self, elapsed: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.last_seen = time.time()
+        self.latency = elapsed if self.latency is None else self.latency * 0.8 + elapsed * 0.2
+        if self.down_since is not None:
+            logger.info(f"✅ 네트워크 센서 복구: {self.name} ({time.monotonic() - self.down_since:.0f}초 만에)")
+            self.down_since = None
+            self.retry_delay = RETRY_MIN_DELAY
+
+    def record_failure(self, error: str, fail_threshold: int):
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        now = time.monotonic()
+        if self.down_since is None:
+            if self.consecutive_failures >= fail_threshold:
+                self.down_since = now
+                logger.warning(f"🔌 네트워크 센서 응답 없음: {self.name} ({error}) - {self.retry_delay:.0f}초 후 재시도")
+            else:
+                return
+        else:
+            self.retry_delay = min(self.retry_delay * 2, RETRY_MAX_DELAY)
+        self.retry_at = now + self.retry_delay
+
+    def stats(self) -> dict:
+        return {
+            "up": self.up,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_seen": self.last_seen,
+            "last_error": self.last_error,
+            "latency_ms": round(self.latency * 1000) if self.latency is not None else None,
+        }
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "used_at")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.used_at = time.monotonic()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class NodePool:
+    """노드 하나의 TCP 연결 풀 (열린 연결 재사용, 최대 max_connections개)"""
+
+    def __init__(self, node: SensorNode, max_connections: int = 1,
+                 connect_timeout: float = CONNECT_TIMEOUT, idle_timeout: float = IDLE_TIMEOUT):
+        self.node = node
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.opened = 0  # 누적 연결 수 (재사용 확인용)
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(max(1, max_connections))
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    async def acquire(self) -> _Connection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if time.monotonic() - conn.used_at < self.idle_timeout and not conn.reader.at_eof():
+                    return conn
+                conn.close()
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.node.host, self.node.port), self.connect_timeout)
+            self.opened += 1
+            return _Connection(reader, writer)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: _Connection, healthy: bool):
+        """사용한 연결 반납 (healthy=False이면 닫음)"""
+        if healthy:
+            conn.used_at = time.monotonic()
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+class NetworkSensorGateway:
+    """여러 TCP 브리지 노드를 asyncio로 동시에 폴링"""
+
+    def __init__(
+        self,
+        nodes: Sequence[SensorNode],
+        parsers: Dict[str, Callable[[str], dict]],
+        response_timeout: float = RESPONSE_TIMEOUT,
+        max_concurrency: int = MAX_CONCURRENCY,
+        connections_per_node: int = 1,
+        fail_threshold: int = FAIL_THRESHOLD,
+        connect_timeout: float = CONNECT_TIMEOUT,
+    ):
+        """
+        Args:
+            nodes: 폴링할 노드 목록
+            parsers: 명령 문자 → 응답 한 줄 파서 (sensor_parser.parse_soil_csv 등, ValueError)
+            response_timeout: 응답 한 줄당 최대 대기 시간 (초)
+            max_concurrency: 동시에 진행하는 노드 수 상한 (게이트웨이 전체)
+            connections_per_node: 노드별 최대 연결 수 (ser2net/ESP32 브리지는 보통 1)
+            fail_threshold: 연속 실패 몇 번이면 down으로 볼지
+        """
+        self.nodes = list(nodes)
+        self.parsers = parsers
+        self.response_timeout = response_timeout
+        self.max_concurrency = max_concurrency
+        self.connections_per_node = connections_per_node
+        self.fail_threshold = fail_threshold
+        self.connect_timeout = connect_timeout
+        self.pools: Dict[str, NodePool] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self._limit: Optional[asyncio.Semaphore] = None
+
+    def commands(self) -> List[str]:
+        """노드가 있는 명령 문자 목록"""
+        return sorted({node.command for node in self.nodes})
+
+    def _pool(self, node: SensorNode) -> NodePool:
+        pool = self.pools.get(node.name)
+        if pool is None:
+            pool = self.pools[node.name] = NodePool(node, self.connections_per_node, self.connect_timeout)
+        return pool
+
+    async def query(self, node: SensorNode, request: str) -> str:
+        """명령 한 줄 전송 후 응답 한 줄 수신 (연결 풀 사용)
+
+        Raises:
+            OSError, asyncio.TimeoutError: 연결/응답 실패 (해당 연결은 닫힘)
+        """
+        pool = self._pool(node)
+        conn = await pool.acquire()
+        healthy = False
+        try:
+            conn.writer.write(f"{request}\n".encode())
+            await conn.writer.drain()
+            line = await asyncio.wait_for(conn.reader.readline(), self.response_timeout)
+            if not line:
+                raise ConnectionResetError("연결 종료됨")
+            healthy = True
+            return line.decode(errors="ignore").strip()
+        finally:
+            pool.release(conn, healthy)
+
+    async def poll_node(self, node: SensorNode) -> List[dict]:
+        """노드 하나 폴링 (버스 노드는 주소별로 차례대로) → 파싱된 측정값 목록"""
+        parse = self.parsers[node.command]
+        results = []
+        async with self._limit:
+            for request in node.commands:
+                started = time.monotonic()
+                try:
+                    line = await self.query(node, request)
+                    data = parse(line)
+                except asyncio.TimeoutError:
+                    error, metric = "응답 시간 초과", "net.timeouts"
+                except (OSError, ValueError) as e:
+                    error, metric = str(e) or type(e).__name__, "net.errors"
+                else:
+                    elapsed = time.monotonic() - started
+                    node.record_ok(elapsed)
+                    metrics.observe("net.roundtrip", elapsed)
+                    results.append(data)
+                    continue
+                node.record_failure(error, self.fail_threshold)
+                metrics.count(metric)
+                if not node.up:
+                    # down이 되면 남은 주소는 건너뜀 - 재시도 대기 시간도 폴링마다 한 번만 늘어남
+                    break
+        return results
+
+    async def poll(self, command: str = None) -> Dict[str, List[dict]]:
+        """노드 동시 폴링 (down 노드는 재시도 시각이 된 경우만)
+
+        Args:
+            command: 'A'/'B'이면 해당 명령 노드만 (None이면 전체)
+
+        Returns:
+            {노드 이름: [파싱된 측정값, ...]} (폴링한 노드만, 응답 없으면 빈 목록)
+        """
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+        now = time.monotonic()
+        nodes = [n for n in self.nodes if (command is None or n.command == command) and n.due(now)]
+        with metrics.span(f"net.poll.{command or 'all'}"):
+            results = await asyncio.gather(*(self.poll_node(node) for node in nodes))
+        return {node.name: readings for node, readings in zip(nodes, results)}
+
+    # --- 동기 코드(수집 스레드)에서 사용 ---
+
+    def start(self):
+        """이벤트 루프 스레드 시작 (연결 풀은 이 루프에서만 사용)"""
+        if self.thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="net-sensor", daemon=True)
+        self.thread.start()
+        logger.info(f"🌐 네트워크 센서 노드 {len(self.nodes)}개 폴링 준비")
+
+    def poll_sync(self, command: str = None, timeout: float = None) -> Dict[str, List[dict]]:
+        """poll()을 이벤트 루프 스레드에서 실행하고 결과를 기다림"""
+        future = asyncio.run_coroutine_threadsafe(self.poll(command), self.loop)
+        return future.result(timeout)
+
+    def readings(self, command: str, timeout: float = None) -> List[dict]:
+        """명령 노드를 모두 폴링한 측정값 (노드 구분 없이 한 목록)"""
+        return [data for readings in self.poll_sync(command, timeout).values() for data in readings]
+
+    def stats(self) -> Dict[str, dict]:
+        """노드별 상태 (up, 요청/실패 수, 평균 지연 등)"""
+        return {
+            node.name: dict(node.stats(), connections=self.pools[node.name].opened if node.name in self.pools else 0)
+            for node in self.nodes
+        }
+
+    def summary(self) -> dict:
+        """노드 수, 응답 중인 노드 수, down 노드 이름 (상태 메시지용 - 노드가 많아도 짧게)"""
+        down = [node.name for node in self.nodes if not node.up]
+        return {"nodes": len(self.nodes), "up": len(self.nodes) - len(down), "down": down}
+
+    def close(self):
+        """연결 정리 후 이벤트 루프 종료"""
+        if self.loop is None:
+            return
+
+        async def _close():
+            for pool in self.pools.values():
+                pool.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), self.loop).result(5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+        self.loop = None
+        self.thread = None
+
+
+def serve_gateway(nodes: str, response_timeout: float = RESPONSE_TIMEOUT) -> dict:
+    """작업 프로세스 setup: 노드 설정 문자열로 게이트웨이를 시작하고 작업 함수 반환"""
+    gateway = NetworkSensorGateway(parse_nodes(nodes), {"A": parse_soil_csv, "B": parse_env_csv},
+                                   response_timeout=response_timeout)
+    gateway.start()
+    return {"readings": gateway.readings, "summary": gateway.summary}
+
+
+class RemoteGateway:
+    """작업 프로세스에서 폴링하는 NetworkSensorGateway (SensorCollector에서 같은 사용법)"""
+
+    def __init__(self, worker, nodes: Sequence[SensorNode]):
+        """
+        Args:
+            worker: serve_gateway로 시작한 worker_supervisor.Worker
+            nodes: 같은 노드 목록 (명령 문자 확인용)
+        """
+        self.worker = worker
+        self.nodes = list(nodes)
+
+    def commands(self) -> List[str]:
+        return sorted({node.command for node in self.nodes})
+
+    def start(self):
+        pass  # 작업 프로세스가 시작할 때 게이트웨이도 시작
+
+    def readings(self, command: str, timeout: float = None) -> List[dict]:
+        return self.worker.call("readings", command, timeout, timeout=timeout)
+
+    def summary(self) -> dict:
+        try:
+            return self.worker.call("summary", timeout=5)
+        except RuntimeError as e:  # 작업 프로세스 재시작 중
+            return {"nodes": len(self.nodes), "up": 0, "down": [], "error": str(e)}
+
+    def close(self):
+        pass  # Supervisor.stop()에서 작업 프로세스와 함께 종료
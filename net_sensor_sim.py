@@ -0,0 +1,128 @@
+"""네트워크 센서 노드 시험 (로컬 가상 노드)
+
+실제 ESP32 브리지 없이 127.0.0.1에 A/B 명령에 응답하는 가상 노드를 띄우고 net_sensor로 폴링합니다.
+일부 노드는 느리게 응답하거나(시간 초과), 연결을 끊거나, 깨진 응답을 보내 상태 추적을 확인합니다.
+
+    py net_sensor_sim.py [노드 수] [응답 지연 ms]   # 가상 노드를 띄우고 몇 번 폴링한 결과 출력
+    py net_sensor_sim.py serve [노드 수]           # 가상 노드만 실행 (127.0.0.1:15000 ~)
+
+serve로 띄운 노드는 .env의 NET_SENSOR_NODES에 적어 main_mqtt.py로 시험할 수 있습니다.
+
+    NET_SENSOR_NODES=A@127.0.0.1:15000 B@127.0.0.1:15001/1-4
+"""
+import asyncio
+import random
+import sys
+import time
+
+from net_sensor import NetworkSensorGateway, SensorNode
+from sensor_parser import parse_env_csv, parse_soil_csv
+
+BASE_PORT = 15000
+
+
+def fake_response(request: str) -> str:
+    """A/B(+주소) 요청에 대한 가상 CSV 응답 (토양 온습도는 10배 값)"""
+    command, address = request[:1], int(request[1:] or 1)
+    if command == "A":
+        return (f"{address},{random.randint(150, 280)},{random.randint(300, 600)},"
+                f"{random.randint(80, 160)},{random.randint(60, 75)},50,30,20,40")
+    if command == "B":
+        return (f"{address},{random.uniform(15, 28):.1f},{random.uniform(30, 70):.1f},"
+                f"5,10,{random.randint(3, 30)},{random.randint(5, 50)},{random.randint(400, 900)},0")
+    return "ERR"
+
+
+async def serve_node(port: int, delay: float, mode: str = "ok"):
+    """가상 노드 하나 (mode: ok, slow - 응답 안 함, drop - 연결 끊음, garbage - 깨진 응답)"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if mode == "drop":
+                    break
+                if mode == "slow":
+                    continue  # 응답하지 않음 → 게이트웨이 시간 초과
+                await asyncio.sleep(delay)
+                response = "12,ab,??" if mode == "garbage" else fake_response(line.decode().strip())
+                writer.write(f"{response}\n".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+
+def node_modes(count: int) -> list:
+    """노드 20개 중 1개씩 느림/끊김/깨진 응답"""
+    modes = []
+    for i in range(count):
+        modes.append({7: "slow", 13: "drop", 19: "garbage"}.get(i % 20, "ok"))
+    return modes
+
+
+async def run_demo(count: int, delay: float, rounds: int = 3):
+    modes = node_modes(count)
+    servers = [await serve_node(BASE_PORT + i, delay, mode) for i, mode in enumerate(modes)]
+    nodes = [SensorNode("AB"[i % 2], "127.0.0.1", BASE_PORT + i, [1, 2] if i % 10 == 5 else [])
+             for i in range(count)]
+    gateway = NetworkSensorGateway(nodes, {"A": parse_soil_csv, "B": parse_env_csv},
+                                   response_timeout=0.5, fail_threshold=2)
+    print(f"가상 노드 {count}개 (응답 지연 {delay * 1000:.0f}ms, "
+          f"느림 {modes.count('slow')} / 끊김 {modes.count('drop')} / 깨짐 {modes.count('garbage')})")
+
+    for round_no in range(1, rounds + 1):
+        started = time.perf_counter()
+        results = await gateway.poll()
+        elapsed = time.perf_counter() - started
+        readings = sum(len(r) for r in results.values())
+        up = sum(1 for node in nodes if node.up)
+        opened = sum(pool.opened for pool in gateway.pools.values())
+        print(f"[{round_no}] 폴링 {len(results)}개 노드 → 측정값 {readings}개, {elapsed * 1000:.0f}ms "
+              f"(순차였다면 약 {sum(len(n.commands) for n in nodes) * delay * 1000:.0f}ms+), "
+              f"up {up}/{count}, 누적 연결 {opened}")
+
+    down = [(name, s) for name, s in gateway.stats().items() if not s["up"]]
+    print(f"down 노드 {len(down)}개:")
+    for name, s in down[:5]:
+        print(f"  {name}: 실패 {s['failures']}회, {s['last_error']}")
+
+    for pool in gateway.pools.values():
+        pool.close()
+    await asyncio.sleep(0.1)  # 가상 노드가 연결 종료를 처리하도록
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+
+async def run_serve(count: int):
+    modes = node_modes(count)
+    for i, mode in enumerate(modes):
+        await serve_node(BASE_PORT + i, 0.05, mode)
+    print(f"가상 노드 {count}개 실행 중: 127.0.0.1:{BASE_PORT} ~ {BASE_PORT + count - 1} (Ctrl+C로 종료)")
+    for i, mode in enumerate(modes):
+        if mode != "ok":
+            print(f"  {BASE_PORT + i}: {mode}")
+    await asyncio.Event().wait()
+
+
+def main():
+    args = sys.argv[1:]
+    try:
+        if args and args[0] == "serve":
+            asyncio.run(run_serve(int(args[1]) if len(args) > 1 else 20))
+        else:
+            count = int(args[0]) if args else 200
+            delay = float(args[1]) / 1000 if len(args) > 1 else 0.1
+            asyncio.run(run_demo(count, delay))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""장치/네트워크 호출 시간 제한 (watchdog)
+
+cv2.VideoCapture 열기/읽기, 시리얼 read/write, HTTP 업로드는 멈추면 끝없이 기다릴 수 있고,
+그동안 collecting 상태가 풀리지 않아 이후 MQTT 명령이 모두 "이미 수집 중"으로 거부됩니다.
+작업마다 제한 시간을 두고, 넘으면 중단하거나 떼어 놓은 뒤 시간 초과(trip)를 기록/알립니다.
+
+    with watchdog.guard("serial.A", 30, abort=client.abort):   # 블록을 감시 - 넘으면 abort() 호출
+        client.query("A")
+    path = watchdog.call("camera", 30, capture_image, "a.jpg")   # 별도 스레드 - 넘으면 WatchdogTimeout
+
+- guard: 감시 스레드가 제한 시각을 넘긴 블록의 abort()를 호출 (포트 닫기 등으로 막힌 호출을 예외로 끝냄)
+  abort 후 블록이 예외로 끝나면 WatchdogTimeout으로 바꿔서 전달
+- call: 중단할 방법이 없는 호출(OpenCV 등)은 별도 스레드에서 실행하고 제한 시간까지만 기다림
+  멈춘 스레드는 버려지며(데몬 스레드) 나중에 끝나도 결과는 무시
+  exclusive=True면 버린 스레드가 끝날 때까지 같은 작업을 새로 시작하지 않고 바로 WatchdogTimeout
+  (카메라처럼 장치를 잡고 멈춘 호출 뒤에 스레드가 계속 쌓이지 않도록)
+- 시간 초과는 한 번만 기록: 로그, 이벤트(watchdog_trip), 메트릭 watchdog.trip.<작업>, on_trip 콜백
+- abort/on_trip은 감시 스레드를 막지 않도록 별도 스레드에서 실행
+"""
+import collections
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from event_log import event
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 0.5  # 감시 간격 (초) - 시간 초과 감지는 최대 이만큼 늦음
+
+
+class WatchdogTimeout(TimeoutError):
+    """작업이 제한 시간을 넘겨 중단됨"""
+
+
+class _Guard:
+    __slots__ = ("op", "timeout", "started", "deadline", "abort", "on_trip", "info", "thread", "tripped")
+
+    def __init__(self, op: str, timeout: float, abort: Optional[Callable], on_trip: Optional[Callable], info: dict):
+        self.op = op
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        self.abort = abort
+        self.on_trip = on_trip
+        self.info = info
+        self.thread = threading.current_thread().name
+        self.tripped = False
+
+
+class Watchdog:
+    """작업별 제한 시간 감시 (감시 스레드는 처음 guard할 때 시작)"""
+
+    def __init__(self, interval: float = CHECK_INTERVAL):
+        self.interval = interval
+        self._active: Dict[int, _Guard] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._thread = None
+        self._abandoned: Dict[str, threading.Thread] = {}  # 작업 → 시간 초과로 버린 실행 중인 스레드
+        self.trips = collections.Counter()  # 작업 → 시간 초과 횟수
+        self.last_trip = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                expired = [g for g in self._active.values() if not g.tripped and now >= g.deadline]
+                for guard in expired:
+                    guard.tripped = True
+            for guard in expired:
+                self._trip(guard, now, abort=True)
+
+    def _trip(self, guard: _Guard, now: float, abort: bool):
+        elapsed = now - guard.started
+        trip = {"op": guard.op, "timeout": guard.timeout, "elapsed": round(elapsed, 1),
+                "thread": guard.thread, "aborted": abort and guard.abort is not None, **guard.info}
+        self.trips[guard.op] += 1
+        self.last_trip = {"ts": time.time(), **trip}
+        logger.warning(f"⏱️ 작업 시간 초과: {guard.op} ({elapsed:.1f}초 > {guard.timeout:g}초)"
+                       + (" → 중단" if trip["aborted"] else ""))
+        event("watchdog_trip", level=logging.WARNING, **trip)
+        metrics.count(f"watchdog.trip.{guard.op}")
+        callbacks = [guard.abort] if trip["aborted"] else []
+        if guard.on_trip:
+            callbacks.append(lambda: guard.on_trip(trip))
+        for callback in callbacks:
+            threading.Thread(target=self._safe, args=(callback, guard.op), name="watchdog-abort", daemon=True).start()
+
+    @staticmethod
+    def _safe(callback: Callable, op: str):
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"⚠️ watchdog 콜백 실패 ({op}): {e}")
+
+    @contextmanager
+    def guard(self, op: str, timeout: float, abort: Callable = None, on_trip: Callable = None, **info):
+        """블록이 timeout(초)을 넘기면 abort() 호출 (info는 trip 기록에 추가)
+
+        Raises:
+            WatchdogTimeout: 시간 초과 후 블록이 예외로 끝난 경우
+        """
+        self._ensure_started()
+        guard = _Guard(op, timeout, abort, on_trip, info)
+        guard_id = next(self._ids)
+        with self._lock:
+            self._active[guard_id] = guard
+        try:
+            yield guard
+        except Exception as e:
+            if guard.tripped:
+                raise WatchdogTimeout(f"{op}: {timeout:g}초 제한 초과 ({e})") from e
+            raise
+        finally:
+            with self._lock:
+                self._active.pop(guard_id, None)
+                late = not guard.tripped and time.monotonic() >= guard.deadline
+                guard.tripped = guard.tripped or late
+            if late:  # 감시 스레드보다 먼저 끝남 (작업 프로세스의 자체 제한 시간 등) - 기록만
+                self._trip(guard, time.monotonic(), abort=False)
+
+    def call(self, op: str, timeout: float, func: Callable, *args, on_trip: Callable = None,
+             info: dict = None, exclusive: bool = False, **kwargs):
+        """func(*args, **kwargs)를 별도 스레드에서 실행하고 timeout(초)까지만 기다림
+
+        Args:
+            exclusive: 이전에 시간 초과로 버린 같은 작업이 아직 실행 중이면 시작하지 않음
+
+        Raises:
+            WatchdogTimeout: 시간 초과 (실행 중인 스레드는 버림), exclusive인데 버린 호출이 아직 실행 중
+        """
+        if exclusive:
+            with self._lock:
+                stuck = self._abandoned.get(op)
+            if stuck is not None and stuck.is_alive():
+                metrics.count(f"watchdog.busy.{op}")
+                raise WatchdogTimeout(f"{op}: 시간 초과로 버린 이전 호출이 아직 실행 중 (건너뜀)")
+
+        done = threading.Event()
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+                with self._lock:
+                    if self._abandoned.get(op) is threading.current_thread():
+                        del self._abandoned[op]
+                        logger.info(f"⏱️ 버린 호출 끝남: {op}")
+
+        guard = _Guard(op, timeout, None, on_trip, info or {})
+        thread = threading.Thread(target=target, name=f"watchdog-{op}", daemon=True)
+        thread.start()
+        if not done.wait(timeout):
+            with self._lock:
+                if not done.is_set():
+                    self._abandoned[op] = thread
+            guard.tripped = True
+            self._trip(guard, time.monotonic(), abort=False)
+            raise WatchdogTimeout(f"{op}: {timeout:g}초 제한 초과 (호출을 버림)")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def stats(self) -> dict:
+        """진행 중인 감시 작업, 버린 호출이 아직 실행 중인 작업, 작업별 시간 초과 횟수"""
+        now = time.monotonic()
+        with self._lock:
+            active = [{"op": g.op, "elapsed": round(now - g.started, 1), "timeout": g.timeout}
+                      for g in self._active.values()]
+            abandoned = sorted(op for op, thread in self._abandoned.items() if thread.is_alive())
+        return {"active": active, "abandoned": abandoned, "trips": dict(self.trips), "last_trip": self.last_trip}
+
+
+watchdog = Watchdog()
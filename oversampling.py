@@ -0,0 +1,177 @@
+"""버스트 오버샘플링 (강건 집계)
+
+수집 1회에 센서를 K번 연속으로 읽고, 필드별로 중앙값과 MAD(중앙값 절대 편차)로
+이상치를 제거한 뒤 남은 값의 평균(또는 중앙값)만 업로드합니다.
+단발성 튀는 값(예: ph 19.0)이 그대로 올라가는 것을 막습니다.
+
+중앙값은 값이 들어올 때마다 두 힙으로 갱신하고(최근 max_samples개 창), 샘플은 힙에만 보관합니다.
+"""
+import heapq
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from readings import Reading
+from sensor_parser import ENV_SCHEMA, SOIL_SCHEMA
+
+# 정규분포에서 MAD를 표준편차로 환산하는 계수
+MAD_SCALE = 1.4826
+
+# 집계 창 크기 기본값 (이보다 많이 측정하면 가장 오래된 샘플부터 제외)
+MAX_SAMPLES = 64
+
+# 필드별 센서 분해능 (배율 적용 후 값이 바뀌는 최소 단위 = 1 / 배율)
+RESOLUTION = {
+    command: {f.name: 1 / f.scale for f in schema.fields if f.name is not None}
+    for command, schema in (("A", SOIL_SCHEMA), ("B", ENV_SCHEMA))
+}
+
+
+class RunningMedian:
+    """두 개의 힙으로 값이 들어올 때마다 중앙값을 갱신 (O(log n), 최근 maxlen개만 유지)"""
+
+    def __init__(self, maxlen: int = MAX_SAMPLES):
+        self.maxlen = maxlen
+        self._order = deque()  # 들어온 순서 (창을 넘으면 가장 오래된 값부터 제거)
+        self._low = []   # 작은 절반 (최대 힙, 부호 반전)
+        self._high = []  # 큰 절반 (최소 힙)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def add(self, value: float):
+        if len(self._order) >= self.maxlen:
+            self._remove(self._order.popleft())
+        self._order.append(value)
+        if not self._low or value <= -self._low[0]:
+            heapq.heappush(self._low, -value)
+        else:
+            heapq.heappush(self._high, value)
+        self._balance()
+
+    def _remove(self, value: float):
+        # 창 크기(수십 개)만큼만 훑으므로 지연 삭제 없이 바로 제거
+        if self._low and value <= -self._low[0]:
+            heap, key = self._low, -value
+        else:
+            heap, key = self._high, value
+        heap.remove(key)
+        heapq.heapify(heap)
+        self._balance()
+
+    def _balance(self):
+        # 크기 균형: low는 high와 같거나 1개 많게 유지
+        if len(self._low) > len(self._high) + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+        elif len(self._high) > len(self._low):
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+
+    @property
+    def median(self) -> float:
+        if not self._low:
+            raise ValueError("no samples")
+        if len(self._low) > len(self._high):
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+
+class BurstAggregator:
+    """같은 센서(주소)의 연속 측정값을 필드별로 강건 집계"""
+
+    def __init__(self, reading_type: Type[Reading], threshold: float = 3.0, method: str = "trimmed_mean",
+                 max_samples: int = MAX_SAMPLES):
+        """
+        Args:
+            reading_type: SoilReading 또는 EnvReading
+            threshold: |x - 중앙값| > threshold x MAD x 1.4826 이면 이상치로 제외
+                (MAD는 최소 센서 분해능 - 과반이 같은 값이어도 한 단위 차이는 이상치가 아님)
+            method: "trimmed_mean" (이상치 제외 평균) 또는 "median"
+            max_samples: 필드별로 보관하는 최근 샘플 수
+        """
+        self.reading_type = reading_type
+        self.threshold = threshold
+        self.method = method
+        self._address: Optional[int] = None
+        self._ts: Optional[float] = None
+        self._medians: Dict[str, RunningMedian] = {
+            name: RunningMedian(max_samples) for name in reading_type.VALUE_FIELDS
+        }
+        self._resolution = RESOLUTION[reading_type.command]
+
+    def __len__(self) -> int:
+        return len(self._medians[self.reading_type.VALUE_FIELDS[0]])
+
+    def add(self, reading: Reading):
+        if self._address is None:
+            self._address = reading.address
+            self._ts = reading.ts
+        for name in self.reading_type.VALUE_FIELDS:
+            self._medians[name].add(getattr(reading, name))
+
+    def result(self) -> Tuple[Reading, dict]:
+        """집계 결과
+
+        Returns:
+            (집계된 레코드, 통계) - 통계: {"samples": K, "fields": {필드: {"mad", "rejected"}}}
+        """
+        if not len(self):
+            raise ValueError("no samples")
+
+        aggregated = []
+        fields = {}
+        for name in self.reading_type.VALUE_FIELDS:
+            values = self._medians[name]
+            median = values.median
+            deviations = RunningMedian(len(values))
+            for v in values:
+                deviations.add(abs(v - median))
+            mad = deviations.median
+            limit = self.threshold * MAD_SCALE * max(mad, self._resolution[name])
+            inliers = [v for v in values if abs(v - median) <= limit]
+            if self.method == "median":
+                value = median
+            else:
+                value = sum(inliers) / len(inliers)
+            aggregated.append(value)
+            fields[name] = {"mad": round(mad, 4), "rejected": len(values) - len(inliers)}
+
+        reading = self.reading_type(self._address, *aggregated, self._ts)
+        return reading, {"samples": len(self), "fields": fields}
+
+
+def collect_burst(
+    read_once: Callable[[], List[Reading]],
+    reading_type: Type[Reading],
+    count: int,
+    interval: float = 0.2,
+    threshold: float = 3.0,
+    method: str = "trimmed_mean",
+) -> List[Tuple[Reading, dict]]:
+    """K번 연속 측정 후 주소별로 집계
+
+    Args:
+        read_once: 한 번 측정 (주소별 레코드 목록, 응답 없으면 빈 목록)
+        count: 측정 횟수 K
+        interval: 측정 간 대기 (초)
+
+    Returns:
+        [(집계된 레코드, 통계)] - 한 번도 응답하지 않은 주소는 제외
+    """
+    aggregators: Dict[int, BurstAggregator] = {}
+    for i in range(count):
+        if i:
+            time.sleep(interval)
+        try:
+            readings = read_once()
+        except ValueError:
+            # 파싱/CRC 오류는 해당 회차만 버림 (나머지 샘플로 집계)
+            continue
+        for reading in readings:
+            agg = aggregators.get(reading.address)
+            if agg is None:
+                agg = aggregators[reading.address] = BurstAggregator(reading_type, threshold, method, count)
+            agg.add(reading)
+    return [agg.result() for agg in aggregators.values()]
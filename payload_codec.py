@@ -0,0 +1,136 @@
+"""MQTT 메시지 인코딩 (JSON / CBOR / MessagePack)
+
+상태, 집계, 상태 보고, 로그 메시지를 설정한 형식으로 인코딩합니다. 기본은 기존과 같은 JSON이고,
+CBOR/MessagePack은 같은 내용을 더 작고 빠르게 보냅니다 (bench_codec.py 참고).
+
+형식은 토픽 끝에 붙여 구분합니다 (MQTT 3.1.1에는 content-type 속성이 없으므로).
+
+    farm/{id}/status          JSON (기존 서버 호환)
+    farm/{id}/status/cbor     CBOR
+    farm/{id}/status/msgpack  MessagePack
+
+받는 명령도 같은 규칙으로 디코딩합니다 (farm/{id}/command/cbor 등).
+MQTT v5 연결에서 content-type 속성이 있으면 토픽보다 우선합니다.
+
+- cbor2, msgpack은 선택 의존성 - 설치되어 있지 않으면 JSON으로 대체
+- 메시지 내용(키, ISO 시각 문자열 등)은 형식과 관계없이 같음
+"""
+import datetime
+import json
+import logging
+from typing import Dict, Optional
+
+try:
+    import cbor2  # 선택 의존성
+except ImportError:
+    cbor2 = None
+
+try:
+    import msgpack  # 선택 의존성
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+
+class Codec:
+    """메시지 인코더/디코더 (name: 토픽 접미사, content_type: MQTT v5 속성 값)"""
+
+    name = "json"
+    content_type = "application/json"
+
+    def encode(self, message) -> bytes:
+        return json.dumps(message, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, payload: bytes):
+        """잘못된 메시지는 ValueError (형식과 관계없이 같은 예외)"""
+        return json.loads(payload.decode("utf-8"))
+
+
+class CborCodec(Codec):
+    name = "cbor"
+    content_type = "application/cbor"
+
+    @staticmethod
+    def _default(encoder, value):
+        encoder.encode(str(value))  # JSON의 default=str과 같게 (Path 등)
+
+    @classmethod
+    def _dates_to_str(cls, value):
+        """datetime/date/time → str (cbor2는 시각을 직접 인코딩해서 default를 부르지 않고,
+        시간대 없는 datetime은 CBOREncodeError - JSON의 default=str과 같은 문자열로 바꿈)"""
+        if isinstance(value, dict):
+            return {k: cls._dates_to_str(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._dates_to_str(v) for v in value]
+        if isinstance(value, (datetime.date, datetime.time)):
+            return str(value)
+        return value
+
+    def encode(self, message) -> bytes:
+        return cbor2.dumps(self._dates_to_str(message), default=self._default)
+
+    def decode(self, payload: bytes):
+        try:
+            return cbor2.loads(payload)
+        except cbor2.CBORDecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def encode(self, message) -> bytes:
+        return msgpack.packb(message, default=str)
+
+    def decode(self, payload: bytes):
+        try:
+            return msgpack.unpackb(payload)
+        except msgpack.UnpackException as e:
+            raise ValueError(str(e)) from e
+
+
+JSON = Codec()
+CODECS: Dict[str, Codec] = {"json": JSON}
+if cbor2 is not None:
+    CODECS["cbor"] = CborCodec()
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+_BY_CONTENT_TYPE = {codec.content_type: codec for codec in CODECS.values()}
+_BY_CONTENT_TYPE["application/x-msgpack"] = CODECS.get("msgpack")
+_BY_CONTENT_TYPE["application/vnd.msgpack"] = CODECS.get("msgpack")
+
+
+def get_codec(name: str) -> Codec:
+    """이름으로 코덱 선택 (모르는 이름이거나 라이브러리가 없으면 JSON)"""
+    name = (name or "json").strip().lower()
+    codec = CODECS.get(name)
+    if codec is None:
+        logger.warning(f"⚠️ MQTT 메시지 형식 '{name}' 사용 불가 (라이브러리 미설치?) - JSON 사용")
+        return JSON
+    return codec
+
+
+def topic_for(topic: str, codec: Codec) -> str:
+    """발행 토픽 (JSON은 기존 토픽 그대로, 나머지는 /<형식> 접미사)"""
+    return topic if codec is JSON else f"{topic}/{codec.name}"
+
+
+def split_topic(topic: str, content_type: Optional[str] = None):
+    """받은 토픽 → (접미사를 뗀 토픽, 코덱)
+
+    content_type(MQTT v5 속성)이 있으면 그것으로, 없으면 토픽 접미사로 판단합니다.
+    접미사의 형식을 이 장치에서 쓸 수 없으면 ValueError.
+    """
+    base, _, suffix = topic.rpartition("/")
+    if suffix in ("json", "cbor", "msgpack"):
+        if suffix not in CODECS:
+            raise ValueError(f"'{suffix}' 형식을 디코딩할 수 없습니다 (라이브러리 미설치)")
+        codec = CODECS[suffix]
+    else:
+        base, codec = topic, JSON
+    if content_type:
+        codec = _BY_CONTENT_TYPE.get(content_type.split(";")[0].strip().lower()) or codec
+    return base, codec
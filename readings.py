@@ -0,0 +1,185 @@
+"""센서 측정값 레코드
+
+측정값 하나를 dict 대신 __slots__ 레코드로 다루고, 장시간 버퍼링(장애 중 재전송,
+일괄 업로드)에는 필드별 NumPy 컬럼(ReadingBuffer)을 사용해 메모리를 줄입니다.
+업로드 폼/JSON 변환은 레코드에서 바로 만듭니다.
+"""
+import json
+import time
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Iterator, Tuple, Type
+
+import numpy as np
+
+
+def make_reading_id(command: str, address: int, ts: float) -> str:
+    """측정값 ID (명령-주소-밀리초 타임스탬프) - 이미지 저장소 등에서 측정값을 가리키는 키"""
+    return f"{command}{int(address)}-{int(round(ts * 1000))}"
+
+
+class Reading:
+    """측정값 레코드 공통 기능 (SoilReading / EnvReading)"""
+
+    __slots__ = ()
+
+    command: ClassVar[str]
+    # 센서 값 필드 (address, ts 제외) - sensor_parser 스키마와 같은 순서
+    VALUE_FIELDS: ClassVar[Tuple[str, ...]]
+    # 업로드 폼 키 → 필드명
+    FORM_FIELDS: ClassVar[Tuple[Tuple[str, str], ...]]
+
+    @classmethod
+    def from_dict(cls, data: dict, ts: float = None):
+        """parse_*_csv / decode_frame 결과로 레코드 생성"""
+        return cls(int(data["address"]), *[float(data[name]) for name in cls.VALUE_FIELDS],
+                   time.time() if ts is None else ts)
+
+    @property
+    def reading_id(self) -> str:
+        return make_reading_id(self.command, self.address, self.ts)
+
+    def to_form(self) -> Dict[str, object]:
+        """업로드 API 폼 데이터"""
+        form = {"command": self.command}
+        for key, name in self.FORM_FIELDS:
+            form[key] = getattr(self, name)
+        return form
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON 직렬화용 dict (address, 센서 값, ts)"""
+        data = {"address": self.address}
+        for name in self.VALUE_FIELDS:
+            data[name] = getattr(self, name)
+        data["ts"] = self.ts
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    def __getitem__(self, name: str):
+        """기존 dict 방식 접근 호환 (reading["temperature"])"""
+        return getattr(self, name)
+
+
+@dataclass
+class SoilReading(Reading):
+    """토양 센서(A) 측정값"""
+
+    __slots__ = ("address", "temperature", "humidity", "ec", "ph", "salt", "n", "p", "k", "ts")
+
+    command: ClassVar[str] = "A"
+    VALUE_FIELDS: ClassVar[Tuple[str, ...]] = ("temperature", "humidity", "ec", "ph", "salt", "n", "p", "k")
+    FORM_FIELDS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ("temp", "temperature"), ("humi", "humidity"),
+        ("ec", "ec"), ("ph", "ph"), ("salt", "salt"), ("n", "n"), ("p", "p"), ("k", "k"),
+    )
+
+    address: int
+    temperature: float
+    humidity: float
+    ec: float
+    ph: float
+    salt: float
+    n: float
+    p: float
+    k: float
+    ts: float
+
+
+@dataclass
+class EnvReading(Reading):
+    """환경 센서(B) 측정값"""
+
+    __slots__ = ("address", "temperature", "humidity", "ch2o", "tvoc", "pm25", "pm10", "co2", "ts")
+
+    command: ClassVar[str] = "B"
+    VALUE_FIELDS: ClassVar[Tuple[str, ...]] = ("temperature", "humidity", "ch2o", "tvoc", "pm25", "pm10", "co2")
+    FORM_FIELDS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ("temp", "temperature"), ("humi", "humidity"),
+        ("ch2o", "ch2o"), ("tvoc", "tvoc"), ("pm25", "pm25"), ("pm10", "pm10"), ("co2", "co2"),
+    )
+
+    address: int
+    temperature: float
+    humidity: float
+    ch2o: float
+    tvoc: float
+    pm25: float
+    pm10: float
+    co2: float
+    ts: float
+
+
+READING_TYPES: Dict[str, Type[Reading]] = {"A": SoilReading, "B": EnvReading}
+
+
+class ReadingBuffer:
+    """측정값 대량 버퍼 (필드별 NumPy 컬럼, struct-of-arrays)
+
+    레코드 하나당 필드 수 x 8바이트 (address는 2바이트)만 사용합니다.
+    """
+
+    def __init__(self, reading_type: Type[Reading], capacity: int = 1024):
+        self.reading_type = reading_type
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {"address": np.empty(capacity, dtype=np.int16)}
+        for name in reading_type.VALUE_FIELDS:
+            self._columns[name] = np.empty(capacity, dtype=np.float64)
+        self._columns["ts"] = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns["ts"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self._columns.values())
+
+    def _grow(self, needed: int):
+        capacity = max(needed, self.capacity * 2)
+        for name, col in self._columns.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._size] = col[:self._size]
+            self._columns[name] = grown
+
+    def append(self, reading: Reading):
+        if self._size == self.capacity:
+            self._grow(self._size + 1)
+        i = self._size
+        for name, col in self._columns.items():
+            col[i] = getattr(reading, name)
+        self._size += 1
+
+    def extend_columns(self, **columns: np.ndarray):
+        """컬럼 배열을 한 번에 추가 (parse_lines 결과 등, ts 포함 모든 필드 필요)"""
+        count = len(columns["ts"])
+        if self._size + count > self.capacity:
+            self._grow(self._size + count)
+        for name, col in self._columns.items():
+            col[self._size:self._size + count] = columns[name]
+        self._size += count
+
+    def column(self, name: str) -> np.ndarray:
+        """필드 컬럼 (복사 없는 뷰)"""
+        return self._columns[name][:self._size]
+
+    def __getitem__(self, index: int) -> Reading:
+        if not -self._size <= index < self._size:
+            raise IndexError(index)
+        index %= self._size
+        cols = self._columns
+        return self.reading_type(
+            int(cols["address"][index]),
+            *[float(cols[name][index]) for name in self.reading_type.VALUE_FIELDS],
+            float(cols["ts"][index]),
+        )
+
+    def __iter__(self) -> Iterator[Reading]:
+        for i in range(self._size):
+            yield self[i]
+
+    def clear(self):
+        self._size = 0
@@ -0,0 +1,210 @@
+"""측정값 집계 (1분 / 1시간 / 1일) 증분 유지
+
+측정값이 들어올 때마다 단계별 현재 구간의 count/min/max/sum을 갱신하고,
+구간이 끝나면 시계열 저장소의 집계 시리즈(<시리즈>_1m 등)에 한 행으로 기록합니다.
+대시보드/AI 서비스는 원본 대신 집계 시리즈를 조회하거나 MQTT 요약을 받습니다.
+
+구간 경계는 현지 시간 기준입니다 (1일 구간은 현지 자정에 바뀜 - export_history의 날짜별 파일과 같은 기준).
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from timeseries_store import Series, TimeSeriesStore
+
+
+class Tier(NamedTuple):
+    name: str
+    seconds: int
+    retention_days: float  # 이 기간보다 오래된 집계는 세그먼트 단위로 삭제
+
+
+TIERS = (
+    Tier("1m", 60, 7),
+    Tier("1h", 3600, 90),
+    Tier("1d", 86400, 365 * 5),
+)
+ROLLUP_SEGMENT_ROWS = 4096  # 보존 기간 삭제 단위가 너무 크지 않도록 원본보다 작게
+
+
+def bucket_start(ts: float, seconds: int) -> float:
+    """ts가 속한 구간의 시작 - UTC 오프셋만큼 밀어서 나누므로 현지 시간 기준 (KST면 1일 구간이 00:00 KST에 시작)"""
+    offset = time.localtime(ts).tm_gmtoff
+    return ts - (ts + offset) % seconds
+
+
+class _Bucket:
+    """진행 중인 구간 하나 (주소별)"""
+
+    __slots__ = ("start", "count", "min", "max", "sum")
+
+    def __init__(self, start: float, width: int):
+        self.start = start
+        self.count = 0
+        self.min = [math.inf] * width
+        self.max = [-math.inf] * width
+        self.sum = [0.0] * width
+
+    def add(self, values: Sequence[float]):
+        self.count += 1
+        for i, v in enumerate(values):
+            if v < self.min[i]:
+                self.min[i] = v
+            if v > self.max[i]:
+                self.max[i] = v
+            self.sum[i] += v
+
+
+class RollupManager:
+    """시리즈 하나(soil/env)의 단계별 집계"""
+
+    def __init__(
+        self,
+        store: TimeSeriesStore,
+        series: str,
+        fields: Sequence[str],
+        tiers: Sequence[Tier] = TIERS,
+        on_rollup: Optional[Callable[[str, Tier, dict], None]] = None,
+    ):
+        """
+        Args:
+            store: 시계열 저장소 (집계 시리즈를 같은 위치에 저장)
+            series: 원본 시리즈 이름 ("soil", "env")
+            fields: 집계할 필드 (address, ts 제외)
+            on_rollup: 구간이 닫힐 때 (series, tier, summary) 콜백 - MQTT 발행 등
+        """
+        self.series = series
+        self.fields = tuple(fields)
+        self.tiers = tuple(tiers)
+        self.on_rollup = on_rollup
+        self.lock = threading.Lock()
+        columns = ["address", "count"]
+        for name in self.fields:
+            columns += [f"{name}_min", f"{name}_max", f"{name}_mean"]
+        self.tier_series: Dict[str, Series] = {
+            tier.name: store.open(f"{series}_{tier.name}", columns, ROLLUP_SEGMENT_ROWS)
+            for tier in self.tiers
+        }
+        # {tier 이름: {address: _Bucket}}
+        self._open: Dict[str, Dict[int, _Bucket]] = {tier.name: {} for tier in self.tiers}
+
+    def add(self, reading):
+        """측정값 반영 (Reading 레코드 또는 컬럼명 → 값 매핑)"""
+        values = [reading[name] for name in self.fields]
+        self._add(int(reading["address"]), float(reading["ts"]), values)
+
+    def _add(self, address: int, ts: float, values: Sequence[float], tiers: Sequence[Tier] = None):
+        closed = []
+        with self.lock:
+            for tier in tiers or self.tiers:
+                start = bucket_start(ts, tier.seconds)
+                buckets = self._open[tier.name]
+                bucket = buckets.get(address)
+                if bucket is not None and start < bucket.start:
+                    continue  # 시계가 뒤로 간 경우 이미 지난 구간은 무시
+                # 측정값은 시간순으로 들어오므로 이전 구간은 (다른 주소 포함) 모두 완료됨
+                closed += self._close_before(tier, start)
+                bucket = buckets.get(address)
+                if bucket is None:
+                    bucket = buckets[address] = _Bucket(start, len(self.fields))
+                bucket.add(values)
+        self._notify(closed)
+
+    def flush_due(self, now: float = None) -> int:
+        """끝난 구간을 다음 측정값을 기다리지 않고 닫기 (메인 루프에서 주기적으로 호출)
+
+        Returns:
+            닫은 구간 수
+        """
+        now = time.time() if now is None else now
+        closed = []
+        with self.lock:
+            for tier in self.tiers:
+                closed += self._close_before(tier, now - tier.seconds + 1e-9)
+        self._notify(closed)
+        return len(closed)
+
+    def _close_before(self, tier: Tier, start: float) -> List:
+        """start 이전에 시작한 구간을 시간순으로 닫기 (집계 시리즈의 타임스탬프 순서 유지)"""
+        buckets = self._open[tier.name]
+        due = sorted(
+            ((bucket.start, address) for address, bucket in buckets.items() if bucket.start < start)
+        )
+        return [self._close(tier, address, buckets.pop(address)) for _, address in due]
+
+    def _close(self, tier: Tier, address: int, bucket: _Bucket):
+        row = {"ts": bucket.start, "address": address, "count": bucket.count}
+        summary = {}
+        for i, name in enumerate(self.fields):
+            mean = bucket.sum[i] / bucket.count
+            row[f"{name}_min"] = bucket.min[i]
+            row[f"{name}_max"] = bucket.max[i]
+            row[f"{name}_mean"] = mean
+            summary[name] = [bucket.min[i], bucket.max[i], round(mean, 3)]
+        self.tier_series[tier.name].append(row)
+        return tier, {"ts": bucket.start, "address": address, "count": bucket.count, "fields": summary}
+
+    def _notify(self, closed: List):
+        if not self.on_rollup:
+            return
+        for tier, summary in closed:
+            self.on_rollup(self.series, tier, summary)
+
+    def recover(self, raw: Series):
+        """재시작 후 진행 중이던 구간 복구 (마지막으로 닫힌 구간 이후 원본을 다시 반영)"""
+        starts = []
+        for tier in self.tiers:
+            last = self.tier_series[tier.name].last_ts
+            starts.append(None if last is None else last + tier.seconds)
+        start = None if None in starts else min(starts)
+
+        columns = ["ts", "address"] + list(self.fields)
+        callback, self.on_rollup = self.on_rollup, None  # 복구 중 닫힌 구간은 다시 발행하지 않음
+        try:
+            for part in raw.slices(start, None, columns):
+                rows = np.column_stack([part[name] for name in self.fields]).tolist()
+                for ts, address, values in zip(part["ts"].tolist(), part["address"].tolist(), rows):
+                    # 이미 집계가 기록된 단계는 건너뜀 (중복 방지)
+                    tiers = [t for t, s in zip(self.tiers, starts) if s is None or ts >= s]
+                    if tiers:
+                        self._add(int(address), ts, values, tiers)
+        finally:
+            self.on_rollup = callback
+
+    def enforce_retention(self, now: float = None) -> int:
+        """단계별 보존 기간이 지난 집계 삭제"""
+        now = time.time() if now is None else now
+        return sum(
+            self.tier_series[tier.name].drop_before(now - tier.retention_days * 86400)
+            for tier in self.tiers
+        )
+
+    def query(self, tier: str, start: float = None, end: float = None, include_open: bool = False) -> Dict[str, np.ndarray]:
+        """단계별 집계 조회
+
+        Returns:
+            {컬럼명: 배열} (ts, address, count, <필드>_min/_max/_mean)
+        """
+        series = self.tier_series[tier]
+        parts = series.slices(start, end)
+        result = {
+            name: np.concatenate([p[name] for p in parts]) if parts else np.empty(0)
+            for name in series.columns
+        }
+        if include_open:
+            with self.lock:
+                rows = [
+                    (address, bucket) for address, bucket in self._open[tier].items()
+                    if (start is None or bucket.start >= start) and (end is None or bucket.start < end)
+                ]
+            for address, bucket in rows:
+                extra = {"ts": bucket.start, "address": address, "count": bucket.count}
+                for i, name in enumerate(self.fields):
+                    extra[f"{name}_min"] = bucket.min[i]
+                    extra[f"{name}_max"] = bucket.max[i]
+                    extra[f"{name}_mean"] = bucket.sum[i] / bucket.count
+                result = {name: np.append(col, extra[name]) for name, col in result.items()}
+        return result
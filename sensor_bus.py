@@ -0,0 +1,156 @@
+"""공유 센서 버스 (RS-485) 다중 주소 폴링
+
+하나의 USB 포트(ESP32) 뒤에 주소가 다른 센서 여러 개가 연결된 경우,
+주소 지정 명령(예: "A13")을 파이프라인으로 보내 버스가 쉬지 않게 하고
+주소별 측정값/오류 횟수를 집계합니다.
+
+펌웨어 규약: 명령 문자 뒤에 10진수 주소를 붙이면 해당 주소 센서만 응답하며,
+응답 CSV의 첫 번째 값이 주소입니다 (기존 단일 센서 응답과 동일한 형식).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List
+
+from serial_client import SerialClient
+
+logger = logging.getLogger(__name__)
+
+
+def format_command(command: str, address: int) -> str:
+    """주소 지정 명령 생성 (예: "A", 13 → "A13")"""
+    return f"{command}{int(address)}"
+
+
+def parse_addresses(value: str) -> List[int]:
+    """환경변수 형식 주소 목록 파싱 (예: "1,2,5-8" → [1, 2, 5, 6, 7, 8])"""
+    addresses = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            addresses.extend(range(int(start), int(end) + 1))
+        else:
+            addresses.append(int(part))
+    return addresses
+
+
+class BusPoller:
+    """한 포트 뒤의 여러 주소 센서를 파이프라인 방식으로 폴링"""
+
+    def __init__(
+        self,
+        client: SerialClient,
+        command: str,
+        addresses: Iterable[int],
+        parse: Callable[[str], dict],
+        pipeline_depth: int = 4,
+        response_timeout: float = 1.0,
+        max_retries: int = 1,
+    ):
+        """
+        Args:
+            client: 버스가 연결된 SerialClient
+            command: 명령 문자 ('A' 토양, 'B' 환경)
+            addresses: 폴링할 센서 주소 목록
+            parse: 응답 한 줄을 dict로 변환 (결과에 "address" 포함)
+            pipeline_depth: 응답을 기다리지 않고 미리 보낼 최대 요청 수
+            response_timeout: 응답 한 줄당 최대 대기 시간 (초)
+            max_retries: 실패한 주소 재시도 횟수
+        """
+        self.client = client
+        self.command = command
+        self.addresses = list(addresses)
+        self.parse = parse
+        self.pipeline_depth = max(1, pipeline_depth)
+        self.response_timeout = response_timeout
+        self.max_retries = max_retries
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[int, dict] = {
+            addr: {"readings": 0, "timeouts": 0, "parse_errors": 0, "last_seen": None}
+            for addr in self.addresses
+        }
+
+    def poll(self) -> Dict[int, dict]:
+        """모든 주소를 한 번씩 폴링
+
+        Returns:
+            {address: 파싱된 데이터} (응답에 성공한 주소만)
+        """
+        results: Dict[int, dict] = {}
+        pending = list(self.addresses)
+
+        for _ in range(self.max_retries + 1):
+            if not pending:
+                break
+            pending = self._poll_round(pending, results)
+
+        if pending:
+            logger.warning(f"⚠️ 버스({self.command}) 응답 없는 주소: {pending}")
+        return results
+
+    def _poll_round(self, addresses: List[int], results: Dict[int, dict]) -> List[int]:
+        """주소 목록을 한 바퀴 폴링하고 실패한 주소 목록을 반환"""
+        queue = deque(addresses)
+        in_flight = deque()  # 응답 대기 중인 주소 (펌웨어가 순서대로 처리)
+        failed = []
+
+        with self.client.lock:
+            while queue or in_flight:
+                # 파이프라인 채우기: 응답을 기다리는 동안 다음 요청을 미리 전송
+                while queue and len(in_flight) < self.pipeline_depth:
+                    addr = queue.popleft()
+                    self.client.send(format_command(self.command, addr))
+                    in_flight.append(addr)
+
+                line = self.client.receive(timeout=self.response_timeout)
+                if not line:
+                    # 가장 오래된 요청이 시간 초과
+                    addr = in_flight.popleft()
+                    self._count(addr, "timeouts")
+                    failed.append(addr)
+                    continue
+
+                try:
+                    data = self.parse(line)
+                except ValueError:
+                    # 깨진 응답은 순서상 가장 오래된 요청의 응답으로 간주
+                    addr = in_flight.popleft()
+                    self._count(addr, "parse_errors")
+                    failed.append(addr)
+                    continue
+
+                addr = data.get("address")
+                if addr in in_flight:
+                    # 앞선 요청이 응답 없이 건너뛰어진 경우 해당 주소는 시간 초과 처리
+                    while in_flight[0] != addr:
+                        skipped = in_flight.popleft()
+                        self._count(skipped, "timeouts")
+                        failed.append(skipped)
+                    in_flight.popleft()
+                else:
+                    # 요청하지 않은 주소의 응답 (버스 충돌/지연 응답) → 버림
+                    logger.warning(f"⚠️ 버스({self.command}) 예상치 못한 주소 응답: {addr}")
+                    continue
+
+                results[addr] = data
+                self._count(addr, "readings")
+
+        return failed
+
+    def _count(self, address: int, key: str):
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                address, {"readings": 0, "timeouts": 0, "parse_errors": 0, "last_seen": None}
+            )
+            stats[key] += 1
+            if key == "readings":
+                stats["last_seen"] = time.time()
+
+    def stats(self) -> Dict[int, dict]:
+        """주소별 측정/오류 횟수"""
+        with self._stats_lock:
+            return {addr: dict(s) for addr, s in self._stats.items()}
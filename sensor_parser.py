@@ -0,0 +1,203 @@
+"""센서 응답(CSV) 파싱 모듈
+
+토양(A)/환경(B) 센서 응답의 필드 순서, 배율, 허용 범위를 스키마 하나로 정의하고
+한 줄 파싱(parse_soil_csv / parse_env_csv)과 여러 줄 일괄 파싱(parse_lines)을 제공합니다.
+
+    토양 (A): address, temperature, humidity, ec, ph, salt, n, p, k
+    환경 (B): address, temp, hum, ch2o, tvoc, pm25, pm10, co2, 0
+"""
+import math
+import sys
+from operator import itemgetter, le, truediv
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Field(NamedTuple):
+    """CSV 컬럼 정의 (name이 None이면 무시하는 컬럼)"""
+    name: Optional[str]
+    scale: float = 1.0           # 실제 값 = 원시 값 / scale
+    min: Optional[float] = None  # 허용 범위 (배율 적용 후)
+    max: Optional[float] = None
+
+
+class Schema:
+    """센서 응답 한 줄의 컬럼 구성"""
+
+    def __init__(self, name: str, fields: Sequence[Field]):
+        self.name = name
+        self.fields = tuple(fields)
+        self.width = len(self.fields)
+        self.names = tuple(f.name for f in self.fields if f.name is not None)
+        # 한 줄 파싱용 컬럼별 배율/범위 (전체 컬럼 순서) - 범위가 없으면 float 최댓값이라 NaN/inf는 항상 범위 밖
+        self.scales = tuple(float(f.scale) for f in self.fields)
+        self.lows = tuple(-sys.float_info.max if f.min is None else f.min for f in self.fields)
+        self.highs = tuple(sys.float_info.max if f.max is None else f.max for f in self.fields)
+        self.pick = itemgetter(*[i for i, f in enumerate(self.fields) if f.name is not None])
+        self.by_name = {f.name: f for f in self.fields if f.name is not None}
+        self.dtype = np.dtype([
+            (f.name, "i4" if f.name == "address" else "f8")
+            for f in self.fields if f.name is not None
+        ])
+
+    def bounds(self, *names: str) -> tuple:
+        """필드별 (배율, 최솟값, 최댓값)을 이어 붙인 튜플 - 한 줄 파싱에서 한 번에 풀어 쓰기 위한 상수"""
+        bounds = []
+        for name in names:
+            f = self.by_name[name]
+            bounds += [float(f.scale),
+                       -sys.float_info.max if f.min is None else f.min,
+                       sys.float_info.max if f.max is None else f.max]
+        return tuple(bounds)
+
+    def check_layout(self, names: Sequence[str], bounded: Sequence[str]):
+        """한 줄 파싱 전용 함수가 가정한 컬럼 순서/검사 필드가 스키마와 같은지 (다르면 import 시 실패)"""
+        fields = tuple(f.name for f in self.fields)
+        limited = tuple(f.name for f in self.fields
+                        if f.name is not None and (f.scale != 1 or f.min is not None or f.max is not None))
+        if fields != tuple(names) or not set(limited) <= set(bounded):
+            raise RuntimeError(f"{self.name} 스키마와 한 줄 파서의 컬럼 구성이 다릅니다: {fields}")
+
+
+SOIL_SCHEMA = Schema("soil", (
+    Field("address", min=0, max=255),
+    Field("temperature", scale=10, min=-40, max=80),  # 센서 데이터가 10배로 들어옴
+    Field("humidity", scale=10, min=0, max=100),      # 센서 데이터가 10배로 들어옴
+    Field("ec"),
+    Field("ph"),
+    Field("salt"),
+    Field("n"),
+    Field("p"),
+    Field("k"),
+))
+
+ENV_SCHEMA = Schema("env", (
+    Field("address", min=0, max=255),
+    Field("temperature", min=-40, max=80),
+    Field("humidity", min=0, max=100),
+    Field("ch2o"),   # 포름알데하이드 (ug/m³)
+    Field("tvoc"),   # 휘발성유기화합물 (ug/m³)
+    Field("pm25"),   # 초미세먼지 PM2.5 (ug/m³)
+    Field("pm10"),   # 미세먼지 PM10 (ug/m³)
+    Field("co2"),    # 이산화탄소 (ppm)
+    Field(None),     # 예약 (항상 0)
+))
+
+
+def parse_line(schema: Schema, line: str, scaled: bool = True, keep_raw: bool = False) -> dict:
+    """센서 응답 한 줄 파싱 + 검증
+
+    Args:
+        scaled: False면 배율을 적용하지 않은 원시 값 (범위 검사도 생략 - 기존 main.py 등의 출력)
+        keep_raw: 결과에 원본 응답("raw") 포함
+
+    Raises:
+        ValueError: 값 개수, 숫자 형식, 허용 범위 오류
+    """
+    parts = line.split(",")
+    if len(parts) != schema.width:
+        raise ValueError(f"Expected {schema.width} values, got {len(parts)}: {line}")
+    values = list(map(float, parts))
+    if scaled:
+        # 필드별 분기 없이 전체 컬럼에 배율/범위 적용 (NaN/inf는 범위 검사에서 걸림)
+        values = list(map(truediv, values, schema.scales))
+        if not (all(map(le, schema.lows, values)) and all(map(le, values, schema.highs))):
+            raise ValueError(f"Value out of range: {line}")
+
+    result = dict(zip(schema.names, schema.pick(values)))
+    result["address"] = int(result["address"])
+    if keep_raw:
+        result["raw"] = line
+    return result
+
+
+# 자주 쓰는 두 스키마는 컬럼을 변수로 바로 풀어서 처리 (parse_line과 같은 결과, 필드별 반복/분기 없음)
+# 배율/범위는 스키마에서 미리 계산한 상수 - 범위가 없는 필드는 합계로 NaN/inf만 검사
+SOIL_SCHEMA.check_layout(("address", "temperature", "humidity", "ec", "ph", "salt", "n", "p", "k"),
+                         ("address", "temperature", "humidity"))
+ENV_SCHEMA.check_layout(("address", "temperature", "humidity", "ch2o", "tvoc", "pm25", "pm10", "co2", None),
+                        ("address", "temperature", "humidity"))
+_SOIL_BOUNDS = SOIL_SCHEMA.bounds("address", "temperature", "humidity")
+_ENV_BOUNDS = ENV_SCHEMA.bounds("address", "temperature", "humidity")
+_isfinite = math.isfinite
+
+
+def parse_soil_csv(line: str) -> dict:
+    """토양 센서 데이터 파싱 (9개 값, 온도/습도는 1/10 배율 적용)"""
+    parts = line.split(",")
+    if len(parts) != 9:
+        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
+    address, temperature, humidity, ec, ph, salt, n, p, k = map(float, parts)
+    _, a_lo, a_hi, t_scale, t_lo, t_hi, h_scale, h_lo, h_hi = _SOIL_BOUNDS
+    temperature /= t_scale
+    humidity /= h_scale
+    if not (a_lo <= address <= a_hi and t_lo <= temperature <= t_hi and h_lo <= humidity <= h_hi
+            and _isfinite(ec + ph + salt + n + p + k)):
+        raise ValueError(f"Value out of range: {line}")
+    return {"address": int(address), "temperature": temperature, "humidity": humidity,
+            "ec": ec, "ph": ph, "salt": salt, "n": n, "p": p, "k": k}
+
+
+def parse_env_csv(line: str) -> dict:
+    """환경 센서 데이터 파싱 (9개 값)"""
+    parts = line.split(",")
+    if len(parts) != 9:
+        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
+    address, temperature, humidity, ch2o, tvoc, pm25, pm10, co2, reserved = map(float, parts)
+    _, a_lo, a_hi, t_scale, t_lo, t_hi, h_scale, h_lo, h_hi = _ENV_BOUNDS
+    temperature /= t_scale
+    humidity /= h_scale
+    if not (a_lo <= address <= a_hi and t_lo <= temperature <= t_hi and h_lo <= humidity <= h_hi
+            and _isfinite(ch2o + tvoc + pm25 + pm10 + co2 + reserved)):
+        raise ValueError(f"Value out of range: {line}")
+    return {"address": int(address), "temperature": temperature, "humidity": humidity,
+            "ch2o": ch2o, "tvoc": tvoc, "pm25": pm25, "pm10": pm10, "co2": co2}
+
+
+def parse_lines(schema: Schema, lines: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """버퍼에 쌓인 여러 줄을 한 번에 파싱
+
+    Returns:
+        (records, valid): schema.dtype 구조화 배열 (len(lines)개)과 행별 검증 결과.
+        잘못된 행의 값은 NaN (address는 -1)
+    """
+    n = len(lines)
+    values = np.full((n, schema.width), np.nan)
+
+    # 값 개수가 맞는 행만 한 번에 변환
+    counts = np.fromiter((line.count(",") for line in lines), dtype=np.int64, count=n)
+    rows = np.flatnonzero(counts == schema.width - 1)
+    if len(rows):
+        good = [lines[i] for i in rows] if len(rows) != n else lines
+        try:
+            flat = np.fromstring(",".join(good), dtype=np.float64, sep=",")
+            if flat.size != len(rows) * schema.width:
+                # 구버전 NumPy는 숫자가 아닌 값에서 경고 후 중단
+                raise ValueError("unparsed data")
+            values[rows] = flat.reshape(-1, schema.width)
+        except ValueError:
+            # 숫자가 아닌 값이 섞인 경우에만 행 단위로 처리
+            for i in rows:
+                try:
+                    values[i] = [float(v) for v in lines[i].split(",")]
+                except ValueError:
+                    pass
+
+    records = np.empty(n, dtype=schema.dtype)
+    valid = np.isfinite(values).all(axis=1)
+    for i, field in enumerate(schema.fields):
+        if field.name is None:
+            continue
+        column = values[:, i]
+        if field.scale != 1:
+            column = column / field.scale
+        if field.min is not None:
+            valid &= ~(column < field.min)
+        if field.max is not None:
+            valid &= ~(column > field.max)
+        if field.name == "address":
+            records["address"] = np.where(np.isnan(column), -1, column)
+        else:
+            records[field.name] = column
+    return records, valid
@@ -1,6 +1,10 @@
+import threading
+import time
+
 import serial
 import serial.tools.list_ports
-import time
+
+from metrics import metrics
 
 # 고정 COM 포트 설정
 SOIL_SENSOR_PORT = "COM3"  # 토양 센서
@@ -18,14 +22,132 @@ def find_env_sensor_port():
 
 
 class SerialClient:
-    def __init__(self, port, baud=9600, timeout=5):
-        self.ser = serial.Serial(port, baud, timeout=timeout)
+    def __init__(self, port, baud=9600, timeout=5, connect=True):
+        """
+        Args:
+            connect: False면 포트를 열지 않고 끊긴 상태로 생성 (부팅 시 포트가 없는 센서 - reconnect()로 열기)
+        """
+        self.port = port
+        self.baud = baud
+        self.timeout = timeout
+        # send/receive 한 쌍이 다른 스레드(재연결 등)와 섞이지 않도록 보호
+        self.lock = threading.RLock()
+        self.reconnect_count = 0
+        self.total_downtime = 0.0
+        self.down_since = None
+        # 응답 형식: None (미확인), "csv", "frame" (frame_codec.negotiate 참고)
+        self.protocol = None
+        self.ser = None
+        if not connect:
+            self.down_since = time.monotonic()
+            return
+        # write도 제한 (USB-시리얼 변환기가 멈추면 write가 끝나지 않음) → SerialTimeoutException
+        self.ser = serial.Serial(port, baud, timeout=timeout, write_timeout=timeout)
+
+    @property
+    def connected(self) -> bool:
+        """포트가 열려 있고 마지막 I/O가 성공했는지 여부"""
+        return self.down_since is None and self.ser is not None and self.ser.is_open
 
     def send(self, msg):
-        self.ser.write(f"{msg}\n".encode())
+        with self.lock:
+            if not self.connected:
+                raise serial.SerialException(f"{self.port} 연결 끊김 (재연결 대기 중)")
+            try:
+                self.ser.write(f"{msg}\n".encode())
+            except (serial.SerialException, OSError):
+                self.mark_down()
+                raise
+
+    def receive(self, timeout=None):
+        """응답 한 줄 수신 (timeout 지정 시 이번 호출에만 적용)"""
+        with metrics.span("serial.receive"):
+            line = self._read(lambda: self.ser.readline(), timeout)
+        return line.decode(errors="ignore").strip()
+
+    def read_bytes(self, size, timeout=None):
+        """바이너리 프레임용: 최대 size 바이트 수신 (시간 초과 시 더 짧을 수 있음)"""
+        return self._read(lambda: self.ser.read(size), timeout)
+
+    def _read(self, read, timeout):
+        with self.lock:
+            if not self.connected:
+                raise serial.SerialException(f"{self.port} 연결 끊김 (재연결 대기 중)")
+            try:
+                if timeout is None:
+                    return read()
+                self.ser.timeout = timeout
+                try:
+                    return read()
+                finally:
+                    self.ser.timeout = self.timeout
+            except (serial.SerialException, OSError):
+                self.mark_down()
+                raise
+
+    def query(self, msg):
+        """명령 전송 후 응답 한 줄 수신 (다른 스레드와 섞이지 않음)"""
+        with self.lock, metrics.span("serial.roundtrip"):
+            self.send(msg)
+            return self.receive()
+
+    def mark_down(self):
+        """포트를 끊긴 상태로 표시하고 핸들을 정리 (USB 분리, ESP32 리셋 등)"""
+        with self.lock:
+            if self.down_since is None:
+                self.down_since = time.monotonic()
+            try:
+                if self.ser is not None:
+                    self.ser.close()
+            except Exception:
+                pass
+
+    def abort(self):
+        """다른 스레드(watchdog)에서 멈춘 read/write 중단
+
+        멈춘 스레드가 잠금을 잡고 있으므로 잠금 없이 포트를 닫음 - 막힌 호출은 예외로 끝나고
+        mark_down으로 이어지며, 포트 감시(DeviceWatcher)가 다시 연결합니다.
+        """
+        if self.down_since is None:
+            self.down_since = time.monotonic()
+        try:
+            if self.ser is not None:
+                self.ser.close()
+        except Exception:
+            pass
+
+    def reconnect(self) -> bool:
+        """끊긴 포트를 다시 열기
+
+        Returns:
+            True if the port is open after the call
+        """
+        with self.lock:
+            if self.connected:
+                return True
+            try:
+                self.ser = serial.Serial(self.port, self.baud, timeout=self.timeout, write_timeout=self.timeout)
+            except (serial.SerialException, OSError):
+                return False
+            if self.down_since is not None:
+                self.total_downtime += time.monotonic() - self.down_since
+            self.down_since = None
+            self.protocol = None  # 장치가 리셋되었을 수 있으므로 응답 형식 재확인
+            self.reconnect_count += 1
+            return True
 
-    def receive(self):
-        return self.ser.readline().decode(errors="ignore").strip()
+    def stats(self) -> dict:
+        """재연결 횟수 및 누적 다운타임 (초)"""
+        downtime = self.total_downtime
+        if self.down_since is not None:
+            downtime += time.monotonic() - self.down_since
+        return {
+            "port": self.port,
+            "connected": self.connected,
+            "reconnect_count": self.reconnect_count,
+            "downtime_sec": round(downtime, 1),
+        }
 
     def close(self):
-        self.ser.close()
+        if self.ser is not None:
+            self.ser.close()
@@ -0,0 +1,147 @@
+"""주기적 상태 보고 (MQTT farm/{id}/telemetry, 변경분 인코딩)
+
+업로드가 멈추기 전에 서버가 장치 이상을 알 수 있도록 일정 간격으로 상태/성능 지표를 보냅니다.
+장치 수천 대가 보내도 브로커 부담이 작도록 바뀐 값만 짧은 키로 보냅니다.
+
+    {"seq": 42, "ts": 1760000000, "dt": 60,
+     "g": {"disk_mb": 51200, "last.A": 1759999800},     # 게이지: 지난 보고 이후 바뀐 값만
+     "c": {"collect.A.ok": 1, "serial.roundtrip.errors": 2},   # 카운터: 이번 간격의 증가분 (0 생략)
+     "p95": {"serial.roundtrip": 41}}                  # 이번 간격의 단계별 p95 (ms, 관측 있을 때만)
+
+- "kf": 1 이 붙은 보고(키프레임)는 모든 게이지를 포함 - 처음, keyframe_every 번마다, 전송 실패 후
+- 서버는 키프레임으로 상태를 초기화하고 이후 "g"를 덮어써서 복원 (seq가 건너뛰면 다음 키프레임까지 대기)
+- 마지막 측정 시각(last.A 등)은 나이 대신 시각으로 보냄 (측정이 없으면 값이 바뀌지 않음): 나이 = ts - last.A
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from metrics import Registry, bucket_quantile, metrics
+from metrics_server import process_rss
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_INTERVAL = 60.0
+KEYFRAME_EVERY = 10
+
+
+class TelemetryReporter:
+    """상태 보고 스레드"""
+
+    def __init__(
+        self,
+        publish: Callable[[dict], bool],
+        registry: Registry = metrics,
+        interval: float = TELEMETRY_INTERVAL,
+        keyframe_every: int = KEYFRAME_EVERY,
+    ):
+        """
+        Args:
+            publish: 메시지 전송 함수 (실패하면 False → 다음 보고는 키프레임)
+            interval: 보고 간격 (초)
+            keyframe_every: 몇 번째 보고마다 전체 게이지를 보낼지
+        """
+        self.publish = publish
+        self.registry = registry
+        self.interval = interval
+        self.keyframe_every = keyframe_every
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self.seq = 0
+        self._sent_gauges: Dict[str, float] = {}
+        self._last_counters: Dict[str, float] = {}
+        self._last_buckets: Dict[str, list] = {}
+        self._last_time = time.monotonic()
+        self._last_cpu = time.process_time()
+        self._force_keyframe = True
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def gauge(self, name: str, read: Callable[[], float]):
+        """보고할 때마다 read()로 값을 읽는 게이지 등록 (짧은 이름 권장)"""
+        self.gauges[name] = read
+
+    def _read_gauges(self, elapsed: float) -> Dict[str, float]:
+        values = {}
+        for name, read in self.gauges.items():
+            try:
+                value = read()
+            except Exception:
+                continue
+            if value is not None:
+                values[name] = round(value, 1) if isinstance(value, float) else value
+        cpu = time.process_time()
+        values["cpu_pct"] = round((cpu - self._last_cpu) / elapsed * 100) if elapsed > 0 else 0
+        self._last_cpu = cpu
+        values["rss_mb"] = round(process_rss() / 1048576)
+        return values
+
+    def build(self) -> dict:
+        """이번 보고 메시지 (보낸 것으로 간주하고 상태 갱신)"""
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        self._last_time = now
+        histograms, counters = self.registry.snapshot()
+
+        keyframe = self._force_keyframe or self.seq % self.keyframe_every == 0
+        gauges = self._read_gauges(elapsed)
+        changed = gauges if keyframe else {
+            k: v for k, v in gauges.items() if self._sent_gauges.get(k) != v
+        }
+        self._sent_gauges = gauges
+
+        deltas = {}
+        for name, value in counters.items():
+            delta = value - self._last_counters.get(name, 0)
+            if delta:
+                deltas[name] = delta
+        self._last_counters = counters
+
+        p95 = {}
+        for stage, h in histograms.items():
+            previous = self._last_buckets.get(stage)
+            window = [c - p for c, p in zip(h["counts"], previous)] if previous else h["counts"]
+            if any(window):
+                p95[stage] = round(bucket_quantile(h["buckets"], window, 0.95) * 1000)
+            self._last_buckets[stage] = h["counts"]
+
+        message = {"seq": self.seq, "ts": int(time.time()), "dt": round(elapsed)}
+        if keyframe:
+            message["kf"] = 1
+        if changed:
+            message["g"] = changed
+        if deltas:
+            message["c"] = deltas
+        if p95:
+            message["p95"] = p95
+        self.seq += 1
+        self._force_keyframe = False
+        return message
+
+    def report(self) -> bool:
+        baseline = (self._last_counters, dict(self._last_buckets), self._last_time)
+        message = self.build()
+        try:
+            ok = self.publish(message)
+        except Exception as e:
+            logger.warning(f"⚠️ 상태 보고 실패: {e}")
+            ok = False
+        if not ok:
+            # 놓친 게이지는 다음 키프레임으로, 카운터 증가분/지연 시간은 다음 보고에 합쳐서 전송 (dt도 합산)
+            self._force_keyframe = True
+            self._last_counters, self._last_buckets, self._last_time = baseline
+        return bool(ok)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+        logger.info(f"📈 상태 보고 시작: {self.interval:.0f}초 간격")
+
+    def stop(self):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=5)
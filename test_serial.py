@@ -1,24 +1,10 @@
-from serial_client import SerialClient
+from functools import partial
 
+from serial_client import SerialClient
+from sensor_parser import SOIL_SCHEMA, parse_line
 
-def parse_soil_csv(line: str) -> dict:
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) != 9:
-        raise ValueError(f"Expected 9 values, got {len(parts)}: {line}")
-
-    address, temperature, huminity, ec, ph, salt, n, p, k = map(float, parts)
-    return {
-        "address": int(address),
-        "temperature": temperature,
-        "humidity": huminity,
-        "ec": ec,
-        "ph": ph,
-        "salt": salt,
-        "n": n,
-        "p": p,
-        "k": k,
-        "raw": line,
-    }
+# 원시 값 그대로 (배율/범위 검사 없음) + 원본 응답("raw")
+parse_soil_csv = partial(parse_line, SOIL_SCHEMA, scaled=False, keep_raw=True)
 
 
 def main():
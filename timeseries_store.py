@@ -0,0 +1,244 @@
+"""로컬 시계열 저장소 (추가 전용, 컬럼 파일 + 메모리 맵)
+
+측정값을 서버와 별도로 장치에 보관합니다. 시리즈(soil, env)마다 필드별 컬럼 파일을
+세그먼트 단위로 미리 할당하고 np.memmap으로 추가 기록합니다.
+
+    data/timeseries/<시리즈>/
+        series.json                 # 컬럼 구성, 세그먼트 크기
+        seg_0000000000/             # 첫 행 번호로 이름 지정
+            ts.f8, address.f8, temperature.f8, ...
+            count                   # 커밋된 행 수 (원자적 교체)
+
+- 기록 순서: 컬럼 값 기록 → flush → count 교체. 중간에 꺼지면 커밋 안 된 행은 무시됨
+- 세그먼트 교체: 임시 디렉토리에 파일을 만든 뒤 이름 변경 (반쯤 만들어진 세그먼트 없음)
+- 조회: 세그먼트 시간 범위 + 희소 타임스탬프 인덱스로 O(log n) 탐색,
+  결과는 메모리 맵의 슬라이스(복사 없음)
+"""
+import bisect
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+STORE_DIR = Path("data/timeseries")
+SEGMENT_ROWS = 65536   # 세그먼트당 행 수 (컬럼당 512KB)
+INDEX_STRIDE = 256     # 희소 인덱스 간격 (행)
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _readonly(view: np.ndarray) -> np.ndarray:
+    view.flags.writeable = False
+    return view
+
+
+class Segment:
+    """고정 크기 컬럼 파일 묶음 하나"""
+
+    def __init__(self, path: Path, columns: Sequence[str], rows: int):
+        self.path = path
+        self.start_row = int(path.name.split("_")[1])
+        self.rows = rows
+        count_file = path / "count"
+        self.count = int(count_file.read_text()) if count_file.exists() else 0
+        self.columns: Dict[str, np.memmap] = {
+            name: np.memmap(path / f"{name}.f8", dtype=np.float64, mode="r+", shape=(rows,))
+            for name in columns
+        }
+        # 희소 인덱스: INDEX_STRIDE 행마다 타임스탬프
+        self.sparse_ts: List[float] = self.columns["ts"][:self.count:INDEX_STRIDE].tolist()
+
+    @classmethod
+    def create(cls, parent: Path, start_row: int, columns: Sequence[str], rows: int) -> "Segment":
+        name = f"seg_{start_row:010d}"
+        tmp = parent / f".{name}.tmp"
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        for col in columns:
+            with open(tmp / f"{col}.f8", "wb") as f:
+                f.truncate(rows * 8)
+        (tmp / "count").write_text("0")
+        os.replace(tmp, parent / name)
+        return cls(parent / name, columns, rows)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.rows
+
+    @property
+    def ts_min(self) -> Optional[float]:
+        return float(self.columns["ts"][0]) if self.count else None
+
+    @property
+    def ts_max(self) -> Optional[float]:
+        return float(self.columns["ts"][self.count - 1]) if self.count else None
+
+    def append(self, row: Mapping[str, float]):
+        i = self.count
+        for name, col in self.columns.items():
+            col[i] = row[name]
+        for col in self.columns.values():
+            col.flush()
+        self.count = i + 1
+        _write_atomic(self.path / "count", str(self.count))
+        if i % INDEX_STRIDE == 0:
+            self.sparse_ts.append(float(self.columns["ts"][i]))
+
+    def search(self, ts: float, side: str = "left") -> int:
+        """ts 위치 (np.searchsorted 와 같은 의미) - 희소 인덱스로 블록을 찾은 뒤 블록 안에서 탐색"""
+        if side == "left":
+            block = bisect.bisect_left(self.sparse_ts, ts) - 1
+        else:
+            block = bisect.bisect_right(self.sparse_ts, ts) - 1
+        lo = max(block, 0) * INDEX_STRIDE
+        hi = min(lo + 2 * INDEX_STRIDE, self.count) if block >= 0 else min(INDEX_STRIDE, self.count)
+        return lo + int(np.searchsorted(self.columns["ts"][lo:hi], ts, side=side))
+
+    def close(self):
+        for col in self.columns.values():
+            col.flush()
+        self.columns = {}  # 참조를 놓으면 메모리 맵 해제
+
+
+class Series:
+    """시리즈 하나 (예: 토양 센서 측정값)"""
+
+    def __init__(self, path: Path, columns: Sequence[str], segment_rows: int = SEGMENT_ROWS):
+        self.path = path
+        self.lock = threading.Lock()
+        meta_file = path / "series.json"
+        if meta_file.exists():
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            self.columns = meta["columns"]
+            self.segment_rows = meta["segment_rows"]
+            missing = set(columns) - set(self.columns)
+            if missing:
+                raise ValueError(f"Series {path.name} has no columns {sorted(missing)}")
+        else:
+            path.mkdir(parents=True, exist_ok=True)
+            self.columns = ["ts"] + [c for c in columns if c != "ts"]
+            self.segment_rows = segment_rows
+            _write_atomic(meta_file, json.dumps({"columns": self.columns, "segment_rows": segment_rows}))
+
+        self.segments: List[Segment] = [
+            Segment(p, self.columns, self.segment_rows)
+            for p in sorted(path.glob("seg_*")) if p.is_dir()
+        ]
+
+    def __len__(self) -> int:
+        return sum(seg.count for seg in self.segments)
+
+    @property
+    def last_ts(self) -> Optional[float]:
+        for seg in reversed(self.segments):
+            if seg.count:
+                return seg.ts_max
+        return None
+
+    def append(self, row: Mapping[str, float]):
+        """행 추가 (row: 컬럼명 → 값, Reading 레코드도 가능)
+
+        타임스탬프는 증가 순서여야 하며, 시계가 뒤로 간 경우 마지막 타임스탬프로 맞춥니다.
+        """
+        with self.lock:
+            last_ts = self.last_ts
+            if last_ts is not None and row["ts"] < last_ts:
+                row = {name: row[name] for name in self.columns}
+                row["ts"] = last_ts
+            if not self.segments or self.segments[-1].full:
+                start = self.segments[-1].start_row + self.segments[-1].count if self.segments else 0
+                self.segments.append(Segment.create(self.path, start, self.columns, self.segment_rows))
+            self.segments[-1].append(row)
+
+    def slices(self, start: float = None, end: float = None, columns: Sequence[str] = None) -> List[Dict[str, np.ndarray]]:
+        """[start, end) 구간의 세그먼트별 컬럼 뷰 (메모리 맵 슬라이스, 복사 없음)"""
+        columns = list(columns or self.columns)
+        result = []
+        with self.lock:
+            segments = [seg for seg in self.segments if seg.count]
+        # 세그먼트는 시간순이므로 범위에 걸치는 세그먼트만 이분 탐색으로 선택
+        maxes = [seg.ts_max for seg in segments]
+        first = bisect.bisect_left(maxes, start) if start is not None else 0
+        for seg in segments[first:]:
+            if end is not None and seg.ts_min >= end:
+                break
+            lo = seg.search(start, "left") if start is not None else 0
+            hi = seg.search(end, "left") if end is not None else seg.count
+            if hi > lo:
+                result.append({name: _readonly(seg.columns[name][lo:hi]) for name in columns})
+        return result
+
+    def slices_from_row(self, row: int, columns: Sequence[str] = None) -> List[tuple]:
+        """행 번호 row 이후의 세그먼트별 컬럼 뷰 (증분 내보내기용)
+
+        행 번호는 세그먼트가 삭제되어도 바뀌지 않습니다.
+
+        Returns:
+            [(첫 행 번호, {컬럼명: 뷰})]
+        """
+        columns = list(columns or self.columns)
+        with self.lock:
+            segments = [(seg, seg.count) for seg in self.segments if seg.count]
+        result = []
+        for seg, count in segments:
+            if seg.start_row + count <= row:
+                continue
+            lo = max(row - seg.start_row, 0)
+            result.append((seg.start_row + lo, {name: _readonly(seg.columns[name][lo:count]) for name in columns}))
+        return result
+
+    def read(self, column: str, start: float = None, end: float = None) -> np.ndarray:
+        """컬럼 값 (한 세그먼트 안이면 복사 없는 뷰, 여러 세그먼트면 이어 붙인 배열)"""
+        parts = [s[column] for s in self.slices(start, end, [column])]
+        if not parts:
+            return np.empty(0)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def drop_before(self, ts: float) -> int:
+        """보존 기간 관리: 마지막 타임스탬프가 ts 이전인 세그먼트 삭제 (기록 중인 세그먼트 제외)
+
+        Returns:
+            삭제한 행 수
+        """
+        dropped = 0
+        with self.lock:
+            while len(self.segments) > 1 and self.segments[0].ts_max < ts:
+                seg = self.segments.pop(0)
+                dropped += seg.count
+                seg.close()
+                shutil.rmtree(seg.path, ignore_errors=True)
+        return dropped
+
+    def close(self):
+        with self.lock:
+            for seg in self.segments:
+                seg.close()
+
+
+class TimeSeriesStore:
+    """시리즈 모음 (data/timeseries)"""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+        self.series: Dict[str, Series] = {}
+
+    def open(self, name: str, columns: Sequence[str], segment_rows: int = SEGMENT_ROWS) -> Series:
+        if name not in self.series:
+            self.series[name] = Series(self.root / name, columns, segment_rows)
+        return self.series[name]
+
+    def close(self):
+        for series in self.series.values():
+            series.close()
@@ -0,0 +1,199 @@
+"""업로드 대역폭 제한과 우선순위 (LTE 종량제 회선용)
+
+수집 한 번에 원본 JPEG 업로드가 몰리면 업링크가 가득 차서 작은 환경 센서 업로드와 MQTT까지 늦어집니다.
+UploadScheduler는 업로드 요청마다 자리(slot)를 내주며 다음을 지킵니다.
+
+    with uploads.slot("image", size):    # 자리가 날 때까지 대기 (대기 시간은 upload.wait.<차선>)
+        http.post(...)
+
+    ticket = uploads.acquire("image", size)   # 요청을 다른 스레드가 끝내는 경우 (시간 초과로 버린 요청 등)
+    ...                                       # 그 스레드에서 요청이 실제로 끝날 때 uploads.release(ticket, ok)
+
+- 차선 두 개: sensor(측정값만, 먼저) / image(이미지 첨부, 뒤로 미룸) - 측정값 업로드가 기다리는 동안
+  이미지는 시작하지 않고, 이미지는 한 번에 image_concurrency개까지만
+- 토큰 버킷: 평균 rate(바이트/초), 최대 burst만큼 몰아서 전송 - 이미지는 앞선 전송량(빚)을 다 갚을 때까지
+  기다렸다 보내고(조금씩 흘려보냄), 작은 측정값은 기다리지 않고 토큰만 씀 (그만큼 이미지가 늦어짐)
+  요청 단위로 간격을 두므로 이미지 하나는 회선 속도로 전송됨 (평균만 rate 이하)
+- 동시 업로드 수 자동 조절: 요청 시간에서 전송 시간(크기 / 관측 최대 처리량)을 뺀 대기 시간이 평소
+  (측정값 업로드의 최솟값)의 RTT_TOLERANCE배를 넘거나 요청이 실패하면 줄이고(x0.75), 자리가 모자랄 만큼
+  바쁘고 대기 시간이 평소와 같으면 천천히 늘림 (min_concurrency ~ max_concurrency)
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import metrics
+
+LANES = ("sensor", "image")
+
+RTT_TOLERANCE = 2.0     # 대기 시간이 평소의 이 배수를 넘으면 혼잡으로 보고 동시 업로드 수 감소
+RTT_SLACK = 0.05        # 평소 대기 시간이 아주 짧을 때의 여유 (초) - 작은 흔들림은 혼잡으로 보지 않음
+DECREASE_FACTOR = 0.75
+DECREASE_INTERVAL = 1.0  # 감소는 이 간격(초)에 한 번까지 (같은 혼잡으로 여러 번 줄이지 않도록)
+BASE_DRIFT = 0.01       # 평소 대기 시간이 서서히 따라 올라가는 비율 (경로가 바뀌어도 다시 학습)
+PEAK_DECAY = 0.99       # 관측 최대 처리량이 요청마다 줄어드는 비율
+EWMA_ALPHA = 0.2
+
+
+class TokenBucket:
+    """바이트 토큰 버킷 (rate가 0이면 제한 없음) - 토큰이 음수(빚)가 될 수 있음"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, size: float) -> float:
+        """size 바이트를 예약하고 보내기 전에 기다릴 시간(초) 반환 (앞선 빚을 다 갚을 때까지)"""
+        if not self.rate:
+            return 0.0
+        with self.lock:
+            self._refill(time.monotonic())
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.tokens -= size
+        return delay
+
+    def consume(self, size: float):
+        """기다리지 않고 size 바이트 사용 (우선 차선)"""
+        if self.rate:
+            with self.lock:
+                self._refill(time.monotonic())
+                self.tokens -= size
+
+
+class Ticket:
+    """잡은 업로드 자리 (acquire → release)"""
+
+    __slots__ = ("lane", "size", "started", "saturated", "released")
+
+    def __init__(self, lane: str, size: int, started: float, saturated: bool):
+        self.lane = lane
+        self.size = size
+        self.started = started
+        self.saturated = saturated
+        self.released = False
+
+
+class UploadScheduler:
+    """업로드 자리 배분 (차선 우선순위 + 토큰 버킷 + 동시 업로드 수 자동 조절)"""
+
+    def __init__(self, max_concurrency: int = 2, rate: float = 0, burst: float = 256 * 1024,
+                 image_concurrency: int = 1, min_concurrency: int = 1):
+        """
+        Args:
+            max_concurrency: 동시 업로드 최대 수 (HTTP 연결 풀 크기와 같게)
+            rate: 평균 업로드 대역폭 (바이트/초, 0이면 제한 없음)
+            burst: 쉬었다가 한 번에 보낼 수 있는 양 (바이트)
+            image_concurrency: 동시에 보내는 이미지 업로드 수
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.image_concurrency = max(1, image_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.cond = threading.Condition()
+        self.inflight = dict.fromkeys(LANES, 0)
+        self.waiting = dict.fromkeys(LANES, 0)
+        self.base_delay = None  # 평소 대기 시간 (전송 시간 제외, 초)
+        self.peak_bps = 0.0     # 관측 최대 처리량 (바이트/초)
+        self.throughput = 0.0   # 최근 처리량 EWMA (바이트/초)
+        self.rtt = 0.0          # 최근 요청 시간 EWMA (초)
+        self.last_decrease = 0.0
+
+    def _admissible(self, lane: str) -> bool:
+        if sum(self.inflight.values()) >= int(self.limit):
+            return False
+        if lane == "image":
+            return self.waiting["sensor"] == 0 and self.inflight["image"] < self.image_concurrency
+        return True
+
+    @contextmanager
+    def slot(self, lane: str, size: int):
+        """업로드 한 건의 자리 (블록 = 요청 전체, 예외로 끝나면 실패로 보고 동시 업로드 수 감소)"""
+        ticket = self.acquire(lane, size)
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(ticket, ok)
+
+    def acquire(self, lane: str, size: int) -> Ticket:
+        """자리가 날 때까지 대기 후 자리 반환 - 요청이 끝나면(실패 포함) 반드시 release()"""
+        queued = time.monotonic()
+        if lane == "image":
+            delay = self.bucket.reserve(size)
+            if delay:
+                time.sleep(delay)
+        else:
+            self.bucket.consume(size)
+        with self.cond:
+            self.waiting[lane] += 1
+            try:
+                while not self._admissible(lane):
+                    self.cond.wait()
+            finally:
+                self.waiting[lane] -= 1
+            self.inflight[lane] += 1
+            saturated = sum(self.inflight.values()) >= int(self.limit)
+        started = time.monotonic()
+        metrics.observe(f"upload.wait.{lane}", started - queued)
+        return Ticket(lane, size, started, saturated)
+
+    def release(self, ticket: Ticket, ok: bool):
+        """요청이 끝남 - 자리 반납, 요청 시간/성공 여부로 동시 업로드 수 조절 (두 번째 호출은 무시)"""
+        elapsed = time.monotonic() - ticket.started
+        with self.cond:
+            if ticket.released:
+                return
+            ticket.released = True
+            self.inflight[ticket.lane] -= 1
+            self._adapt(ticket.lane, ticket.size, elapsed, ok, ticket.saturated)
+            self.cond.notify_all()
+
+    def _adapt(self, lane: str, size: int, elapsed: float, ok: bool, saturated: bool):
+        """요청 하나가 끝날 때 동시 업로드 수 조절 (cond 잠금 안에서)"""
+        now = time.monotonic()
+        congested = not ok
+        if ok and elapsed > 0:
+            # 크기에 비례하는 전송 시간을 빼고 남은 시간 = 서버 처리 + 회선 대기열 (이번 요청 전 최대 처리량 기준)
+            delay = max(0.0, elapsed - size / self.peak_bps) if self.peak_bps else elapsed
+            goodput = size / elapsed
+            self.peak_bps = max(self.peak_bps * PEAK_DECAY, goodput)
+            self.throughput += (goodput - self.throughput) * EWMA_ALPHA
+            self.rtt += (elapsed - self.rtt) * EWMA_ALPHA
+            # 평소 대기 시간은 전송 시간이 거의 없는 측정값 업로드로만 학습
+            if lane == "sensor":
+                if self.base_delay is None or delay < self.base_delay:
+                    self.base_delay = delay
+                else:
+                    self.base_delay += (delay - self.base_delay) * BASE_DRIFT
+            if self.base_delay is not None:
+                congested = delay > max(self.base_delay * RTT_TOLERANCE, self.base_delay + RTT_SLACK)
+
+        if congested:
+            if now - self.last_decrease >= DECREASE_INTERVAL:
+                self.limit = max(self.min_concurrency, self.limit * DECREASE_FACTOR)
+                self.last_decrease = now
+                metrics.count("upload.concurrency_decreases")
+        elif saturated:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        with self.cond:
+            return {
+                "limit": round(self.limit, 2),
+                "inflight": dict(self.inflight),
+                "waiting": dict(self.waiting),
+                "rate_kbps": round(self.bucket.rate / 1024, 1),
+                "tokens_kb": round(self.bucket.tokens / 1024, 1),
+                "throughput_kbps": round(self.throughput / 1024, 1),
+                "rtt_ms": round(self.rtt * 1000),
+                "base_delay_ms": round(self.base_delay * 1000) if self.base_delay is not None else None,
+            }
@@ -0,0 +1,335 @@
+"""작업 프로세스 감시 (카메라 / 센서 수집 / 업로드 분리)
+
+모든 작업을 한 프로세스에서 하면 멈춘 cv2.VideoCapture나 GIL을 오래 잡는 JPEG 인코딩이 시리얼 폴링과
+MQTT 처리를 막고, OpenCV 네이티브 코드가 죽으면 서비스 전체가 종료됩니다.
+Supervisor는 이런 작업을 별도 프로세스(작업 프로세스)에서 실행하고 큐로 요청/결과를 주고받습니다.
+
+    supervisor = Supervisor()
+    supervisor.add("camera", camera_worker)          # camera_worker() → {"capture": 함수}
+    supervisor.start()
+    path = supervisor["camera"].call("capture", "a.jpg", timeout=30)
+
+- 작업 프로세스는 요청을 하나씩 처리 (같은 작업 프로세스를 여러 스레드가 호출하면 차례대로)
+- 재시작: 프로세스가 죽었거나, 요청 처리 시간이 timeout을 넘었거나, heartbeat가 멈춘 경우(GIL을 잡고 멈춤)
+  해당 작업 프로세스만 종료 후 다시 시작 - 처리 중/대기 중이던 호출은 WorkerError
+- 시작하자마자 계속 죽으면 재시작 간격을 1초부터 최대 1분까지 늘림
+- 작업 프로세스가 heartbeat와 함께 자기 CPU 시간/메모리를 알려 프로세스별 CPU/RSS 보고
+- setup 함수와 인자는 spawn으로 넘기므로 모듈 최상위 함수여야 함 (Windows와 같은 방식)
+- 작업 프로세스의 로그/이벤트는 큐로 메인 프로세스에 넘겨 같은 로그 파일, events.jsonl, 링 버퍼에 기록
+  (메시지 앞에 [작업 프로세스 이름])
+- 작업 프로세스의 단계별 지연 시간(metrics)은 메인 프로세스에 합쳐지지 않음 - 호출 전체 시간은
+  worker.<이름>.<작업> 구간으로 기록
+"""
+import itertools
+import logging
+import logging.handlers
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from event_log import event
+from metrics import metrics
+from metrics_server import process_rss
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 1.0   # 작업 프로세스 → 감시 상태 갱신 간격 (초)
+HEARTBEAT_TIMEOUT = 15.0   # 이 시간 동안 heartbeat가 없으면 멈춘 것으로 보고 재시작
+CHECK_INTERVAL = 1.0       # 감시 간격 (초)
+STABLE_AFTER = 30.0        # 이보다 오래 살아 있었으면 다음 재시작은 바로
+RESTART_MAX_DELAY = 60.0
+
+_ctx = multiprocessing.get_context("spawn")  # 스레드가 있는 프로세스에서 fork하지 않음 (Windows와 동일)
+
+# 공유 상태 (작업 프로세스가 기록): heartbeat 시각, CPU 시간, RSS, 처리 중인 요청의 제한 시각 (0: 대기 중)
+_HEARTBEAT, _CPU, _RSS, _DEADLINE = range(4)
+
+
+class WorkerError(RuntimeError):
+    """작업 프로세스 호출 실패 (작업 중 예외, 작업 프로세스 재시작/종료)"""
+
+
+def _heartbeat(state, stop: threading.Event):
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        state[_HEARTBEAT] = time.time()
+        state[_CPU] = time.process_time()
+        state[_RSS] = process_rss()
+
+
+def _forward_logs(name: str, logs, level: int):
+    """작업 프로세스의 루트 로거 → 메인 프로세스로 보내는 큐 (메시지는 여기서 문자열로 만듦)"""
+    handler = logging.handlers.QueueHandler(logs)
+    handler.setFormatter(logging.Formatter(f"[{name}] %(message)s"))
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _worker_main(name: str, setup: Callable, setup_args: tuple, requests, results, state, logs, level: int):
+    """작업 프로세스 본체: setup()이 돌려준 {작업 이름: 함수}로 요청을 하나씩 처리"""
+    _forward_logs(name, logs, level)
+    state[_HEARTBEAT] = time.time()
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(state, stop), name="heartbeat", daemon=True).start()
+    handlers = setup(*setup_args)
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        call_id, op, args, kwargs, timeout = request
+        state[_DEADLINE] = time.time() + timeout if timeout else 0
+        try:
+            # 결과는 여기서 직렬화 - 큐의 전송 스레드에서 실패하면 호출자가 결과를 영영 받지 못함
+            result = (call_id, True, pickle.dumps(handlers[op](*args, **kwargs)))
+        except Exception as e:
+            result = (call_id, False, f"{type(e).__name__}: {e}")
+        finally:
+            state[_DEADLINE] = 0
+        results.put(result)
+    stop.set()
+
+
+class Worker:
+    """작업 프로세스 하나 (호출, 재시작, 상태)"""
+
+    def __init__(self, name: str, setup: Callable, setup_args: tuple = ()):
+        self.name = name
+        self.setup = setup
+        self.setup_args = setup_args
+        self.process = None
+        self.requests = None
+        self.state = None
+        self.started_at = 0.0
+        self.next_start = 0.0    # 재시작 대기 중이면 시작할 시각 (monotonic)
+        self.crashes = 0         # 짧게 살다 죽은 연속 횟수 (재시작 간격 계산)
+        self.restarts = 0
+        self.calls = 0
+        self.failures = 0
+        self.cpu_pct = 0
+        self._cpu_sample = (time.monotonic(), 0.0)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        self.requests = _ctx.Queue()
+        results = _ctx.Queue()
+        logs = _ctx.Queue()
+        self.state = _ctx.Array("d", 4, lock=False)
+        self.state[_HEARTBEAT] = time.time()
+        self.process = _ctx.Process(target=_worker_main, name=f"worker-{self.name}", daemon=True,
+                                    args=(self.name, self.setup, self.setup_args, self.requests, results, self.state,
+                                          logs, logging.getLogger().getEffectiveLevel()))
+        self.process.start()
+        self.started_at = time.monotonic()
+        self._cpu_sample = (self.started_at, 0.0)
+        threading.Thread(target=self._read_results, args=(results, self.process),
+                         name=f"worker-{self.name}-results", daemon=True).start()
+        threading.Thread(target=self._read_logs, args=(logs, self.process),
+                         name=f"worker-{self.name}-logs", daemon=True).start()
+        logger.info(f"⚙️ 작업 프로세스 시작: {self.name} (pid {self.process.pid})")
+
+    def _read_results(self, results, process):
+        while True:
+            try:
+                call_id, ok, value = results.get(timeout=1.0)
+            except queue.Empty:
+                if process is not self.process or not process.is_alive():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                future = self._pending.pop(call_id, None)
+            if future is None:
+                continue  # 이미 실패 처리된 호출 (재시작 직전 결과)
+            if ok:
+                future.set_result(pickle.loads(value))
+            else:
+                self.failures += 1
+                future.set_exception(WorkerError(f"{self.name}: {value}"))
+
+    def _read_logs(self, logs, process):
+        """작업 프로세스의 로그를 메인 프로세스 로거로 다시 기록 (setup_logging의 큐 → 파일/이벤트/링 버퍼)"""
+        while True:
+            try:
+                record = logs.get(timeout=1.0)
+            except queue.Empty:
+                if process is not self.process or not process.is_alive():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            logging.getLogger(record.name).handle(record)
+
+    def call(self, op: str, *args, timeout: float = None, **kwargs):
+        """작업 프로세스에서 실행하고 결과 반환
+
+        Args:
+            timeout: 처리 시간 제한 (초) - 넘으면 작업 프로세스를 재시작하고 WorkerError
+
+        Raises:
+            WorkerError: 작업 중 예외 (메시지에 원래 예외 포함), 작업 프로세스가 멈춤/종료
+        """
+        future = Future()
+        with self._lock:
+            if not self.alive:
+                raise WorkerError(f"{self.name}: 작업 프로세스 재시작 대기 중")
+            call_id = next(self._ids)
+            self._pending[call_id] = future
+            self.calls += 1
+            self.requests.put((call_id, op, args, kwargs, timeout))
+        # 대기 시간은 제한하지 않음 - 멈춘 요청은 감시 스레드가 작업 프로세스를 재시작하며 실패 처리
+        with metrics.span(f"worker.{self.name}.{op}"):
+            return future.result()
+
+    def _fail_pending(self, reason: str):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            self.failures += 1
+            future.set_exception(WorkerError(f"{self.name}: {reason}"))
+
+    def restart(self, reason: str):
+        """작업 프로세스 종료 후 (대기 시간이 지나면) 다시 시작"""
+        logger.warning(f"♻️ 작업 프로세스 재시작: {self.name} ({reason})")
+        event("worker_restart", level=logging.WARNING, worker=self.name, reason=reason)
+        metrics.count(f"worker.{self.name}.restarts")
+        self.restarts += 1
+        with self._lock:
+            process, self.process = self.process, None
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=5)
+        self._fail_pending(reason)
+
+        lived = time.monotonic() - self.started_at
+        self.crashes = 0 if lived >= STABLE_AFTER else self.crashes + 1
+        delay = min(2 ** (self.crashes - 2), RESTART_MAX_DELAY) if self.crashes >= 2 else 0
+        self.next_start = time.monotonic() + delay
+        if delay:
+            logger.warning(f"⏳ {self.name}: 재시작이 반복되어 {delay:.0f}초 후 다시 시작")
+
+    def check(self, heartbeat_timeout: float) -> Optional[str]:
+        """재시작이 필요한 이유 (정상이면 None) - CPU 사용률도 갱신"""
+        if not self.process.is_alive():
+            return f"종료됨 (exit code {self.process.exitcode})"
+        now = time.time()
+        deadline = self.state[_DEADLINE]
+        if deadline and now > deadline:
+            return "처리 시간 초과"
+        if now - self.state[_HEARTBEAT] > heartbeat_timeout:
+            return "heartbeat 없음"
+
+        cpu = self.state[_CPU]
+        sampled_at, last_cpu = self._cpu_sample
+        elapsed = time.monotonic() - sampled_at
+        if elapsed >= 5.0:
+            self.cpu_pct = max(round((cpu - last_cpu) / elapsed * 100), 0)
+            self._cpu_sample = (time.monotonic(), cpu)
+        return None
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            process, self.process = self.process, None
+        if process is not None:
+            try:
+                self.requests.put(None)
+                process.join(timeout)
+            except (OSError, ValueError):
+                pass
+            if process.is_alive():
+                process.kill()
+                process.join(timeout=5)
+        self._fail_pending("종료")
+
+    def stats(self) -> dict:
+        alive = self.alive
+        return {
+            "pid": self.process.pid if alive else None,
+            "alive": alive,
+            "busy": bool(alive and self.state[_DEADLINE]),
+            "restarts": self.restarts,
+            "calls": self.calls,
+            "failures": self.failures,
+            "cpu_pct": self.cpu_pct if alive else 0,
+            "rss_mb": round(self.state[_RSS] / 1048576) if alive else 0,
+        }
+
+
+class Supervisor:
+    """작업 프로세스 실행/감시 스레드"""
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL, heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.check_interval = check_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.workers: Dict[str, Worker] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def __getitem__(self, name: str) -> Worker:
+        return self.workers[name]
+
+    def add(self, name: str, setup: Callable, *setup_args) -> Worker:
+        """작업 프로세스 등록 (감시 중이면 바로 시작)
+
+        Args:
+            setup: 작업 프로세스에서 한 번 호출되어 {작업 이름: 함수}를 돌려주는 모듈 최상위 함수
+            setup_args: setup 인자 (pickle 가능해야 함)
+        """
+        worker = Worker(name, setup, setup_args)
+        with self._lock:
+            self.workers[name] = worker
+            if self.thread is not None:
+                worker.start()
+        return worker
+
+    def start(self):
+        with self._lock:
+            for worker in self.workers.values():
+                worker.start()
+            self.thread = threading.Thread(target=self._run, name="supervisor", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            with self._lock:
+                workers = list(self.workers.values())
+            for worker in workers:
+                try:
+                    if worker.process is None:
+                        if time.monotonic() >= worker.next_start:
+                            worker.start()
+                        continue
+                    reason = worker.check(self.heartbeat_timeout)
+                    if reason:
+                        worker.restart(reason)
+                        if worker.next_start <= time.monotonic():
+                            worker.start()
+                except Exception as e:
+                    logger.error(f"❌ 작업 프로세스 감시 오류 ({worker.name}): {e}")
+
+    def stats(self) -> Dict[str, dict]:
+        """작업 프로세스별 pid, 재시작 횟수, CPU(%), RSS(MB) 등"""
+        return {name: worker.stats() for name, worker in self.workers.items()}
+
+    def stop(self):
+        """감시 종료 후 모든 작업 프로세스 종료 (처리 중인 요청은 끝날 때까지 잠시 대기)"""
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+        for worker in self.workers.values():
+            worker.stop()
+        logger.info("⚙️ 작업 프로세스 종료")